@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class ApiConfig(AppConfig):
     name = 'api'
+
+    def ready(self):
+        # Connect signal handlers that invalidate api caches
+        from api import signals  # noqa: F401
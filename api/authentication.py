@@ -0,0 +1,154 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import router
+from rest_framework.authentication import TokenAuthentication
+
+
+# Fields of the user kept in the cached snapshot.
+# Everything else (password hash included) is deferred and loaded
+# from the database only if a view reads it
+SNAPSHOT_FIELDS = ('id', 'email', 'name', 'avatarURL', 'is_active',
+                   'is_staff', 'is_superuser')
+
+# Cache backends held in the memory of each process. As the shared tier
+# they would keep, for AUTH_TOKEN_CACHE_TIMEOUT, the entries another
+# process invalidated, so the shared tier is skipped on them
+PROCESS_LOCAL_CACHES = (LocMemCache, )
+
+
+class LRUCache:
+    """
+    Thread safe, size bounded, in-process LRU cache
+    whose entries expire after timeout seconds
+    """
+
+    def __init__(self, max_size, timeout):
+        self.max_size = max_size
+        self.timeout = timeout
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Return the value of key, or None if missing or expired
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires = entry
+            if expires < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        if self.max_size <= 0 or self.timeout <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.timeout)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+# Process wide tier, in front of the shared cache
+local_cache = LRUCache(settings.AUTH_TOKEN_LOCAL_CACHE_SIZE,
+                       settings.AUTH_TOKEN_LOCAL_CACHE_TIMEOUT)
+
+
+def cache_key(token_key):
+    """
+    Return the shared cache key of a token
+    """
+    return 'auth-token:{}'.format(token_key)
+
+
+def get_shared_cache():
+    """
+    Return the cache of AUTH_TOKEN_CACHE_ALIAS, or None when its
+    backend is not shared by the processes
+    """
+    shared_cache = caches[settings.AUTH_TOKEN_CACHE_ALIAS]
+    if isinstance(shared_cache, PROCESS_LOCAL_CACHES):
+        return None
+    return shared_cache
+
+
+def invalidate_token(token_key):
+    """
+    Forget the user cached for token_key in both tiers
+    """
+    local_cache.delete(token_key)
+    shared_cache = get_shared_cache()
+    if shared_cache is not None:
+        shared_cache.delete(cache_key(token_key))
+
+
+def user_from_snapshot(snapshot):
+    """
+    Return the user of a snapshot, the fields out of SNAPSHOT_FIELDS
+    deferred. Model.from_db takes the values of a partial row in the
+    order of the concrete fields of the model
+    """
+    user_model = get_user_model()
+    values = dict(zip(SNAPSHOT_FIELDS, snapshot))
+    field_names = [field.attname for field in
+                   user_model._meta.concrete_fields
+                   if field.attname in values]
+    return user_model.from_db(router.db_for_read(user_model), field_names,
+                              [values[name] for name in field_names])
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    Drop-in TokenAuthentication that caches token -> user snapshot,
+    first in a bounded in-process LRU, then in the shared Django cache.
+    Only a miss in both tiers queries the authtoken table.
+    Entries are invalidated by api/signals.py when the user or the
+    token is saved or deleted. Other processes may keep a stale entry
+    in their local tier for AUTH_TOKEN_LOCAL_CACHE_TIMEOUT seconds.
+    Without a shared backend (see get_shared_cache) the local tier is
+    the only one
+    """
+
+    def authenticate_credentials(self, key):
+        snapshot = local_cache.get(key)
+        if snapshot is None:
+            shared_cache = get_shared_cache()
+            if shared_cache is not None:
+                snapshot = shared_cache.get(cache_key(key))
+            if snapshot is None:
+                user, token = super().authenticate_credentials(key)
+                snapshot = tuple(getattr(user, name)
+                                 for name in SNAPSHOT_FIELDS)
+                if shared_cache is not None:
+                    shared_cache.set(cache_key(key), snapshot,
+                                     settings.AUTH_TOKEN_CACHE_TIMEOUT)
+                local_cache.set(key, snapshot)
+                return user, token
+            local_cache.set(key, snapshot)
+
+        # An inactive user is never cached: saving it invalidates
+        # the entry and the next lookup fails in TokenAuthentication
+        user = user_from_snapshot(snapshot)
+        token = self.get_model()(key=key, user=user)
+        return user, token
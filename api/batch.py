@@ -0,0 +1,164 @@
+import io
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIRequest
+from django.db import connections
+from django.urls import Resolver404, resolve
+from rest_framework import status
+from rest_framework.response import Response
+
+
+# Sub-requests without side effects, which may run concurrently
+READ_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+logger = logging.getLogger(__name__)
+
+
+def error(status_code, detail):
+    return {'status': status_code, 'headers': {},
+            'body': {'detail': detail}}
+
+
+def sub_request(request, method, path, query, body):
+    """
+    Return a Django request for one sub-request, with the environ of
+    the batch request. It is authenticated as the batch request, so the
+    token is checked once
+    """
+    content = b'' if body is None else json.dumps(body).encode()
+    environ = dict(request.META)
+    environ.update({
+        'REQUEST_METHOD': method,
+        'PATH_INFO': path,
+        'QUERY_STRING': query,
+        'CONTENT_TYPE': 'application/json',
+        'CONTENT_LENGTH': str(len(content)),
+        'HTTP_ACCEPT': 'application/json',
+        'wsgi.input': io.BytesIO(content),
+    })
+    for header in ('HTTP_IF_NONE_MATCH', 'HTTP_IF_MODIFIED_SINCE',
+                   'HTTP_IF_MATCH', 'HTTP_IF_UNMODIFIED_SINCE'):
+        environ.pop(header, None)
+    django_request = WSGIRequest(environ)
+    # Picked up by rest_framework.request.Request in place of the
+    # authentication classes of the view
+    django_request._force_auth_user = request.user
+    django_request._force_auth_token = request.auth
+    return django_request
+
+
+def response_body(response):
+    if isinstance(response, Response):
+        return response.data
+    if not response.content:
+        return None
+    if response.get('Content-Type', '').startswith('application/json'):
+        return json.loads(response.content.decode(response.charset))
+    return response.content.decode(response.charset)
+
+
+def dispatch(request, item):
+    """
+    Run one sub-request, {'method', 'path', 'body'}, through the api
+    urls and views, and return {'status', 'headers', 'body'}.
+    Middleware does not run for sub-requests. An exception of the view
+    is logged and answers 500 for this sub-request only
+    """
+    url = urlsplit(item['path'])
+    try:
+        match = resolve(url.path)
+    except Resolver404:
+        return error(status.HTTP_404_NOT_FOUND, 'Not found.')
+    if match.namespace != 'api':
+        return error(status.HTTP_404_NOT_FOUND, 'Not found.')
+    if match.url_name == 'batch':
+        return error(status.HTTP_400_BAD_REQUEST,
+                     'A batch cannot contain a batch.')
+
+    try:
+        response = match.func(
+            sub_request(request, item['method'], url.path, url.query,
+                        item.get('body')),
+            *match.args, **match.kwargs
+        )
+    except Exception:
+        logger.exception('Batch sub-request failed: %s %s',
+                         item['method'], item['path'])
+        return error(status.HTTP_500_INTERNAL_SERVER_ERROR,
+                     'A server error occurred.')
+    if response.streaming:
+        response.close()
+        return error(status.HTTP_400_BAD_REQUEST,
+                     'Streaming responses are not supported in a batch.')
+    return {
+        'status': response.status_code,
+        'headers': {name: value for name, value in response.items()
+                    if name != 'Content-Type'},
+        'body': response_body(response),
+    }
+
+
+def dispatch_in_thread(request, item):
+    try:
+        return dispatch(request, item)
+    finally:
+        # Pool threads outlive the request: release their connections
+        connections.close_all()
+
+
+_executor = None
+_executor_workers = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """
+    Return the process wide thread pool of BATCH_WORKERS threads
+    """
+    global _executor, _executor_workers
+    with _executor_lock:
+        if _executor is None or _executor_workers != settings.BATCH_WORKERS:
+            if _executor is not None:
+                _executor.shutdown(wait=True)
+            _executor_workers = settings.BATCH_WORKERS
+            _executor = ThreadPoolExecutor(
+                max_workers=_executor_workers,
+                thread_name_prefix='api-batch'
+            )
+        return _executor
+
+
+def run_batch(request, items, concurrent=False):
+    """
+    Run the sub-requests in order and return their results.
+    With concurrent, each run of consecutive reads is spread over the
+    thread pool; a write waits for the reads before it and the reads
+    after it wait for the write, so every sub-request sees the writes
+    listed before it. Sub-requests are not atomic together
+    """
+    results = []
+    reads = []
+
+    def flush_reads():
+        if len(reads) > 1:
+            executor = get_executor()
+            results.extend(executor.map(
+                lambda item: dispatch_in_thread(request, item), reads
+            ))
+        elif reads:
+            results.append(dispatch(request, reads[0]))
+        reads.clear()
+
+    for item in items:
+        if concurrent and item['method'] in READ_METHODS:
+            reads.append(item)
+            continue
+        flush_reads()
+        results.append(dispatch(request, item))
+    flush_reads()
+    return results
@@ -0,0 +1,126 @@
+from django.http import Http404
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework.response import Response
+
+from api.exceptions import PreconditionFailed
+
+
+def make_etag(request, *versions):
+    """
+    Return a strong ETag of a representation: the rendered format and
+    the versions of every row the body is built from
+    """
+    parts = [request.accepted_renderer.format]
+    parts.extend(str(version) for version in versions)
+    return '"{}"'.format('-'.join(parts))
+
+
+def set_validators(response, etag, last_modified):
+    """
+    Set the ETag and Last-Modified headers of a response
+    """
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified.timestamp())
+    return response
+
+
+def conditional_response(request, etag, last_modified):
+    """
+    Evaluate the If-* headers of request: return a 304 or 412 response,
+    or None if the request must be served
+    """
+    return get_conditional_response(
+        request, etag=etag, last_modified=int(last_modified.timestamp())
+    )
+
+
+def lookup(instance, path):
+    """
+    Return the value of a lookup path (author__version) on an instance
+    """
+    value = instance
+    for name in path.split('__'):
+        if value is None:
+            return None
+        value = getattr(value, name)
+    return value
+
+
+class ConditionalRetrieveMixin:
+    """
+    Answer If-None-Match / If-Modified-Since with a 304 after a cheap
+    lookup of the versions of the object, without fetching or
+    serializing it, and send ETag and Last-Modified with every body.
+    validator_fields are the lookups of the versions, updated_at and
+    annotations the body depends on
+    """
+    validator_fields = ('version', 'updated_at')
+
+    def get_validators(self, values):
+        """
+        Return (etag, last_modified) from the values of validator_fields
+        """
+        versions, moments = [], []
+        for field, value in zip(self.validator_fields, values):
+            if field.endswith('updated_at'):
+                if value is not None:
+                    moments.append(value)
+            else:
+                versions.append(int(value or 0))
+        return make_etag(self.request, *versions), max(moments)
+
+    def lookup_validator_values(self):
+        """
+        Return the values of validator_fields of the requested object,
+        with one query
+        """
+        return get_versions(self.get_queryset(),
+                            self.kwargs[self.lookup_field],
+                            *self.validator_fields)
+
+    def retrieve(self, request, *args, **kwargs):
+        values = None
+        conditional = any(header in request.META for header in (
+            'HTTP_IF_NONE_MATCH', 'HTTP_IF_MODIFIED_SINCE'
+        ))
+        if conditional:
+            values = self.lookup_validator_values()
+            etag, last_modified = self.get_validators(values)
+            response = conditional_response(request, etag, last_modified)
+            if response is not None:
+                return set_validators(response, etag, last_modified)
+        return self.serve(values)
+
+    def serve(self, values):
+        """
+        Return the response of the object. values are the validator
+        values when they were already looked up
+        """
+        # Validators of the object actually served
+        instance = self.get_object()
+        etag, last_modified = self.get_validators(
+            [lookup(instance, field) for field in self.validator_fields]
+        )
+        serializer = self.get_serializer(instance)
+        return set_validators(Response(serializer.data), etag,
+                              last_modified)
+
+
+def check_if_match(request, etag, last_modified):
+    """
+    Raise PreconditionFailed if the If-Match or If-Unmodified-Since
+    headers of an unsafe request do not match the current version
+    """
+    if conditional_response(request, etag, last_modified) is not None:
+        raise PreconditionFailed()
+
+
+def get_versions(queryset, pk, *fields):
+    """
+    Return the values of fields of the row pk, raise Http404 if missing
+    """
+    try:
+        return queryset.values_list(*fields).get(pk=pk)
+    except (queryset.model.DoesNotExist, ValueError):
+        raise Http404
@@ -0,0 +1,52 @@
+from django.db import NotSupportedError
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.views import exception_handler as drf_exception_handler
+
+from core.hashing import HashingQueueTimeout
+
+
+class ServiceBusy(APIException):
+    """
+    The server is overloaded, the client should retry later
+    """
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'Server busy, retry later.'
+    default_code = 'service_busy'
+
+    def __init__(self, wait=1, **kwargs):
+        super().__init__(**kwargs)
+        # DRF sends `wait` as the Retry-After header
+        self.wait = wait
+
+
+class PreconditionFailed(APIException):
+    """
+    The resource changed since the version named in If-Match
+    """
+    status_code = status.HTTP_412_PRECONDITION_FAILED
+    default_detail = 'The resource has been modified.'
+    default_code = 'precondition_failed'
+
+
+class NotSupported(APIException):
+    """
+    The feature needs a database backend the server does not run on
+    (e.g. tweet search outside SQLite)
+    """
+    status_code = status.HTTP_501_NOT_IMPLEMENTED
+    default_detail = 'Not supported by this server.'
+    default_code = 'not_supported'
+
+
+def exception_handler(exc, context):
+    """
+    DRF exception handler that also turns the backpressure of
+    core into 503 responses, and the queries the database backend
+    does not support into 501 responses
+    """
+    if isinstance(exc, HashingQueueTimeout):
+        exc = ServiceBusy()
+    elif isinstance(exc, NotSupportedError):
+        exc = NotSupported(str(exc))
+    return drf_exception_handler(exc, context)
@@ -0,0 +1,87 @@
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
+from rest_framework import serializers
+
+
+# Fields whose representation is the value read from the database:
+# values_list() already applies the converters of the backend
+IDENTITY_FIELDS = (serializers.BooleanField, serializers.CharField,
+                   serializers.IntegerField)
+
+
+class ValuesSerializer:
+    """
+    Read only counterpart of a ModelSerializer building representations
+    straight from values_list() tuples. The readable fields of the
+    serializer are compiled once into columns and mappers, so a row
+    costs one dict, not one field object call per field. The output is
+    the same as the one of the serializer.
+    Only fields reading a concrete model field, and primary key related
+    fields, are supported
+    """
+
+    def __init__(self, serializer_class):
+        self.serializer_class = serializer_class
+        model = serializer_class.Meta.model
+        self.names = []
+        self.columns = []
+        self.mappers = []
+        for name, field in serializer_class().fields.items():
+            if field.write_only:
+                continue
+            self.names.append(name)
+            self.columns.append(self._column(model, name, field))
+            self.mappers.append(self._mapper(field))
+        self._identity = not any(self.mappers)
+
+    def _column(self, model, name, field):
+        source = field.source
+        try:
+            model_field = model._meta.get_field(source)
+        except FieldDoesNotExist:
+            model_field = None
+        if isinstance(field, serializers.PrimaryKeyRelatedField) and \
+                model_field is not None and field.pk_field is None:
+            return model_field.attname
+        if model_field is None or model_field.is_relation or \
+                isinstance(field, serializers.BaseSerializer):
+            raise ImproperlyConfigured(
+                '{}.{} is not supported by ValuesSerializer'.format(
+                    self.serializer_class.__name__, name)
+            )
+        return model_field.attname
+
+    @staticmethod
+    def _mapper(field):
+        """
+        Return the function turning a column value into its
+        representation, None when the value is its own
+        """
+        if isinstance(field, (serializers.PrimaryKeyRelatedField, ) +
+                      IDENTITY_FIELDS):
+            return None
+        to_representation = field.to_representation
+
+        # Like Serializer.to_representation, None is never converted
+        def mapper(value):
+            return None if value is None else to_representation(value)
+        return mapper
+
+    def represent(self, values):
+        """
+        Return the representation of the column values of one row
+        """
+        if self._identity:
+            return dict(zip(self.names, values))
+        return {
+            name: value if mapper is None else mapper(value)
+            for name, value, mapper in zip(self.names, values, self.mappers)
+        }
+
+    def serialize(self, queryset):
+        """
+        Return the representations of the rows of queryset, in order,
+        with one query
+        """
+        represent = self.represent
+        return [represent(values)
+                for values in queryset.values_list(*self.columns)]
@@ -0,0 +1,174 @@
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.response import Response
+
+from api.conditional import ConditionalRetrieveMixin, lookup, \
+    set_validators
+
+
+# FragmentCache instances by model, for the invalidation signals
+fragment_caches = {}
+
+
+class FragmentCache:
+    """
+    Cache of the serialized representation of objects by one serializer.
+    An entry is keyed by (model, pk, version, updated_at): every change
+    of a row bumps its version (core.models.version_bump), so a stale
+    representation is never served, and api/signals.py deletes the
+    entry of the previous version on save and delete
+    """
+
+    def __init__(self, serializer_class, values_serializer=None):
+        self.serializer_class = serializer_class
+        # Optional api.fastpath.ValuesSerializer of serializer_class,
+        # serializing the misses of render() from values_list() rows
+        self.values_serializer = values_serializer
+        self.model = serializer_class.Meta.model
+        self.prefix = 'fragment:{}:{}'.format(
+            self.model._meta.label_lower, serializer_class.__name__
+        )
+        fragment_caches.setdefault(self.model, []).append(self)
+
+    @property
+    def cache(self):
+        return caches[settings.FRAGMENT_CACHE_ALIAS]
+
+    def key(self, pk, version, updated_at):
+        return '{}:{}:{}:{}'.format(self.prefix, pk, version,
+                                    updated_at.timestamp())
+
+    def get(self, pk, version, updated_at):
+        return self.cache.get(self.key(pk, version, updated_at))
+
+    def set_many(self, instances, data):
+        self._set_many({
+            (instance.pk, instance.version, instance.updated_at): fragment
+            for instance, fragment in zip(instances, data)
+        })
+
+    def _set_many(self, fragments):
+        self.cache.set_many({
+            self.key(*versions): fragment
+            for versions, fragment in fragments.items()
+        }, settings.FRAGMENT_CACHE_TIMEOUT)
+
+    def delete(self, pk, version, updated_at):
+        self.cache.delete(self.key(pk, version, updated_at))
+
+    def render(self, rows, queryset, context=None):
+        """
+        Return the representations of rows, instances holding at least
+        pk, version and updated_at, in order
+        """
+        fragments = self.render_map(rows, queryset, context)
+        # Deleted rows between the two queries are skipped
+        return [fragments[row.pk] for row in rows if row.pk in fragments]
+
+    def render_map(self, rows, queryset, context=None):
+        """
+        Return the representations of rows by pk. They are read with one
+        cache multi-get; only the misses are fetched from queryset,
+        with one query, serialized and cached
+        """
+        keys = {self.key(row.pk, row.version, row.updated_at): row.pk
+                for row in rows}
+        cached = self.cache.get_many(list(keys))
+        missing = [pk for key, pk in keys.items() if key not in cached]
+        fragments = self.fetch(missing, queryset, context) if missing \
+            else {}
+        fragments.update((keys[key], fragment)
+                         for key, fragment in cached.items())
+        return fragments
+
+    def fetch(self, pks, queryset, context=None):
+        """
+        Serialize and cache the objects pks of queryset, with one query.
+        Return their representations by pk
+        """
+        if self.values_serializer is not None:
+            rows = queryset.filter(pk__in=pks).values_list(
+                'pk', 'version', 'updated_at',
+                *self.values_serializer.columns
+            )
+            represent = self.values_serializer.represent
+            fragments = {tuple(row[:3]): represent(row[3:]) for row in rows}
+        else:
+            instances = queryset.in_bulk(pks)
+            fetched = [instances[pk] for pk in pks if pk in instances]
+            data = self.serializer_class(fetched, many=True,
+                                         context=context).data
+            fragments = {
+                (instance.pk, instance.version, instance.updated_at):
+                    fragment
+                for instance, fragment in zip(fetched, data)
+            }
+        self._set_many(fragments)
+        return {versions[0]: fragment
+                for versions, fragment in fragments.items()}
+
+
+class FragmentListMixin:
+    """
+    List view rendering its page through a FragmentCache.
+    The page query only loads pk, version and updated_at
+    """
+    fragment_cache = None
+
+    def use_fragment_cache(self):
+        """
+        Whether the request is served from the cache, holding the full
+        representation (see api.sparse.SparseFieldsMixin)
+        """
+        return True
+
+    def list(self, request, *args, **kwargs):
+        if not self.use_fragment_cache():
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        rows = self.paginate_queryset(
+            queryset.only('pk', 'version', 'updated_at')
+        )
+        data = self.fragment_cache.render(
+            rows, queryset, context=self.get_serializer_context()
+        )
+        return self.get_paginated_response(data)
+
+
+class FragmentRetrieveMixin(ConditionalRetrieveMixin):
+    """
+    Conditional retrieve view serving its object from a FragmentCache:
+    a hit costs the version lookup only. The object permissions are not
+    checked on a hit, so it is meant for views without any
+    """
+    fragment_cache = None
+
+    def use_fragment_cache(self):
+        """
+        Whether the request is served from the cache, holding the full
+        representation (see api.sparse.SparseFieldsMixin)
+        """
+        return True
+
+    def serve(self, values):
+        if not self.use_fragment_cache():
+            return super().serve(values)
+        if values is None:
+            values = self.lookup_validator_values()
+        fields = dict(zip(self.validator_fields, values))
+        pk = self.get_queryset().model._meta.pk.to_python(
+            self.kwargs[self.lookup_field]
+        )
+        data = self.fragment_cache.get(pk, fields['version'],
+                                       fields['updated_at'])
+        if data is not None:
+            etag, last_modified = self.get_validators(values)
+            return set_validators(Response(data), etag, last_modified)
+
+        instance = self.get_object()
+        data = self.get_serializer(instance).data
+        self.fragment_cache.set_many([instance], [data])
+        etag, last_modified = self.get_validators(
+            [lookup(instance, field) for field in self.validator_fields]
+        )
+        return set_validators(Response(data), etag, last_modified)
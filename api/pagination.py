@@ -0,0 +1,201 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as BinasciiError
+from collections import OrderedDict
+from datetime import date, datetime, time
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import FloatField, IntegerField, Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+def encode_cursor(values):
+    """
+    Encode the key values of a row into an opaque url-safe cursor
+    """
+    # isoformat keeps the microseconds, which the keyset filter needs
+    payload = json.dumps([
+        value.isoformat() if isinstance(value, (date, datetime, time))
+        else value
+        for value in values
+    ], separators=(',', ':'))
+    return urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """
+    Decode a cursor back to the list of raw key values.
+    Raise ValueError if the cursor is malformed
+    """
+    try:
+        padding = '=' * (-len(cursor) % 4)
+        values = json.loads(urlsafe_b64decode(cursor + padding).decode())
+    except (BinasciiError, UnicodeDecodeError, ValueError):
+        raise ValueError('Malformed cursor')
+    if not isinstance(values, list):
+        raise ValueError('Malformed cursor')
+    return values
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (cursor) pagination.
+    Rows are ordered by the fields in `ordering`, and the cursor holds
+    the key of the last row of the page. The next page is fetched with a
+    WHERE on that key, so page N costs the same as page 1 and no COUNT(*)
+    is ever issued.
+    """
+    # Model fields forming a unique key, '-' prefix for descending
+    ordering = ('id', )
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def get_page_size(self, request):
+        """
+        Return the requested page size capped by API_MAX_PAGE_SIZE
+        """
+        page_size = api_settings.PAGE_SIZE
+        try:
+            requested = int(request.query_params[self.page_size_query_param])
+            if requested > 0:
+                page_size = requested
+        except (KeyError, ValueError):
+            pass
+        return min(page_size, settings.API_MAX_PAGE_SIZE)
+
+    def get_key_fields(self, model):
+        """
+        Return a list of (model field, descending) of the ordering
+        """
+        return [
+            (model._meta.get_field(name.lstrip('-')), name.startswith('-'))
+            for name in self.ordering
+        ]
+
+    def get_position(self, request, key_fields):
+        """
+        Return the key values decoded from the cursor query parameter,
+        or None on the first page
+        """
+        cursor = request.query_params.get(self.cursor_query_param)
+        if not cursor:
+            return None
+        try:
+            values = decode_cursor(cursor)
+            if len(values) != len(key_fields):
+                raise ValueError('Wrong cursor length')
+            return [
+                field.to_python(value)
+                for (field, _), value in zip(key_fields, values)
+            ]
+        except (ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def build_filter(self, key_fields, position):
+        """
+        Build the WHERE selecting the rows after position:
+        (k1 > v1) OR (k1 = v1 AND k2 > v2) OR ...
+        """
+        condition = Q()
+        for index, (field, descending) in enumerate(key_fields):
+            lookup = 'lt' if descending else 'gt'
+            term = Q(**{'{}__{}'.format(field.name, lookup): position[index]})
+            for previous in range(index):
+                term &= Q(**{key_fields[previous][0].name: position[previous]})
+            condition |= term
+        return condition
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.key_fields = self.get_key_fields(queryset.model)
+
+        queryset = queryset.order_by(*self.ordering)
+        position = self.get_position(request, self.key_fields)
+        if position is not None:
+            queryset = queryset.filter(
+                self.build_filter(self.key_fields, position)
+            )
+
+        # Fetch one extra row to know if there is a next page
+        results = list(queryset[:self.page_size + 1])
+        self.has_next = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        return self.page
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        last = self.page[-1]
+        cursor = encode_cursor([
+            getattr(last, field.attname) for field, _ in self.key_fields
+        ])
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('results', data)
+        ]))
+
+
+class TweetKeysetPagination(KeysetPagination):
+    """
+    Keyset pagination for tweet lists, newest first
+    """
+    ordering = ('-created_at', '-id')
+
+
+class ConversationKeysetPagination(KeysetPagination):
+    """
+    Keyset pagination for a conversation, oldest first
+    """
+    ordering = ('created_at', 'id')
+
+
+class FollowerKeysetPagination(KeysetPagination):
+    """
+    Keyset pagination for the followers of a user
+    """
+    ordering = ('follower', )
+
+
+class FollowingKeysetPagination(KeysetPagination):
+    """
+    Keyset pagination for the users a user follows
+    """
+    ordering = ('followee', )
+
+
+class SearchKeysetPagination(KeysetPagination):
+    """
+    Keyset pagination for search results, best match first.
+    The key is (search_rank, id), applied by the search itself:
+    paginate_queryset takes a callable(position, limit) returning
+    the results after position instead of a queryset
+    """
+
+    def get_key_fields(self, model):
+        rank, tweet_id = FloatField(), IntegerField()
+        rank.set_attributes_from_name('search_rank')
+        tweet_id.set_attributes_from_name('id')
+        return [(rank, False), (tweet_id, True)]
+
+    def paginate_queryset(self, search, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.key_fields = self.get_key_fields(None)
+        position = self.get_position(request, self.key_fields)
+
+        # Fetch one extra row to know if there is a next page
+        results = search(position, self.page_size + 1)
+        self.has_next = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        return self.page
@@ -1,17 +1,27 @@
 from rest_framework import serializers
+from django.conf import settings
 from django.contrib.auth import get_user_model, authenticate
 
+from api.fastpath import ValuesSerializer
+from api.fragments import FragmentCache
+from api.sparse import SparseFieldsSerializerMixin
+from core.models import Tweet
 
-class UserProfileSerializer(serializers.ModelSerializer):
+
+class UserProfileSerializer(SparseFieldsSerializerMixin,
+                            serializers.ModelSerializer):
     """
-    Serialize user profile object
+    Serialize user profile object.
+    `fields` limits the serialized fields (sparse fieldsets)
     """
 
     class Meta:
         # Specify the model
         model = get_user_model()
         # Specify the fields we want to be serialized
-        fields = ('id', 'email', 'name', 'password', 'avatarURL')
+        fields = ('id', 'email', 'name', 'password', 'avatarURL',
+                  'follower_count', 'following_count')
+        read_only_fields = ('follower_count', 'following_count')
         # Set special requirement for password
         extra_kwargs = {
             'password': {
@@ -42,18 +52,25 @@ class UserProfileSerializer(serializers.ModelSerializer):
     def update(self, instance, validated_data):
         """
         Update user.
-        Hash the password.
+        Only the columns that change are written, in a single UPDATE,
+        and the password is hashed only when a new one is supplied.
         """
         # Remove password from validated_data
         password = validated_data.pop('password', None)
-        # Run update user
-        user = super().update(instance, validated_data)
-        # Set password
-        user.set_password(password)
+        changed = []
+        for attr, value in validated_data.items():
+            if getattr(instance, attr) != value:
+                setattr(instance, attr, value)
+                changed.append(attr)
+        # Hash the password
+        if password:
+            instance.set_password(password)
+            changed.append('password')
         # Save
-        user.save()
+        if changed:
+            instance.save(update_fields=changed)
 
-        return user
+        return instance
 
 
 # Since we use custom model that use email as username,
@@ -94,3 +111,98 @@ class LoginSerializer(serializers.Serializer):
 
         attrs['user'] = user
         return attrs
+
+
+# Fast read only path of UserProfileSerializer
+user_values = ValuesSerializer(UserProfileSerializer)
+# Cached representations of users, for the user list and detail views
+user_fragments = FragmentCache(UserProfileSerializer,
+                               values_serializer=user_values)
+
+
+class TweetAuthorSerializer(serializers.ModelSerializer):
+    """
+    Serialize the public info of a tweet author
+    """
+
+    class Meta:
+        model = get_user_model()
+        fields = ('id', 'name', 'avatarURL')
+
+
+class RepliedTweetSerializer(serializers.ModelSerializer):
+    """
+    Serialize the summary of the tweet a reply is replying to
+    """
+
+    class Meta:
+        model = Tweet
+        fields = ('id', 'author', 'text', 'created_at')
+
+
+class TweetSerializer(serializers.ModelSerializer):
+    """
+    Serialize tweet object.
+    The queryset is expected to come from Tweet.objects.for_viewer(),
+    so author, replying_to and liked do not cost extra queries
+    """
+    author = TweetAuthorSerializer(read_only=True)
+    replying_to = RepliedTweetSerializer(read_only=True)
+    liked = serializers.BooleanField(read_only=True)
+
+    class Meta:
+        model = Tweet
+        fields = ('id', 'text', 'author', 'replying_to', 'like_count',
+                  'reply_count', 'liked', 'created_at')
+        read_only_fields = ('like_count', 'reply_count')
+
+    def create(self, validated_data):
+        """
+        Create a tweet with the rules of TweetManager.create
+        """
+        try:
+            tweet = Tweet.objects.create(**validated_data)
+        except ValueError as error:
+            raise serializers.ValidationError({'text': [str(error)]})
+        # A new tweet is not liked by anyone yet
+        tweet.liked = False
+        return tweet
+
+
+class ThreadTweetSerializer(TweetSerializer):
+    """
+    Serialize a tweet of a thread from Tweet.objects.thread().
+    replying_to is the id of the parent, which is part of the thread
+    """
+    replying_to = serializers.PrimaryKeyRelatedField(read_only=True)
+    thread_depth = serializers.IntegerField(read_only=True)
+
+    class Meta(TweetSerializer.Meta):
+        fields = TweetSerializer.Meta.fields + ('thread_depth', )
+
+
+class BatchSubRequestSerializer(serializers.Serializer):
+    """
+    Serialize one sub-request of a batch: an api path, with its query
+    string, and the JSON body of writes
+    """
+    method = serializers.ChoiceField(
+        choices=('GET', 'HEAD', 'OPTIONS', 'POST', 'PUT', 'PATCH', 'DELETE')
+    )
+    path = serializers.RegexField(r'^/api/', max_length=2000)
+    body = serializers.JSONField(required=False)
+
+
+class BatchSerializer(serializers.Serializer):
+    """
+    Serialize a batch of sub-requests
+    """
+    requests = BatchSubRequestSerializer(many=True, allow_empty=False)
+    concurrent = serializers.BooleanField(default=False)
+
+    def validate_requests(self, value):
+        if len(value) > settings.BATCH_MAX_REQUESTS:
+            raise serializers.ValidationError(
+                'At most {} requests'.format(settings.BATCH_MAX_REQUESTS)
+            )
+        return value
@@ -0,0 +1,55 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from api.authentication import invalidate_token
+from api.fragments import fragment_caches
+
+
+@receiver(post_save, sender=get_user_model())
+@receiver(post_delete, sender=get_user_model())
+def invalidate_user_tokens(sender, instance, **kwargs):
+    """
+    A user changed (api, admin) or was deleted:
+    forget the snapshots cached for their tokens
+    """
+    for key in Token.objects.filter(user_id=instance.pk).values_list(
+            'key', flat=True):
+        invalidate_token(key)
+
+
+@receiver(post_save, sender=Token)
+@receiver(post_delete, sender=Token)
+def invalidate_rotated_token(sender, instance, **kwargs):
+    """
+    A token was rotated or deleted: forget its cached snapshot
+    """
+    invalidate_token(instance.key)
+
+
+@receiver(pre_save, sender=get_user_model())
+def invalidate_saved_fragments(sender, instance, **kwargs):
+    """
+    A user is saved (api, admin): forget the representations of its
+    previous version. VersionedModelMixin.save kept it in
+    previous_version, updated_at still holds the previous one
+    """
+    if instance._state.adding or instance.previous_version is None or \
+            'updated_at' in instance.get_deferred_fields():
+        return
+    for fragment_cache in fragment_caches.get(sender, []):
+        fragment_cache.delete(instance.pk, instance.previous_version,
+                              instance.updated_at)
+
+
+@receiver(post_delete, sender=get_user_model())
+def invalidate_deleted_fragments(sender, instance, **kwargs):
+    """
+    A user was deleted: forget the representations of its version
+    """
+    if {'version', 'updated_at'} & instance.get_deferred_fields():
+        return
+    for fragment_cache in fragment_caches.get(sender, []):
+        fragment_cache.delete(instance.pk, instance.version,
+                              instance.updated_at)
@@ -0,0 +1,78 @@
+from rest_framework.exceptions import ValidationError
+
+
+class SparseFieldsSerializerMixin:
+    """
+    Serializer taking a `fields` argument: the names of the fields to
+    keep, all of them when None
+    """
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+
+class SparseFieldsMixin:
+    """
+    View taking a `fields` query parameter, the comma separated fields
+    of the representation to return, among sparse_fields. The queryset
+    then loads only their columns (.only()), so sparse_fields must be
+    named like the model fields they read.
+    A sparse representation is never served from the fragment cache,
+    which holds the full one, and has its own ETag
+    """
+    sparse_fields = ()
+    sparse_param = 'fields'
+
+    def get_sparse_fields(self):
+        """
+        Return the requested fields, in sparse_fields order, or None
+        """
+        if not hasattr(self, '_sparse_fields'):
+            value = self.request.query_params.get(self.sparse_param, '')
+            requested = {name.strip() for name in value.split(',')} - {''}
+            unknown = requested - set(self.sparse_fields)
+            if unknown:
+                raise ValidationError({self.sparse_param: [
+                    'Unknown fields: {}. Expect some of: {}'.format(
+                        ', '.join(sorted(unknown)),
+                        ', '.join(self.sparse_fields))
+                ]})
+            self._sparse_fields = tuple(
+                name for name in self.sparse_fields if name in requested
+            ) or None
+        return self._sparse_fields
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        fields = self.get_sparse_fields()
+        if fields:
+            # The validators of a conditional view are read from the
+            # served instance too: load the columns of this model among
+            # them, or each one costs a query of its own
+            columns = {field.name
+                       for field in queryset.model._meta.concrete_fields}
+            validators = tuple(
+                name for name in getattr(self, 'validator_fields', ())
+                if name in columns and name not in fields
+            )
+            queryset = queryset.only(*fields, *validators)
+        return queryset
+
+    def get_serializer(self, *args, **kwargs):
+        fields = self.get_sparse_fields()
+        if fields:
+            kwargs.setdefault('fields', fields)
+        return super().get_serializer(*args, **kwargs)
+
+    def get_validators(self, values):
+        etag, last_modified = super().get_validators(values)
+        fields = self.get_sparse_fields()
+        if fields:
+            etag = '"{}-{}'.format('.'.join(fields), etag[1:])
+        return etag, last_modified
+
+    def use_fragment_cache(self):
+        return not self.get_sparse_fields()
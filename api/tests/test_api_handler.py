@@ -0,0 +1,109 @@
+from io import BytesIO
+from wsgiref.util import setup_testing_defaults
+
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.core.signals import request_finished, request_started
+from django.db import close_old_connections
+from django.urls import reverse
+
+from rest_framework.authtoken.models import Token
+
+from chirper_project.handlers import APIWSGIHandler, PathDispatcher, \
+    get_dispatching_wsgi_application
+
+
+LIST_USER_URL = reverse('api:user-list')
+
+
+def call(application, path, **headers):
+    """
+    Run a GET of path through a WSGI application.
+    Return (status, headers, body)
+    """
+    environ = {'PATH_INFO': path, 'HTTP_HOST': 'testserver',
+               'wsgi.input': BytesIO()}
+    environ.update(headers)
+    setup_testing_defaults(environ)
+    started = []
+    # As django.test.Client: keep the connection of the test transaction
+    request_started.disconnect(close_old_connections)
+    request_finished.disconnect(close_old_connections)
+    try:
+        body = b''.join(application(
+            environ, lambda status, headers: started.append((status,
+                                                             headers))
+        ))
+    finally:
+        request_started.connect(close_old_connections)
+        request_finished.connect(close_old_connections)
+    status, response_headers = started[0]
+    return int(status.split()[0]), dict(response_headers), body
+
+
+class APIHandlerTests(TestCase):
+    """
+    Test the api runs through API_MIDDLEWARE, the admin through
+    MIDDLEWARE
+    """
+
+    def setUp(self) -> None:
+        self.user = get_user_model().objects.create_user(
+            email='user1@test.com', password='testpass123', name='user1'
+        )
+        self.token = Token.objects.create(user=self.user)
+        self.application = get_dispatching_wsgi_application()
+
+    def test_api_request(self):
+        """
+        Test a token authenticated api request skips the site middleware
+        """
+        status, headers, body = call(
+            self.application, LIST_USER_URL,
+            HTTP_AUTHORIZATION='Token ' + self.token.key
+        )
+
+        self.assertEqual(status, 200)
+        self.assertIn(b'user1@test.com', body)
+        self.assertNotIn('X-Frame-Options', headers)
+        self.assertNotIn('Set-Cookie', headers)
+
+    def test_admin_request(self):
+        """
+        Test the admin keeps the full middleware chain
+        """
+        status, headers, body = call(self.application, '/admin/login/')
+
+        self.assertEqual(status, 200)
+        self.assertEqual(headers['X-Frame-Options'], 'SAMEORIGIN')
+        self.assertIn('csrftoken', headers['Set-Cookie'])
+
+    def test_api_middleware(self):
+        """
+        Test the api handler loads API_MIDDLEWARE only
+        """
+        with self.settings(API_MIDDLEWARE=[]):
+            handler = APIWSGIHandler()
+
+        status, headers, body = call(
+            handler, LIST_USER_URL,
+            HTTP_AUTHORIZATION='Token ' + self.token.key
+        )
+        self.assertEqual(status, 200)
+        self.assertEqual(handler._view_middleware, [])
+
+    def test_dispatch_on_prefix(self):
+        """
+        Test the dispatcher routes on the path prefix
+        """
+        def app(name):
+            def application(environ, start_response):
+                start_response('200 OK', [])
+                return [name.encode()]
+            return application
+
+        dispatcher = PathDispatcher(app('site'), app('api'), prefix='/api/')
+
+        self.assertEqual(call(dispatcher, '/api/user/list/')[2], b'api')
+        self.assertEqual(call(dispatcher, '/apiary/')[2], b'site')
+        self.assertEqual(call(dispatcher, '/admin/')[2], b'site')
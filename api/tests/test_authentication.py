@@ -0,0 +1,205 @@
+from unittest.mock import patch
+
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from api.authentication import CachedTokenAuthentication, LRUCache, \
+    cache_key, local_cache
+
+
+LIST_USER_URL = reverse('api:user-list')
+
+
+class LRUCacheTests(TestCase):
+    """
+    Test the in-process LRU cache
+    """
+
+    def test_evicts_least_recently_used(self):
+        """
+        Test the cache keeps at most max_size entries
+        """
+        lru = LRUCache(max_size=2, timeout=60)
+        lru.set('a', 1)
+        lru.set('b', 2)
+        # Use a so b is the least recently used
+        lru.get('a')
+        lru.set('c', 3)
+
+        self.assertEqual(len(lru), 2)
+        self.assertIsNone(lru.get('b'))
+        self.assertEqual(lru.get('a'), 1)
+        self.assertEqual(lru.get('c'), 3)
+
+    def test_expired_entry(self):
+        """
+        Test an entry is dropped after its timeout
+        """
+        lru = LRUCache(max_size=2, timeout=-1)
+        lru.set('a', 1)
+        self.assertIsNone(lru.get('a'))
+
+
+class CachedTokenAuthenticationTests(TestCase):
+    """
+    Test authentication with CachedTokenAuthentication
+    """
+
+    def setUp(self) -> None:
+        local_cache.clear()
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email='user1@test.com', password='testpass123', name='user1'
+        )
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(
+            HTTP_AUTHORIZATION='Token ' + self.token.key
+        )
+
+    def test_second_request_skips_token_lookup(self):
+        """
+        Test only the first request queries the authtoken table
+        """
+        # Token lookup + page of users + users missing from the
+        # fragment cache
+        with self.assertNumQueries(3):
+            res = self.client.get(LIST_USER_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        with self.assertNumQueries(1):
+            res = self.client.get(LIST_USER_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_cached_user_fields(self):
+        """
+        Test a cache hit returns the user with its own field values
+        """
+        get_user_model().objects.filter(id=self.user.id).update(
+            avatarURL='https://avatar.test/user1', is_staff=True
+        )
+        authentication = CachedTokenAuthentication()
+        authentication.authenticate_credentials(self.token.key)
+
+        with self.assertNumQueries(0):
+            user, token = authentication.authenticate_credentials(
+                self.token.key
+            )
+            self.assertEqual(user.id, self.user.id)
+            self.assertEqual(user.email, 'user1@test.com')
+            self.assertEqual(user.name, 'user1')
+            self.assertEqual(user.avatarURL, 'https://avatar.test/user1')
+            self.assertTrue(user.is_active)
+            self.assertTrue(user.is_staff)
+            self.assertFalse(user.is_superuser)
+            self.assertFalse(user._state.adding)
+            self.assertEqual(token.user_id, self.user.id)
+
+    def test_cached_staff_user_is_admin(self):
+        """
+        Test a staff user keeps its admin access on cached requests
+        """
+        self.user.is_staff = True
+        self.user.save()
+        url = reverse('api:metrics-hashing')
+
+        statuses = [self.client.get(url).status_code for _ in range(3)]
+
+        self.assertEqual(statuses, [status.HTTP_200_OK] * 3)
+
+    @patch('api.authentication.PROCESS_LOCAL_CACHES', ())
+    def test_shared_tier_serves_other_process(self):
+        """
+        Test an empty local tier (e.g. a new process) is filled
+        from a shared cache without a query
+        """
+        self.client.get(LIST_USER_URL)
+        local_cache.clear()
+
+        with self.assertNumQueries(1):
+            self.client.get(LIST_USER_URL)
+
+        self.token.delete()
+        local_cache.clear()
+        res = self.client.get(LIST_USER_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_no_shared_tier_in_process_cache(self):
+        """
+        Test an in-process cache backend is not used as the shared
+        tier, which other processes could not invalidate
+        """
+        self.client.get(LIST_USER_URL)
+        self.assertIsNone(cache.get(cache_key(self.token.key)))
+
+        local_cache.clear()
+        # Token lookup again
+        with self.assertNumQueries(2):
+            self.client.get(LIST_USER_URL)
+
+    def test_invalid_token(self):
+        """
+        Test a wrong token is rejected.
+        This should fail
+        """
+        self.client.credentials(HTTP_AUTHORIZATION='Token wrong')
+        res = self.client.get(LIST_USER_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_update_user_invalidates(self):
+        """
+        Test updating the user through the api refreshes the snapshot
+        """
+        self.client.get(LIST_USER_URL)
+        res = self.client.patch(
+            reverse('api:user-update/', args=[self.user.id]),
+            {'name': 'newname'}
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        self.assertIsNone(local_cache.get(self.token.key))
+        # The next request reloads the user from the database, and
+        # serializes the changed user again
+        with self.assertNumQueries(3):
+            self.client.get(LIST_USER_URL)
+
+    def test_deactivated_user_is_rejected(self):
+        """
+        Test a user deactivated (e.g. in admin) cannot use the token.
+        This should fail
+        """
+        self.client.get(LIST_USER_URL)
+        self.user.is_active = False
+        self.user.save()
+
+        res = self.client.get(LIST_USER_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deleted_user_is_rejected(self):
+        """
+        Test the token of a deleted user is rejected.
+        This should fail
+        """
+        self.client.get(LIST_USER_URL)
+        self.user.delete()
+
+        res = self.client.get(LIST_USER_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_rotated_token_is_rejected(self):
+        """
+        Test the old key stops working once the token is rotated.
+        This should fail
+        """
+        self.client.get(LIST_USER_URL)
+        self.token.delete()
+        Token.objects.create(user=self.user)
+
+        res = self.client.get(LIST_USER_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
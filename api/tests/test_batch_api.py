@@ -0,0 +1,240 @@
+from unittest.mock import patch
+
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from api import views
+from api.authentication import local_cache
+
+
+BATCH_URL = reverse('api:batch')
+LIST_USER_URL = reverse('api:user-list')
+
+
+def user_detail_url(user_id):
+    """
+    Return user detail url of a specific user
+    """
+    return reverse('api:user-details/', args=[user_id])
+
+
+def user_update_url(user_id):
+    """
+    Return user update url of a specific user
+    """
+    return reverse('api:user-update/', args=[user_id])
+
+
+def get(path):
+    return {'method': 'GET', 'path': path}
+
+
+class BatchApiTests(TestCase):
+    """
+    Test the batch api
+    """
+
+    def setUp(self) -> None:
+        cache.clear()
+        local_cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email='user1@test.com', password='testpass123', name='user1'
+        )
+        self.other_user = get_user_model().objects.create_user(
+            email='user2@test.com', password='testpass123', name='user2'
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def batch(self, *requests, **payload):
+        return self.client.post(BATCH_URL, dict(payload, requests=requests),
+                                format='json')
+
+    def test_same_responses_as_requests(self):
+        """
+        Test every sub-request gets the response of its own request
+        """
+        paths = [LIST_USER_URL + '?page_size=1',
+                 user_detail_url(self.other_user.id)]
+        res = self.batch(*(get(path) for path in paths))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        for path, result in zip(paths, res.data['responses']):
+            direct = self.client.get(path)
+            self.assertEqual(result['status'], direct.status_code)
+            self.assertEqual(result['body'], direct.data)
+        self.assertEqual(res.data['responses'][1]['headers']['ETag'],
+                         direct['ETag'])
+
+    def test_authenticates_once(self):
+        """
+        Test the token is looked up once for the whole batch
+        """
+        token = Token.objects.create(user=self.user)
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
+
+        with CaptureQueriesContext(connection) as queries:
+            res = client.post(BATCH_URL, {'requests': [
+                get(user_detail_url(self.user.id)),
+                get(user_detail_url(self.other_user.id)),
+                get(LIST_USER_URL),
+            ]}, format='json')
+
+        self.assertEqual([result['status']
+                          for result in res.data['responses']], [200] * 3)
+        self.assertEqual(len([query for query in queries
+                              if 'authtoken_token' in query['sql']]), 1)
+
+    def test_reads_see_previous_writes(self):
+        """
+        Test a write is visible to the sub-requests after it
+        """
+        res = self.batch(
+            get(user_detail_url(self.user.id)),
+            {'method': 'PATCH', 'path': user_update_url(self.user.id),
+             'body': {'name': 'new name'}},
+            get(user_detail_url(self.user.id)),
+            concurrent=True
+        )
+
+        names = [result['body']['name'] for result in res.data['responses']]
+        self.assertEqual(names, ['user1', 'new name', 'new name'])
+
+    def test_sub_request_errors(self):
+        """
+        Test a failing sub-request does not fail the batch
+        """
+        res = self.batch(
+            get('/api/nothing/'),
+            get(user_detail_url(self.other_user.id + 100)),
+            {'method': 'PATCH', 'path': user_update_url(self.other_user.id),
+             'body': {'name': 'not mine'}},
+            get(BATCH_URL),
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([result['status']
+                          for result in res.data['responses']],
+                         [404, 404, 403, 400])
+
+    def test_sub_request_exception(self):
+        """
+        Test an exception of a view answers 500 for its sub-request only
+        """
+        with patch.object(views.ListUserAPIView, 'list',
+                          side_effect=RuntimeError('boom')), \
+                self.assertLogs('api.batch', 'ERROR'):
+            res = self.batch(get(LIST_USER_URL),
+                             get(user_detail_url(self.other_user.id)))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([result['status']
+                          for result in res.data['responses']],
+                         [500, 200])
+
+    def test_streaming_not_supported(self):
+        """
+        Test a streaming response is refused.
+        This should fail
+        """
+        self.user.is_staff = True
+        self.user.save()
+
+        res = self.batch(get(reverse('api:export', args=['users'])))
+
+        self.assertEqual(res.data['responses'][0]['status'],
+                         status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(BATCH_MAX_REQUESTS=2)
+    def test_too_many_requests(self):
+        """
+        Test a batch over BATCH_MAX_REQUESTS is rejected.
+        This should fail
+        """
+        res = self.batch(*[get(LIST_USER_URL)] * 3)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_invalid_sub_request(self):
+        """
+        Test a path out of the api or an unknown method is rejected.
+        This should fail
+        """
+        res = self.batch(get('/admin/'))
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+        res = self.batch({'method': 'TRACE', 'path': LIST_USER_URL})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_login_required(self):
+        """
+        Test the batch needs authentication.
+        This should fail
+        """
+        res = APIClient().post(BATCH_URL, {'requests': [get(LIST_USER_URL)]},
+                               format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class ConcurrentBatchApiTests(TransactionTestCase):
+    """
+    Test the reads of a concurrent batch run on the thread pool.
+    Committed data, so the pool threads can read it
+    """
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.client = APIClient()
+        self.users = [
+            get_user_model().objects.create_user(
+                email='user{}@test.com'.format(i), password='testpass123',
+                name='user{}'.format(i)
+            )
+            for i in range(4)
+        ]
+        self.client.force_authenticate(user=self.users[0])
+
+    def test_concurrent_reads_keep_order(self):
+        """
+        Test concurrent reads answer in the order of the requests
+        """
+        res = self.client.post(BATCH_URL, {
+            'requests': [get(user_detail_url(user.id))
+                         for user in self.users],
+            'concurrent': True,
+        }, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([result['body']['name']
+                          for result in res.data['responses']],
+                         ['user0', 'user1', 'user2', 'user3'])
+
+    def test_concurrent_read_exception(self):
+        """
+        Test an exception of a view in a pool thread answers 500 for its
+        sub-request only
+        """
+        with patch.object(views.ListUserAPIView, 'list',
+                          side_effect=RuntimeError('boom')), \
+                self.assertLogs('api.batch', 'ERROR'):
+            res = self.client.post(BATCH_URL, {
+                'requests': [get(user_detail_url(self.users[1].id)),
+                             get(LIST_USER_URL),
+                             get(user_detail_url(self.users[2].id))],
+                'concurrent': True,
+            }, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([result['status']
+                          for result in res.data['responses']],
+                         [200, 500, 200])
@@ -0,0 +1,149 @@
+from unittest.mock import patch
+
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.utils.http import http_date
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from api import serializers
+from core.models import Follow, Tweet
+
+
+def user_detail_url(user_id):
+    """
+    Return user detail url of a specific user
+    """
+    return reverse('api:user-details/', args=[user_id])
+
+
+def user_update_url(user_id):
+    """
+    Return user update url of a specific user
+    """
+    return reverse('api:user-update/', args=[user_id])
+
+
+def tweet_detail_url(tweet_id):
+    """
+    Return tweet detail url of a specific tweet
+    """
+    return reverse('api:tweet-details', args=[tweet_id])
+
+
+class ConditionalRequestApiTests(TestCase):
+    """
+    Test ETag / Last-Modified on the user and tweet detail apis
+    """
+
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email='user1@test.com', password='testpass123', name='user1'
+        )
+        self.other_user = get_user_model().objects.create_user(
+            email='user2@test.com', password='testpass123', name='user2'
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def test_user_not_modified(self):
+        """
+        Test a matching If-None-Match gets a 304 after one query,
+        without serializing the user
+        """
+        url = user_detail_url(self.other_user.id)
+        res = self.client.get(url)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res['ETag'])
+        self.assertTrue(res['Last-Modified'])
+
+        with self.assertNumQueries(1), \
+                patch.object(serializers.UserProfileSerializer,
+                             'to_representation') as to_representation:
+            res2 = self.client.get(url, HTTP_IF_NONE_MATCH=res['ETag'])
+
+        self.assertEqual(res2.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(res2['ETag'], res['ETag'])
+        to_representation.assert_not_called()
+
+    def test_user_modified(self):
+        """
+        Test a change of the stored counters changes the ETag
+        """
+        url = user_detail_url(self.other_user.id)
+        etag = self.client.get(url)['ETag']
+
+        Follow.objects.follow(self.user, self.other_user)
+        res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(res['ETag'], etag)
+        self.assertEqual(res.data['follower_count'], 1)
+
+    def test_user_if_modified_since(self):
+        """
+        Test If-Modified-Since at or after Last-Modified gets a 304
+        """
+        url = user_detail_url(self.other_user.id)
+        last_modified = self.client.get(url)['Last-Modified']
+
+        res = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        res = self.client.get(url, HTTP_IF_MODIFIED_SINCE=http_date(0))
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_unknown_user(self):
+        """
+        Test a conditional request on a missing user.
+        This should fail
+        """
+        res = self.client.get(user_detail_url(999), HTTP_IF_NONE_MATCH='"x"')
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_tweet_etag_follows_likes(self):
+        """
+        Test the tweet ETag changes when the tweet is liked, and
+        depends on whether the viewer liked it
+        """
+        tweet = Tweet.objects.create(text='A tweet', author=self.other_user)
+        url = tweet_detail_url(tweet.id)
+        etag = self.client.get(url)['ETag']
+
+        res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        tweet.toggle(self.user)
+        res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res.data['liked'])
+
+        self.client.force_authenticate(user=self.other_user)
+        other_etag = self.client.get(url)['ETag']
+        self.assertNotEqual(other_etag, res['ETag'])
+
+    def test_update_if_match(self):
+        """
+        Test an update with a stale If-Match fails with 412,
+        and succeeds with the current ETag
+        """
+        url = user_update_url(self.user.id)
+        etag = self.client.get(user_detail_url(self.user.id))['ETag']
+
+        res = self.client.patch(url, {'name': 'new name'},
+                                HTTP_IF_MATCH=etag)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(res['ETag'], etag)
+
+        res2 = self.client.patch(url, {'name': 'newer name'},
+                                 HTTP_IF_MATCH=etag)
+        self.assertEqual(res2.status_code,
+                         status.HTTP_412_PRECONDITION_FAILED)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.name, 'new name')
+
+        res3 = self.client.get(user_detail_url(self.user.id),
+                               HTTP_IF_NONE_MATCH=res['ETag'])
+        self.assertEqual(res3.status_code, status.HTTP_304_NOT_MODIFIED)
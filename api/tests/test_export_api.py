@@ -0,0 +1,78 @@
+import gzip
+import json
+
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+
+def export_url(name):
+    """
+    Return the export url of a table
+    """
+    return reverse('api:export', args=[name])
+
+
+class ExportApiTests(TestCase):
+    """
+    Test the streaming export api
+    """
+
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.admin = get_user_model().objects.create_superuser(
+            email='admin@test.com', password='testpass123', name='admin'
+        )
+        self.user = get_user_model().objects.create_user(
+            email='user1@test.com', password='testpass123', name='user1'
+        )
+        self.client.force_authenticate(user=self.admin)
+
+    def read_rows(self, res):
+        data = b''.join(res.streaming_content)
+        return [json.loads(line) for line in data.decode().splitlines()]
+
+    def test_export_requires_admin(self):
+        """
+        Test a user who is not admin cannot export.
+        This should fail
+        """
+        self.client.force_authenticate(user=self.user)
+        res = self.client.get(export_url('users'))
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_export_users(self):
+        """
+        Test stream the users as NDJSON, resuming after an id
+        """
+        res = self.client.get(export_url('users'))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res['Content-Type'], 'application/x-ndjson')
+        self.assertEqual([row['id'] for row in self.read_rows(res)],
+                         [self.admin.id, self.user.id])
+
+        res = self.client.get(export_url('users'), {'after': self.admin.id})
+        self.assertEqual([row['id'] for row in self.read_rows(res)],
+                         [self.user.id])
+
+    def test_export_gzip(self):
+        """
+        Test stream the export compressed with gzip
+        """
+        res = self.client.get(export_url('users'), {'gzip': '1'})
+
+        self.assertEqual(res['Content-Type'], 'application/gzip')
+        rows = gzip.decompress(b''.join(res.streaming_content)).splitlines()
+        self.assertEqual(len(rows), 2)
+
+    def test_export_unknown_table(self):
+        """
+        Test export a table that cannot be exported.
+        This should fail
+        """
+        res = self.client.get(export_url('passwords'))
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,77 @@
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ImproperlyConfigured
+
+from rest_framework.renderers import JSONRenderer
+
+from api import serializers
+from api.fastpath import ValuesSerializer
+from core.models import Tweet
+
+
+class ValuesSerializerTests(TestCase):
+    """
+    Test the fast path renders the same JSON as the serializers
+    """
+
+    def setUp(self) -> None:
+        user_model = get_user_model()
+        self.user = user_model.objects.create_user(
+            email='user1@test.com', password='testpass123', name='user1',
+            avatarURL='https://avatar.test/user1'
+        )
+        # Unicode, quotes and an empty avatar
+        self.other_user = user_model.objects.create_user(
+            email='user2@test.com', password='testpass123',
+            name='Zoë "the" <user>', avatarURL=''
+        )
+        user_model.objects.create_superuser(
+            email='admin@test.com', password='testpass123', name='admin'
+        )
+        user_model.objects.filter(id=self.user.id).update(
+            follower_count=3, following_count=2
+        )
+        tweet = Tweet.objects.create(author=self.user, text='hello ✨')
+        Tweet.objects.create(author=self.other_user, text='re: hello',
+                             replying_to=tweet)
+
+    def assertSameJson(self, serializer_class, queryset):
+        expected = JSONRenderer().render(
+            serializer_class(queryset, many=True).data
+        )
+        fast = ValuesSerializer(serializer_class).serialize(queryset)
+
+        self.assertEqual(JSONRenderer().render(fast), expected)
+
+    def test_user_parity(self):
+        """
+        Test the users render byte for byte like UserProfileSerializer,
+        without their password
+        """
+        queryset = get_user_model().objects.order_by('id')
+
+        self.assertSameJson(serializers.UserProfileSerializer, queryset)
+        self.assertNotIn('password', serializers.user_values.names)
+
+    def test_tweet_parity(self):
+        """
+        Test related primary keys and datetimes render like the
+        serializer
+        """
+        self.assertSameJson(serializers.RepliedTweetSerializer,
+                            Tweet.objects.order_by('id'))
+
+    def test_one_query(self):
+        """
+        Test serializing a queryset costs one query
+        """
+        with self.assertNumQueries(1):
+            serializers.user_values.serialize(get_user_model().objects.all())
+
+    def test_nested_serializer_not_supported(self):
+        """
+        Test a nested serializer field is refused.
+        This should fail
+        """
+        with self.assertRaises(ImproperlyConfigured):
+            ValuesSerializer(serializers.TweetSerializer)
@@ -0,0 +1,150 @@
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Follow
+
+
+FOLLOWING_LOOKUP_URL = reverse('api:user-following-lookup')
+
+
+def user_follow_url(user_id):
+    """
+    Return follow url of a specific user
+    """
+    return reverse('api:user-follow', args=[user_id])
+
+
+def user_followers_url(user_id):
+    """
+    Return followers url of a specific user
+    """
+    return reverse('api:user-followers', args=[user_id])
+
+
+def user_following_url(user_id):
+    """
+    Return following url of a specific user
+    """
+    return reverse('api:user-following', args=[user_id])
+
+
+class FollowApiTests(TestCase):
+    """
+    Test the follow api
+    """
+
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.users = [
+            get_user_model().objects.create_user(
+                email='user{}@test.com'.format(i),
+                name='user{}'.format(i),
+                password='testpass123'
+            )
+            for i in range(4)
+        ]
+        self.user = self.users[0]
+        self.client.force_authenticate(user=self.user)
+
+    def test_follow_without_authentication(self):
+        """
+        Test follow a user without authentication.
+        This should fail
+        """
+        self.client.force_authenticate(user=None)
+        res = self.client.post(user_follow_url(self.users[1].id))
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_follow_and_unfollow(self):
+        """
+        Test follow a user then stop following them
+        """
+        other = self.users[1]
+        res = self.client.post(user_follow_url(other.id))
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(Follow.objects.filter(follower=self.user,
+                                              followee=other).exists())
+
+        res = self.client.delete(user_follow_url(other.id))
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertFalse(Follow.objects.exists())
+
+    def test_follow_self(self):
+        """
+        Test follow yourself.
+        This should fail
+        """
+        res = self.client.post(user_follow_url(self.user.id))
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_counts_in_user_details(self):
+        """
+        Test the user details show the stored follow counters
+        """
+        Follow.objects.follow(self.user, self.users[1])
+        res = self.client.get(reverse('api:user-details/',
+                                      args=[self.users[1].id]))
+        self.assertEqual(res.data['follower_count'], 1)
+        self.assertEqual(res.data['following_count'], 0)
+
+    def test_list_followers(self):
+        """
+        Test list the followers of a user in pages, one query per page
+        after the lookup of the user
+        """
+        for follower in self.users[1:]:
+            Follow.objects.follow(follower, self.user)
+
+        with self.assertNumQueries(2):
+            res = self.client.get(user_followers_url(self.user.id),
+                                  {'page_size': 2})
+        ids = [user['id'] for user in res.data['results']]
+        res = self.client.get(res.data['next'])
+        ids += [user['id'] for user in res.data['results']]
+
+        self.assertEqual(ids, [user.id for user in self.users[1:]])
+
+    def test_list_following(self):
+        """
+        Test list the users a user follows
+        """
+        Follow.objects.follow(self.user, self.users[2])
+        res = self.client.get(user_following_url(self.user.id))
+        self.assertEqual([user['id'] for user in res.data['results']],
+                         [self.users[2].id])
+
+    def test_list_follows_of_unknown_user(self):
+        """
+        Test list the follows of a user that does not exist or of a
+        malformed id.
+        This should fail
+        """
+        for url in (user_followers_url(0), user_following_url(0),
+                    user_followers_url('abc'), user_following_url('abc')):
+            res = self.client.get(url)
+            self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_following_lookup(self):
+        """
+        Test which of the given users the login user follows
+        """
+        Follow.objects.follow(self.user, self.users[1])
+        Follow.objects.follow(self.user, self.users[3])
+        ids = ','.join(str(user.id) for user in self.users[1:3])
+
+        res = self.client.get(FOLLOWING_LOOKUP_URL, {'ids': ids})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['following'], [self.users[1].id])
+
+    def test_following_lookup_invalid_ids(self):
+        """
+        Test lookup with ids that are not integers.
+        This should fail
+        """
+        res = self.client.get(FOLLOWING_LOOKUP_URL, {'ids': '1,a'})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
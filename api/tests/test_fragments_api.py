@@ -0,0 +1,138 @@
+from unittest.mock import patch
+
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from api.serializers import user_fragments, user_values
+
+
+LIST_USER_URL = reverse('api:user-list')
+
+
+def user_detail_url(user_id):
+    """
+    Return user detail url of a specific user
+    """
+    return reverse('api:user-details/', args=[user_id])
+
+
+def user_update_url(user_id):
+    """
+    Return user update url of a specific user
+    """
+    return reverse('api:user-update/', args=[user_id])
+
+
+class FragmentCacheApiTests(TestCase):
+    """
+    Test the user list and detail apis served from the fragment cache
+    """
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email='user1@test.com', password='testpass123', name='user1'
+        )
+        self.other_user = get_user_model().objects.create_user(
+            email='user2@test.com', password='testpass123', name='user2'
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def test_warm_list_serializes_nothing(self):
+        """
+        Test a second list request is one query, without serializing
+        """
+        res = self.client.get(LIST_USER_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        with self.assertNumQueries(1), \
+                patch.object(user_fragments, 'fetch') as fetch:
+            res2 = self.client.get(LIST_USER_URL)
+
+        self.assertEqual(res2.data, res.data)
+        fetch.assert_not_called()
+
+    def test_list_serializes_only_misses(self):
+        """
+        Test only the users missing from the cache are serialized
+        """
+        self.client.get(user_detail_url(self.other_user.id))
+
+        with patch.object(user_values, 'represent',
+                          wraps=user_values.represent) as represent:
+            res = self.client.get(LIST_USER_URL)
+
+        self.assertEqual([user['id'] for user in res.data['results']],
+                         [self.user.id, self.other_user.id])
+        self.assertEqual(represent.call_count, 1)
+        self.assertEqual(res.data['results'][0]['id'], self.user.id)
+
+    def test_update_serves_new_representation(self):
+        """
+        Test a user updated through the api is served fresh and the
+        previous representation is forgotten
+        """
+        self.client.get(LIST_USER_URL)
+        previous = get_user_model().objects.get(id=self.user.id)
+
+        res = self.client.patch(user_update_url(self.user.id),
+                                {'name': 'new name'})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        self.assertIsNone(user_fragments.get(
+            previous.id, previous.version, previous.updated_at
+        ))
+        res = self.client.get(LIST_USER_URL)
+        self.assertEqual(res.data['results'][0]['name'], 'new name')
+        res = self.client.get(user_detail_url(self.user.id))
+        self.assertEqual(res.data['name'], 'new name')
+
+    def test_save_serves_new_representation(self):
+        """
+        Test a user saved outside the api (e.g. admin) is served fresh
+        """
+        self.client.get(user_detail_url(self.other_user.id))
+        self.other_user.name = 'renamed'
+        self.other_user.save()
+
+        res = self.client.get(user_detail_url(self.other_user.id))
+
+        self.assertEqual(res.data['name'], 'renamed')
+
+    def test_delete_forgets_representation(self):
+        """
+        Test deleting a user drops its cached representation
+        """
+        self.client.get(user_detail_url(self.other_user.id))
+        self.other_user.refresh_from_db()
+        self.assertIsNotNone(user_fragments.get(
+            self.other_user.id, self.other_user.version,
+            self.other_user.updated_at
+        ))
+
+        get_user_model().objects.get(id=self.other_user.id).delete()
+
+        self.assertIsNone(user_fragments.get(
+            self.other_user.id, self.other_user.version,
+            self.other_user.updated_at
+        ))
+        res = self.client.get(user_detail_url(self.other_user.id))
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_detail_hit_is_one_query(self):
+        """
+        Test a cached user detail costs the version lookup only
+        """
+        res = self.client.get(user_detail_url(self.other_user.id))
+
+        with self.assertNumQueries(1):
+            res2 = self.client.get(user_detail_url(self.other_user.id))
+
+        self.assertEqual(res2.data, res.data)
+        self.assertEqual(res2['ETag'], res['ETag'])
@@ -0,0 +1,90 @@
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from api.pagination import decode_cursor, encode_cursor
+
+
+LIST_USER_URL = reverse('api:user-list')
+
+
+class CursorTests(TestCase):
+    """
+    Test encoding and decoding of opaque cursors
+    """
+
+    def test_cursor_round_trip(self):
+        """
+        Test a cursor decodes back to its values
+        """
+        cursor = encode_cursor(['2022-03-06T09:11:00.123456+00:00', 42])
+        self.assertEqual(decode_cursor(cursor),
+                         ['2022-03-06T09:11:00.123456+00:00', 42])
+
+    def test_malformed_cursor(self):
+        """
+        Test a malformed cursor raises ValueError
+        """
+        with self.assertRaises(ValueError):
+            decode_cursor('not a cursor')
+
+
+class UserListPaginationTests(TestCase):
+    """
+    Test keyset pagination of the user list
+    """
+
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.users = [
+            get_user_model().objects.create_user(
+                email='user{}@test.com'.format(i),
+                name='user{}'.format(i),
+                password='testpass123'
+            )
+            for i in range(5)
+        ]
+        self.client.force_authenticate(user=self.users[0])
+
+    def test_walk_all_pages(self):
+        """
+        Test following next links returns every user once, in id order
+        """
+        ids = []
+        url = LIST_USER_URL + '?page_size=2'
+        while url:
+            res = self.client.get(url)
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            self.assertLessEqual(len(res.data['results']), 2)
+            ids.extend(user['id'] for user in res.data['results'])
+            url = res.data['next']
+
+        self.assertEqual(ids, [user.id for user in self.users])
+
+    def test_page_does_not_count(self):
+        """
+        Test a page costs a single query whatever the page, no COUNT(*),
+        plus one for the users missing from the fragment cache
+        """
+        res = self.client.get(LIST_USER_URL, {'page_size': 2})
+        with self.assertNumQueries(2):
+            self.client.get(res.data['next'])
+
+    @override_settings(API_MAX_PAGE_SIZE=3)
+    def test_page_size_is_capped(self):
+        """
+        Test a page size above API_MAX_PAGE_SIZE is capped
+        """
+        res = self.client.get(LIST_USER_URL, {'page_size': 1000})
+        self.assertEqual(len(res.data['results']), 3)
+        self.assertIsNotNone(res.data['next'])
+
+    def test_invalid_cursor(self):
+        """
+        Test an invalid cursor returns 404
+        """
+        res = self.client.get(LIST_USER_URL, {'cursor': 'garbage'})
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
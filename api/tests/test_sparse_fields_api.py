@@ -0,0 +1,104 @@
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+
+LIST_USER_URL = reverse('api:user-list')
+
+
+def user_detail_url(user_id):
+    """
+    Return user detail url of a specific user
+    """
+    return reverse('api:user-details/', args=[user_id])
+
+
+class SparseFieldsApiTests(TestCase):
+    """
+    Test ?fields= on the user list and detail apis
+    """
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email='user1@test.com', password='testpass123', name='user1',
+            avatarURL='https://avatar.test/user1'
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def test_list_fields(self):
+        """
+        Test the list returns and selects only the requested fields
+        """
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(LIST_USER_URL,
+                                  {'fields': 'avatarURL,id,name'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['results'], [{
+            'id': self.user.id, 'name': 'user1',
+            'avatarURL': 'https://avatar.test/user1',
+        }])
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('password', queries[0]['sql'])
+        self.assertNotIn('email', queries[0]['sql'])
+
+    def test_detail_fields(self):
+        """
+        Test the detail returns only the requested fields, with an ETag
+        of its own, with one query
+        """
+        url = user_detail_url(self.user.id)
+        full = self.client.get(url)
+
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(url, {'fields': 'name'})
+
+        self.assertEqual(res.data, {'name': 'user1'})
+        self.assertEqual(len(queries), 1)
+        self.assertNotEqual(res['ETag'], full['ETag'])
+        self.assertFalse(any('password' in query['sql']
+                             for query in queries))
+        res2 = self.client.get(url, {'fields': 'name'},
+                               HTTP_IF_NONE_MATCH=res['ETag'])
+        self.assertEqual(res2.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_sparse_does_not_fill_cache(self):
+        """
+        Test a sparse representation is not served to full requests
+        """
+        url = user_detail_url(self.user.id)
+        self.client.get(url, {'fields': 'id'})
+
+        res = self.client.get(url)
+
+        self.assertEqual(res.data['email'], 'user1@test.com')
+        self.assertEqual(res.data['follower_count'], 0)
+
+    def test_unknown_field(self):
+        """
+        Test a field out of the whitelist is rejected.
+        This should fail
+        """
+        res = self.client.get(LIST_USER_URL, {'fields': 'name,password'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('fields', res.data)
+
+    def test_empty_fields(self):
+        """
+        Test an empty fields returns every field
+        """
+        res = self.client.get(user_detail_url(self.user.id), {'fields': ''})
+
+        self.assertEqual(set(res.data), {
+            'id', 'email', 'name', 'avatarURL', 'follower_count',
+            'following_count'
+        })
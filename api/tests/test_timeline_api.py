@@ -0,0 +1,59 @@
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Tweet
+
+
+TIMELINE_URL = reverse('api:timeline')
+
+
+class TimelineApiTests(TestCase):
+    """
+    Test the home timeline api
+    """
+
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email='user1@test.com', password='testpass123', name='user1'
+        )
+        self.other_user = get_user_model().objects.create_user(
+            email='user2@test.com', password='testpass123', name='user2'
+        )
+
+    def test_timeline_without_authentication(self):
+        """
+        Test get the timeline without authentication.
+        This should fail
+        """
+        res = self.client.get(TIMELINE_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_timeline(self):
+        """
+        Test the timeline lists the tweets of the user, newest first,
+        one query per page
+        """
+        self.client.force_authenticate(user=self.user)
+        tweets = [
+            Tweet.objects.create(text='Tweet {}'.format(i), author=self.user)
+            for i in range(3)
+        ]
+        Tweet.objects.create(text='Not in timeline', author=self.other_user)
+        tweets[0].toggle(self.user)
+
+        with self.assertNumQueries(1):
+            res = self.client.get(TIMELINE_URL, {'page_size': 2})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([tweet['id'] for tweet in res.data['results']],
+                         [tweets[2].id, tweets[1].id])
+
+        res = self.client.get(res.data['next'])
+        self.assertEqual([tweet['id'] for tweet in res.data['results']],
+                         [tweets[0].id])
+        self.assertTrue(res.data['results'][0]['liked'])
+        self.assertIsNone(res.data['next'])
@@ -0,0 +1,402 @@
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+from django.db import NotSupportedError
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Tweet
+
+
+LIST_TWEET_URL = reverse('api:tweet-list')
+CREATE_TWEET_URL = reverse('api:tweet-create')
+BULK_CREATE_TWEET_URL = reverse('api:tweet-bulk-create')
+SEARCH_TWEET_URL = reverse('api:tweet-search')
+
+
+def tweet_detail_url(tweet_id):
+    """
+    Return tweet detail url of a specific tweet
+    """
+    return reverse('api:tweet-details', args=[tweet_id])
+
+
+def tweet_reply_url(tweet_id):
+    """
+    Return reply url of a specific tweet
+    """
+    return reverse('api:tweet-reply', args=[tweet_id])
+
+
+def tweet_like_url(tweet_id):
+    """
+    Return like url of a specific tweet
+    """
+    return reverse('api:tweet-like', args=[tweet_id])
+
+
+def tweet_thread_url(tweet_id):
+    """
+    Return thread url of a specific tweet
+    """
+    return reverse('api:tweet-thread', args=[tweet_id])
+
+
+def tweet_conversation_url(tweet_id):
+    """
+    Return conversation url of a specific tweet
+    """
+    return reverse('api:tweet-conversation', args=[tweet_id])
+
+
+class PublicTweetApiTests(TestCase):
+    """
+    Test tweet api without authentication
+    """
+
+    def setUp(self) -> None:
+        self.client = APIClient()
+
+    def test_list_tweets_without_authentication(self):
+        """
+        Test list tweets without authentication.
+        This should fail
+        """
+        res = self.client.get(LIST_TWEET_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_create_tweet_without_authentication(self):
+        """
+        Test create a tweet without authentication.
+        This should fail
+        """
+        res = self.client.post(CREATE_TWEET_URL, {'text': 'A tweet'})
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class PrivateTweetApiTests(TestCase):
+    """
+    Test tweet api with authentication
+    """
+
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email='user1@test.com', password='testpass123', name='user1'
+        )
+        self.other_user = get_user_model().objects.create_user(
+            email='user2@test.com', password='testpass123', name='user2'
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def sample_tweets(self, count, author=None):
+        """
+        Create count tweets, half of them replies, and return them
+        """
+        author = author or self.other_user
+        root = Tweet.objects.create(text='Root tweet', author=author)
+        tweets = [root]
+        for i in range(count - 1):
+            tweets.append(Tweet.objects.create(
+                text='Tweet {}'.format(i), author=author,
+                replying_to=root if i % 2 else None
+            ))
+        return tweets
+
+    def test_create_tweet(self):
+        """
+        Test create a tweet.
+        This should success
+        """
+        res = self.client.post(CREATE_TWEET_URL, {'text': 'A sample tweet'})
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        tweet = Tweet.objects.get(id=res.data['id'])
+        self.assertEqual(tweet.text, 'A sample tweet')
+        self.assertEqual(tweet.author, self.user)
+        self.assertEqual(res.data['author']['id'], self.user.id)
+        self.assertFalse(res.data['liked'])
+
+    def test_create_tweet_with_blank_text(self):
+        """
+        Test create a tweet with only spaces.
+        This should fail
+        """
+        res = self.client.post(CREATE_TWEET_URL, {'text': '   '})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_create_tweet_with_long_text(self):
+        """
+        Test create a tweet exceed 160 characters.
+        This should fail
+        """
+        res = self.client.post(CREATE_TWEET_URL, {'text': 'a' * 161})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Tweet.objects.exists())
+
+    def test_retrieve_tweet(self):
+        """
+        Test retrieve a tweet with its counters
+        """
+        tweet = self.sample_tweets(4)[0]
+        tweet.toggle(self.user)
+
+        res = self.client.get(tweet_detail_url(tweet.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['text'], tweet.text)
+        self.assertEqual(res.data['author']['id'], self.other_user.id)
+        self.assertEqual(res.data['like_count'], 1)
+        self.assertEqual(res.data['reply_count'], 1)
+        self.assertTrue(res.data['liked'])
+
+    def test_reply_tweet(self):
+        """
+        Test reply to a tweet
+        """
+        tweet = self.sample_tweets(1)[0]
+
+        res = self.client.post(tweet_reply_url(tweet.id), {'text': 'Reply'})
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data['replying_to']['id'], tweet.id)
+        tweet.refresh_from_db()
+        self.assertEqual(tweet.reply_count, 1)
+
+    def test_reply_unknown_tweet(self):
+        """
+        Test reply to a tweet that does not exist.
+        This should fail
+        """
+        res = self.client.post(tweet_reply_url(999), {'text': 'Reply'})
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_like_and_unlike_tweet(self):
+        """
+        Test like a tweet, then like again to remove the like
+        """
+        tweet = self.sample_tweets(1)[0]
+
+        res = self.client.post(tweet_like_url(tweet.id))
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data, {'liked': True, 'like_count': 1})
+
+        res = self.client.post(tweet_like_url(tweet.id))
+        self.assertEqual(res.data, {'liked': False, 'like_count': 0})
+
+    def test_list_tweets_newest_first(self):
+        """
+        Test the tweets are listed newest first across pages
+        """
+        tweets = self.sample_tweets(5)
+        ids = []
+        url = LIST_TWEET_URL + '?page_size=2'
+        while url:
+            res = self.client.get(url)
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            ids.extend(tweet['id'] for tweet in res.data['results'])
+            url = res.data['next']
+
+        self.assertEqual(ids, [tweet.id for tweet in reversed(tweets)])
+
+    @override_settings(API_MAX_PAGE_SIZE=500)
+    def test_list_tweets_query_budget(self):
+        """
+        Test a page of tweets costs one query whatever the page size,
+        so the serializer cannot bring back N+1 queries
+        """
+        tweets = self.sample_tweets(500)
+        for tweet in tweets[::3]:
+            tweet.toggle(self.user)
+
+        for page_size in (1, 50, 500):
+            with self.assertNumQueries(1):
+                res = self.client.get(LIST_TWEET_URL,
+                                      {'page_size': page_size})
+            self.assertEqual(len(res.data['results']), page_size)
+
+    def test_retrieve_tweet_query_budget(self):
+        """
+        Test retrieve a reply costs one query
+        """
+        reply = self.sample_tweets(3)[-1]
+        with self.assertNumQueries(1):
+            self.client.get(tweet_detail_url(reply.id))
+
+    def test_thread(self):
+        """
+        Test retrieve the reply tree of a tweet in one query
+        """
+        root = Tweet.objects.create(text='Root', author=self.other_user)
+        reply = Tweet.objects.create(text='Reply', author=self.user,
+                                     replying_to=root)
+        Tweet.objects.create(text='Reply of reply', author=self.other_user,
+                             replying_to=reply)
+
+        with self.assertNumQueries(1):
+            res = self.client.get(tweet_thread_url(root.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertFalse(res.data['truncated'])
+        self.assertEqual(
+            [(tweet['text'], tweet['thread_depth'], tweet['replying_to'])
+             for tweet in res.data['results']],
+            [('Root', 0, None), ('Reply', 1, root.id),
+             ('Reply of reply', 2, reply.id)]
+        )
+
+    def test_thread_truncated(self):
+        """
+        Test the thread reports when the limit truncates it
+        """
+        root = Tweet.objects.create(text='Root', author=self.other_user)
+        for i in range(3):
+            Tweet.objects.create(text='Reply', author=self.user,
+                                 replying_to=root)
+
+        res = self.client.get(tweet_thread_url(root.id), {'limit': 2})
+
+        self.assertTrue(res.data['truncated'])
+        self.assertEqual(len(res.data['results']), 2)
+
+    def test_thread_unknown_tweet(self):
+        """
+        Test the thread of a tweet that does not exist.
+        This should fail
+        """
+        res = self.client.get(tweet_thread_url(999))
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_conversation(self):
+        """
+        Test list the whole conversation of a reply, oldest first
+        """
+        root = Tweet.objects.create(text='Root', author=self.other_user)
+        reply = Tweet.objects.create(text='Reply', author=self.user,
+                                     replying_to=root)
+        last = Tweet.objects.create(text='Reply of reply',
+                                    author=self.other_user,
+                                    replying_to=reply)
+        Tweet.objects.create(text='Other', author=self.user)
+
+        # One query to find the root, one for the page
+        with self.assertNumQueries(2):
+            res = self.client.get(tweet_conversation_url(last.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([tweet['id'] for tweet in res.data['results']],
+                         [root.id, reply.id, last.id])
+
+    def test_conversation_of_unknown_tweet(self):
+        """
+        Test list the conversation of a tweet that does not exist or of a
+        malformed id.
+        This should fail
+        """
+        for tweet_id in (0, 'abc'):
+            res = self.client.get(tweet_conversation_url(tweet_id))
+            self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_search(self):
+        """
+        Test search tweets, one page after the other
+        """
+        tweets = [
+            Tweet.objects.create(text='Search me {}'.format(i),
+                                 author=self.other_user)
+            for i in range(3)
+        ]
+        Tweet.objects.create(text='Not me', author=self.user)
+
+        res = self.client.get(SEARCH_TWEET_URL,
+                              {'q': 'search', 'page_size': 2})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data['results']), 2)
+        self.assertIn('liked', res.data['results'][0])
+        res2 = self.client.get(res.data['next'])
+        self.assertIsNone(res2.data['next'])
+        ids = [tweet['id']
+               for tweet in res.data['results'] + res2.data['results']]
+        self.assertEqual(sorted(ids), [tweet.id for tweet in tweets])
+
+    def test_search_by_author(self):
+        """
+        Test search tweets of some authors only
+        """
+        Tweet.objects.create(text='Hello', author=self.other_user)
+        mine = Tweet.objects.create(text='Hello', author=self.user)
+
+        res = self.client.get(SEARCH_TWEET_URL,
+                              {'q': 'hello', 'author': str(self.user.id)})
+
+        self.assertEqual([tweet['id'] for tweet in res.data['results']],
+                         [mine.id])
+
+    def test_search_without_query(self):
+        """
+        Test search without terms.
+        This should fail
+        """
+        res = self.client.get(SEARCH_TWEET_URL, {'q': ' '})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_search_not_supported(self):
+        """
+        Test search on a database without full-text index.
+        This should fail
+        """
+        with patch('core.search.check_supported',
+                   side_effect=NotSupportedError('Not on this database')):
+            res = self.client.get(SEARCH_TWEET_URL, {'q': 'hello'})
+
+        self.assertEqual(res.status_code, status.HTTP_501_NOT_IMPLEMENTED)
+        self.assertEqual(res.data['detail'], 'Not on this database')
+
+
+class BulkCreateTweetApiTests(TestCase):
+    """
+    Test the bulk tweet creation api
+    """
+
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.admin = get_user_model().objects.create_superuser(
+            email='admin@test.com', password='testpass123', name='admin'
+        )
+        self.client.force_authenticate(user=self.admin)
+
+    def test_bulk_create_requires_admin(self):
+        """
+        Test a user who is not admin cannot create tweets in bulk.
+        This should fail
+        """
+        user = get_user_model().objects.create_user(
+            email='user1@test.com', password='testpass123', name='user1'
+        )
+        self.client.force_authenticate(user=user)
+        res = self.client.post(BULK_CREATE_TWEET_URL, [], format='json')
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_bulk_create_from_json_list(self):
+        """
+        Test create tweets from a JSON list, reporting invalid ones
+        """
+        root = Tweet.objects.create(text='Root', author=self.admin)
+        payload = [
+            {'text': 'A tweet', 'author': self.admin.id},
+            {'text': 'a' * 161, 'author': self.admin.id},
+            {'text': 'A reply', 'author': self.admin.id,
+             'replying_to': root.id},
+        ]
+        res = self.client.post(BULK_CREATE_TWEET_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['created'], 2)
+        self.assertEqual([error['line'] for error in res.data['errors']],
+                         [2])
+        root.refresh_from_db()
+        self.assertEqual(root.reply_count, 1)
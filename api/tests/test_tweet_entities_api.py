@@ -0,0 +1,91 @@
+from django.core.cache import cache
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core import trending
+from core.models import Tweet
+
+
+MENTION_TWEET_URL = reverse('api:tweet-mentions')
+TRENDING_URL = reverse('api:trending')
+
+
+def tweet_tag_url(tag):
+    """
+    Return the url of the tweets with a hashtag
+    """
+    return reverse('api:tweet-tag', args=[tag])
+
+
+class TweetEntityApiTests(TestCase):
+    """
+    Test the hashtag and mention apis
+    """
+
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email='user1@test.com', password='testpass123', name='user1'
+        )
+        self.other_user = get_user_model().objects.create_user(
+            email='user2@test.com', password='testpass123', name='user2'
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def test_list_tweets_with_tag(self):
+        """
+        Test list the tweets with a hashtag, newest first, in one query
+        """
+        first = Tweet.objects.create(text='#Django rocks',
+                                     author=self.other_user)
+        second = Tweet.objects.create(text='I like #django',
+                                      author=self.user)
+        Tweet.objects.create(text='#flask', author=self.user)
+
+        with self.assertNumQueries(1):
+            res = self.client.get(tweet_tag_url('DJANGO'))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([tweet['id'] for tweet in res.data['results']],
+                         [second.id, first.id])
+        self.assertEqual(res.data['results'][0]['author']['name'], 'user1')
+
+    def test_list_mentions(self):
+        """
+        Test list the tweets mentioning the login user
+        """
+        mention = Tweet.objects.create(text='Hello @user1',
+                                       author=self.other_user)
+        Tweet.objects.create(text='Hello @user2', author=self.user)
+
+        res = self.client.get(MENTION_TWEET_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([tweet['id'] for tweet in res.data['results']],
+                         [mention.id])
+
+    def test_trending(self):
+        """
+        Test list the trending hashtags from the rollup, without
+        reading the tweets, cached between requests
+        """
+        cache.clear()
+        self.addCleanup(cache.clear)
+        now = timezone.now()
+        tracker = trending.TrendingTracker()
+        tracker.record([('django', now), ('django', now), ('rest', now)])
+        tracker.flush()
+
+        with self.assertNumQueries(1):
+            res = self.client.get(TRENDING_URL, {'limit': 1})
+        with self.assertNumQueries(0):
+            self.client.get(TRENDING_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['results'],
+                         [{'tag': 'django', 'count': 2}])
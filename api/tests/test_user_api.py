@@ -1,14 +1,24 @@
-from django.test import TestCase
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
 from django.urls import reverse
 
 from rest_framework import status
 from rest_framework.test import APIClient
 
+from core.hashing import HashingExecutor, HashingQueueTimeout
+
 
 CREATE_USER_URL = reverse('api:user-create')
 LOGIN_URL = reverse('api:login')
 LIST_USER_URL = reverse('api:user-list')
+HASHING_METRICS_URL = reverse('api:metrics-hashing')
+BULK_CREATE_USER_URL = reverse('api:user-bulk-create')
 
 
 def user_detail_url(user_id):
@@ -699,3 +709,231 @@ class PrivateApiTests(TestCase):
         user_exist = get_user_model().objects.\
             filter(id=another_user.id).exists()
         self.assertTrue(user_exist)
+
+
+@override_settings(PASSWORD_HASHERS=[
+    'core.hashing.PooledPBKDF2PasswordHasher'])
+class HashingBackpressureApiTests(TestCase):
+    """
+    Test login and signup when the password hashing pool is saturated
+    """
+
+    def setUp(self) -> None:
+        self.client = APIClient()
+
+    def test_login_when_hashing_pool_busy(self):
+        """
+        Test login gets a 503 with Retry-After when no worker is free
+        """
+        get_user_model().objects.create_user(
+            email='user1@test.com', password='testpass123', name='user1'
+        )
+        with patch.object(HashingExecutor, 'run',
+                          side_effect=HashingQueueTimeout):
+            res = self.client.post(LOGIN_URL, {
+                'email': 'user1@test.com', 'password': 'testpass123'
+            }, format='json')
+
+        self.assertEqual(res.status_code,
+                         status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertIn('Retry-After', res)
+
+    def test_signup_when_hashing_pool_busy(self):
+        """
+        Test signup gets a 503 and creates no user when no worker is free
+        """
+        with patch.object(HashingExecutor, 'run',
+                          side_effect=HashingQueueTimeout):
+            res = self.client.post(CREATE_USER_URL, {
+                'email': 'user1@test.com', 'password': 'testpass123',
+                'name': 'user1'
+            }, format='json')
+
+        self.assertEqual(res.status_code,
+                         status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertFalse(get_user_model().objects.exists())
+
+    def test_hashing_metrics_admin_only(self):
+        """
+        Test only admins can read the hashing metrics
+        """
+        user = get_user_model().objects.create_user(
+            email='user1@test.com', password='testpass123', name='user1'
+        )
+        self.client.force_authenticate(user=user)
+        res = self.client.get(HASHING_METRICS_URL)
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+        user.is_staff = True
+        user.save()
+        res = self.client.get(HASHING_METRICS_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn('queue_depth', res.data)
+        self.assertIn('hash_seconds_avg', res.data)
+
+
+class UpdateUserWriteTests(TestCase):
+    """
+    Test the update path writes only what changed
+    """
+
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email='user1@test.com', password='testpass123', name='user1',
+            avatarURL='user1avatar'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.url = user_update_url(self.user.id)
+
+    def patch(self, payload):
+        """
+        Make a patch request and return the response and the
+        number of password hashes it computed
+        """
+        with patch('django.contrib.auth.base_user.make_password',
+                   wraps=make_password) as hasher:
+            res = self.client.patch(self.url, payload)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return res, hasher.call_count
+
+    def assertUpdates(self, queries, *columns):
+        """
+        Assert the only UPDATE of queries sets exactly columns,
+        plus the version columns
+        """
+        updates = [query['sql'] for query in queries
+                   if query['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 1)
+        set_clause = updates[0].split(' SET ')[1].split(' WHERE ')[0]
+        self.assertEqual(
+            sorted(part.split(' = ')[0].strip('"')
+                   for part in set_clause.split(', ')),
+            sorted(columns + ('updated_at', 'version'))
+        )
+
+    def test_partial_update_avatar(self):
+        """
+        Test patch avatarURL updates that column only, without hashing
+        """
+        with CaptureQueriesContext(connection) as queries:
+            res, hashes = self.patch({'avatarURL': 'newavatar'})
+
+        self.assertEqual(hashes, 0)
+        self.assertUpdates(queries, 'avatarURL')
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.check_password('testpass123'))
+
+    def test_partial_update_name(self):
+        """
+        Test patch name: get user, one UPDATE, read back the version,
+        token cache invalidation
+        """
+        with self.assertNumQueries(4):
+            res, hashes = self.patch({'name': 'newname'})
+        self.assertEqual(hashes, 0)
+
+    def test_partial_update_email(self):
+        """
+        Test patch email: get user, unique check, one UPDATE, read back
+        the version, token cache invalidation
+        """
+        with CaptureQueriesContext(connection) as queries:
+            res, hashes = self.patch({'email': 'newemail@test.com'})
+
+        self.assertEqual(len(queries), 5)
+        self.assertEqual(hashes, 0)
+        self.assertUpdates(queries, 'email')
+
+    def test_partial_update_password(self):
+        """
+        Test patch password hashes exactly once and writes that column
+        """
+        with CaptureQueriesContext(connection) as queries:
+            res, hashes = self.patch({'password': 'newpassword'})
+
+        self.assertEqual(hashes, 1)
+        self.assertUpdates(queries, 'password')
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.check_password('newpassword'))
+
+    def test_partial_update_unchanged(self):
+        """
+        Test patch with the current values writes nothing
+        """
+        with self.assertNumQueries(1):
+            res, hashes = self.patch({'name': 'user1',
+                                      'avatarURL': 'user1avatar'})
+        self.assertEqual(hashes, 0)
+
+    def test_update_all_fields(self):
+        """
+        Test put updates the changed columns in a single UPDATE
+        """
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.put(self.url, {
+                'email': 'user1@test.com', 'name': 'newname',
+                'password': 'newpassword', 'avatarURL': 'user1avatar'
+            })
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertUpdates(queries, 'name', 'password')
+
+
+@override_settings(USER_IMPORT_WORKERS=0)
+class BulkCreateUserApiTests(TestCase):
+    """
+    Test the bulk user creation api
+    """
+
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.admin = get_user_model().objects.create_superuser(
+            email='admin@test.com', password='testpass123', name='admin'
+        )
+        self.client.force_authenticate(user=self.admin)
+
+    def test_bulk_create_requires_admin(self):
+        """
+        Test a user who is not admin cannot create users in bulk.
+        This should fail
+        """
+        user = get_user_model().objects.create_user(
+            email='user1@test.com', password='testpass123', name='user1'
+        )
+        self.client.force_authenticate(user=user)
+        res = self.client.post(BULK_CREATE_USER_URL, [], format='json')
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_bulk_create_from_json_list(self):
+        """
+        Test create users from a JSON list, reporting invalid ones
+        """
+        payload = [
+            {'email': 'user1@test.com', 'name': 'user1',
+             'password': 'testpass1'},
+            {'email': 'invalid', 'name': 'user2', 'password': 'testpass2'},
+        ]
+        res = self.client.post(BULK_CREATE_USER_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['created'], 1)
+        self.assertEqual([error['line'] for error in res.data['errors']],
+                         [2])
+
+    def test_bulk_create_from_jsonl_file(self):
+        """
+        Test create users from an uploaded JSONL file
+        """
+        upload = SimpleUploadedFile(
+            'users.jsonl',
+            b'{"email": "user1@test.com", "name": "user1", '
+            b'"password": "testpass1"}\n'
+        )
+        res = self.client.post(BULK_CREATE_USER_URL, {'file': upload},
+                               format='multipart')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data, {'created': 1, 'errors': []})
+        user = get_user_model().objects.get(email='user1@test.com')
+        self.assertTrue(user.check_password('testpass1'))
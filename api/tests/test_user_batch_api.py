@@ -0,0 +1,104 @@
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from api import serializers
+
+
+BATCH_USER_URL = reverse('api:user-batch')
+
+
+class BatchUserApiTests(TestCase):
+    """
+    Test the batch user lookup api
+    """
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email='user1@test.com', password='testpass123', name='user1'
+        )
+        self.other_user = get_user_model().objects.create_user(
+            email='user2@test.com', password='testpass123', name='user2'
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def get(self, ids, **params):
+        return self.client.get(BATCH_USER_URL, dict(
+            params, ids=','.join(str(pk) for pk in ids)
+        ))
+
+    def test_map_with_misses(self):
+        """
+        Test the users are keyed by id, null for the unknown ids
+        """
+        missing_id = self.other_user.id + 100
+        res = self.get([self.other_user.id, missing_id, self.user.id])
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(list(res.data), [
+            str(self.other_user.id), str(missing_id), str(self.user.id)
+        ])
+        self.assertEqual(
+            res.data[str(self.user.id)],
+            serializers.UserProfileSerializer(self.user).data
+        )
+        self.assertIsNone(res.data[str(missing_id)])
+
+    def test_served_from_cache(self):
+        """
+        Test a lookup is two queries cold and one warm
+        """
+        ids = [self.user.id, self.other_user.id]
+        with self.assertNumQueries(2):
+            res = self.get(ids)
+
+        with self.assertNumQueries(1):
+            res2 = self.get(ids)
+
+        self.assertEqual(res2.data, res.data)
+
+    def test_fields(self):
+        """
+        Test fields limits the returned fields, with one query
+        """
+        with self.assertNumQueries(1):
+            res = self.get([self.other_user.id], fields='id,name')
+
+        self.assertEqual(res.data, {
+            str(self.other_user.id): {'id': self.other_user.id,
+                                      'name': 'user2'}
+        })
+
+    @override_settings(USER_BATCH_MAX_IDS=2)
+    def test_too_many_ids(self):
+        """
+        Test more than USER_BATCH_MAX_IDS ids are rejected.
+        This should fail
+        """
+        res = self.get([1, 2, 3])
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_invalid_ids(self):
+        """
+        Test ids must be integers.
+        This should fail
+        """
+        res = self.client.get(BATCH_USER_URL, {'ids': '1,abc'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_login_required(self):
+        """
+        Test the lookup needs authentication.
+        This should fail
+        """
+        res = APIClient().get(BATCH_USER_URL, {'ids': str(self.user.id)})
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
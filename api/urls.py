@@ -12,6 +12,9 @@ urlpatterns = [
      # Register create user view
      path('user/create/', views.CreateUserAPIView.as_view(),\
           name='user-create'),
+     # Register create users in bulk
+     path('user/bulk-create/', views.BulkCreateUserAPIView.as_view(),
+          name='user-bulk-create'),
      # Register list all users
      path('user/list/', views.ListUserAPIView.as_view(),\
           name='user-list'),
@@ -24,6 +27,66 @@ urlpatterns = [
      # Register update user
      path('user/delete/<pk>/', views.DeleteUserAPIView.as_view(),\
           name='user-delete/'),
+     # Register follow/stop following a user
+     path('user/follow/<pk>/', views.FollowUserAPIView.as_view(),
+          name='user-follow'),
+     # Register list the followers of a user
+     path('user/followers/<pk>/', views.ListFollowerAPIView.as_view(),
+          name='user-followers'),
+     # Register list the users a user follows
+     path('user/following/<pk>/', views.ListFollowingAPIView.as_view(),
+          name='user-following'),
+     # Register batch user lookup
+     path('user/batch/', views.BatchUserAPIView.as_view(),
+          name='user-batch'),
+     # Register which of the given users the login user follows
+     path('user/following-lookup/', views.FollowingLookupAPIView.as_view(),
+          name='user-following-lookup'),
+     # Register list tweets
+     path('tweet/list/', views.ListTweetAPIView.as_view(),
+          name='tweet-list'),
+     # Register create tweet
+     path('tweet/create/', views.CreateTweetAPIView.as_view(),
+          name='tweet-create'),
+     # Register create tweets in bulk
+     path('tweet/bulk-create/', views.BulkCreateTweetAPIView.as_view(),
+          name='tweet-bulk-create'),
+     # Register retrieve a single tweet
+     path('tweet/details/<pk>/', views.RetrieveTweetAPIView.as_view(),
+          name='tweet-details'),
+     # Register reply to a tweet
+     path('tweet/reply/<pk>/', views.ReplyTweetAPIView.as_view(),
+          name='tweet-reply'),
+     # Register retrieve the reply tree of a tweet
+     path('tweet/thread/<pk>/', views.ThreadTweetAPIView.as_view(),
+          name='tweet-thread'),
+     # Register list the whole conversation of a tweet
+     path('tweet/conversation/<pk>/',
+          views.ConversationTweetAPIView.as_view(),
+          name='tweet-conversation'),
+     # Register full-text search of tweets
+     path('tweet/search/', views.SearchTweetAPIView.as_view(),
+          name='tweet-search'),
+     # Register list tweets with a hashtag
+     path('tweet/tag/<tag>/', views.TagTweetAPIView.as_view(),
+          name='tweet-tag'),
+     # Register list tweets mentioning the login user
+     path('tweet/mentions/', views.MentionTweetAPIView.as_view(),
+          name='tweet-mentions'),
+     # Register like/remove like a tweet
+     path('tweet/like/<pk>/', views.LikeTweetAPIView.as_view(),
+          name='tweet-like'),
+     # Register home timeline of the login user
+     path('timeline/', views.TimelineAPIView.as_view(), name='timeline'),
+     # Register trending hashtags
+     path('trending/', views.TrendingAPIView.as_view(), name='trending'),
+     # Register several api requests in one round trip
+     path('batch/', views.BatchAPIView.as_view(), name='batch'),
+     # Register password hashing pool metrics
+     path('metrics/hashing/', views.HashingMetricsAPIView.as_view(),
+          name='metrics-hashing'),
+     # Register streaming NDJSON export of users, tweets or likes
+     path('export/<name>/', views.ExportAPIView.as_view(), name='export'),
      # Register login view
      path('login/', views.UserLoginView.as_view(), name='login'),
      # Register router to urls
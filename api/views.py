@@ -1,12 +1,39 @@
+import io
+
 from rest_framework import generics
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
 from rest_framework.authtoken.views import ObtainAuthToken
-from rest_framework.authentication import TokenAuthentication
 from rest_framework.settings import api_settings
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 
+from django.conf import settings
+from django.core.cache import cache
 from django.contrib.auth import get_user_model
+from django.db.models import Exists, OuterRef
+from django.http import Http404, StreamingHttpResponse
 
 from api import serializers, permissions
+from api.authentication import CachedTokenAuthentication
+from api.batch import run_batch
+from api.conditional import ConditionalRetrieveMixin, check_if_match, \
+    make_etag, set_validators
+from api.fragments import FragmentListMixin, FragmentRetrieveMixin
+from api.sparse import SparseFieldsMixin
+from api.pagination import ConversationKeysetPagination, \
+    FollowerKeysetPagination, FollowingKeysetPagination, \
+    SearchKeysetPagination, TweetKeysetPagination
+from core.entities import normalize_tag
+from core.exporters import EXPORTS, gzip_chunks, ndjson_chunks
+from core.hashing import get_executor
+from core.importers import TweetImporter, UserImporter, read_rows
+from core.models import Follow, Mention, TimelineEntry, \
+    TrendingTagCount, Tweet, TweetTag
+
+
+# The user fields a client can select with ?fields=
+USER_SPARSE_FIELDS = ('id', 'email', 'name', 'avatarURL', 'follower_count',
+                      'following_count')
 
 
 class CreateUserAPIView(generics.CreateAPIView):
@@ -16,42 +43,94 @@ class CreateUserAPIView(generics.CreateAPIView):
     serializer_class = serializers.UserProfileSerializer
 
 
-class ListUserAPIView(generics.ListAPIView):
+class ListUserAPIView(SparseFieldsMixin, FragmentListMixin,
+                      generics.ListAPIView):
     """
-    View for listing all user
+    View for listing all user.
+    The users of a page are served from the fragment cache.
+    `fields` limits the returned fields (e.g. fields=id,name,avatarURL)
     """
     serializer_class = serializers.UserProfileSerializer
+    fragment_cache = serializers.user_fragments
+    sparse_fields = USER_SPARSE_FIELDS
     queryset = get_user_model().objects.all()
     # Allow request accept token
     # authentication_classes and permission_classes always go together
-    authentication_classes = (TokenAuthentication, )
+    authentication_classes = (CachedTokenAuthentication, )
     permission_classes = (IsAuthenticated, )
 
 
-class RetrieveUserAPIView(generics.RetrieveAPIView):
+class RetrieveUserAPIView(SparseFieldsMixin, FragmentRetrieveMixin,
+                          generics.RetrieveAPIView):
     """
-    View for retrieving a single user
+    View for retrieving a single user, from the fragment cache.
+    Supports conditional requests (ETag / Last-Modified).
+    `fields` limits the returned fields
     """
     serializer_class = serializers.UserProfileSerializer
+    fragment_cache = serializers.user_fragments
+    sparse_fields = USER_SPARSE_FIELDS
     queryset = get_user_model().objects.all()
     # Allow request accept token
     # authentication_classes and permission_classes always go together
-    authentication_classes = (TokenAuthentication, )
+    authentication_classes = (CachedTokenAuthentication, )
     permission_classes = (IsAuthenticated, )
 
 
+class BatchUserAPIView(SparseFieldsMixin, generics.GenericAPIView):
+    """
+    View resolving the comma separated user `ids` (at most
+    USER_BATCH_MAX_IDS) with one query, served from the fragment cache.
+    Returns a map of id to user, null for the ids of no user.
+    `fields` limits the returned fields
+    """
+    serializer_class = serializers.UserProfileSerializer
+    queryset = get_user_model().objects.all()
+    fragment_cache = serializers.user_fragments
+    sparse_fields = USER_SPARSE_FIELDS
+    authentication_classes = (CachedTokenAuthentication, )
+    permission_classes = (IsAuthenticated, )
+
+    def get(self, request, *args, **kwargs):
+        ids = query_ids(request, settings.USER_BATCH_MAX_IDS)
+        queryset = self.get_queryset()
+        if self.get_sparse_fields():
+            users = queryset.in_bulk(ids)
+            found = dict(zip(users, self.get_serializer(
+                list(users.values()), many=True).data))
+        else:
+            rows = queryset.only('pk', 'version', 'updated_at').in_bulk(ids)
+            found = self.fragment_cache.render_map(rows.values(), queryset)
+        return Response({str(pk): found.get(pk) for pk in ids})
+
+
 class UpdateUserAPIView(generics.UpdateAPIView):
     """
-    View for update user. Put and Patch
+    View for update user. Put and Patch.
+    An If-Match (or If-Unmodified-Since) header not matching the
+    current version of the user fails with 412
     """
     serializer_class = serializers.UserProfileSerializer
     queryset = get_user_model().objects.all()
     # Allow request accept token
     # authentication_classes and permission_classes always go together
-    authentication_classes = (TokenAuthentication, )
+    authentication_classes = (CachedTokenAuthentication, )
     permission_classes = (IsAuthenticated,
                           permissions.ManageOwnProfilePermission)
 
+    def perform_update(self, serializer):
+        user = serializer.instance
+        check_if_match(self.request, make_etag(self.request, user.version),
+                       user.updated_at)
+        super().perform_update(serializer)
+        self.updated_user = serializer.instance
+
+    def update(self, request, *args, **kwargs):
+        response = super().update(request, *args, **kwargs)
+        user = self.updated_user
+        return set_validators(response, make_etag(request, user.version),
+                              user.updated_at)
+
 
 class DeleteUserAPIView(generics.DestroyAPIView):
     """
@@ -61,7 +140,7 @@ class DeleteUserAPIView(generics.DestroyAPIView):
     queryset = get_user_model().objects.all()
     # Allow request accept token
     # authentication_classes and permission_classes always go together
-    authentication_classes = (TokenAuthentication, )
+    authentication_classes = (CachedTokenAuthentication, )
     permission_classes = (IsAuthenticated,
                           permissions.ManageOwnProfilePermission)
 
@@ -74,3 +153,478 @@ class UserLoginView(ObtainAuthToken):
     # The ObtainAuthToken does not have renderer_classes by default
     # So we specify it here
     renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES
+
+
+class TweetQuerysetMixin:
+    """
+    Use the N+1 free tweet queryset of the requesting user
+    """
+
+    def get_queryset(self):
+        return Tweet.objects.for_viewer(self.request.user)
+
+
+class ListTweetAPIView(TweetQuerysetMixin, generics.ListAPIView):
+    """
+    View for listing tweets, newest first
+    """
+    serializer_class = serializers.TweetSerializer
+    pagination_class = TweetKeysetPagination
+    # Allow request accept token
+    # authentication_classes and permission_classes always go together
+    authentication_classes = (CachedTokenAuthentication, )
+    permission_classes = (IsAuthenticated, )
+
+
+class CreateTweetAPIView(generics.CreateAPIView):
+    """
+    View for create a new tweet
+    """
+    serializer_class = serializers.TweetSerializer
+    authentication_classes = (CachedTokenAuthentication, )
+    permission_classes = (IsAuthenticated, )
+
+    def perform_create(self, serializer):
+        serializer.save(author=self.request.user)
+
+
+class RetrieveTweetAPIView(ConditionalRetrieveMixin, TweetQuerysetMixin,
+                           generics.RetrieveAPIView):
+    """
+    View for retrieving a single tweet.
+    Supports conditional requests (ETag / Last-Modified)
+    """
+    serializer_class = serializers.TweetSerializer
+    authentication_classes = (CachedTokenAuthentication, )
+    permission_classes = (IsAuthenticated, )
+
+    # The body is built from the tweet, its author
+    # and whether the login user liked it
+    validator_fields = ('version', 'updated_at', 'author__version',
+                        'author__updated_at', 'liked')
+
+
+class ReplyTweetAPIView(TweetQuerysetMixin, generics.CreateAPIView):
+    """
+    View for replying to a tweet
+    """
+    serializer_class = serializers.TweetSerializer
+    authentication_classes = (CachedTokenAuthentication, )
+    permission_classes = (IsAuthenticated, )
+
+    def perform_create(self, serializer):
+        serializer.save(author=self.request.user,
+                        replying_to=self.get_object())
+
+
+class LikeTweetAPIView(generics.GenericAPIView):
+    """
+    View for like a tweet, or remove the like if already liked
+    """
+    queryset = Tweet.objects.all()
+    authentication_classes = (CachedTokenAuthentication, )
+    permission_classes = (IsAuthenticated, )
+
+    def post(self, request, *args, **kwargs):
+        liked, like_count = self.get_object().toggle(request.user)
+        return Response({'liked': liked, 'like_count': like_count})
+
+
+def bounded_int_param(request, name, default):
+    """
+    Return the positive integer query parameter name,
+    or default if missing/invalid. Never return more than default
+    """
+    try:
+        value = int(request.query_params[name])
+    except (KeyError, ValueError):
+        return default
+    return min(max(value, 0), default)
+
+
+class ThreadTweetAPIView(generics.GenericAPIView):
+    """
+    View for retrieving a whole reply tree in depth-first order.
+    Optional max_depth and limit parameters narrow the
+    THREAD_MAX_DEPTH and THREAD_MAX_SIZE settings
+    """
+    serializer_class = serializers.ThreadTweetSerializer
+    authentication_classes = (CachedTokenAuthentication, )
+    permission_classes = (IsAuthenticated, )
+
+    def get(self, request, pk, *args, **kwargs):
+        max_depth = bounded_int_param(request, 'max_depth',
+                                      settings.THREAD_MAX_DEPTH)
+        limit = bounded_int_param(request, 'limit', settings.THREAD_MAX_SIZE)
+        try:
+            root_id = int(pk)
+        except ValueError:
+            raise Http404
+        # Fetch one extra tweet to know if the thread is truncated
+        tweets = Tweet.objects.thread(root_id, user=request.user,
+                                      max_depth=max_depth, limit=limit + 1)
+        if not tweets:
+            raise Http404
+        serializer = self.get_serializer(tweets[:limit], many=True)
+        return Response({
+            'truncated': len(tweets) > limit,
+            'results': serializer.data
+        })
+
+
+class ConversationTweetAPIView(TweetQuerysetMixin, generics.ListAPIView):
+    """
+    View for listing the whole conversation of a tweet, oldest first.
+    Use the stored root of the tweet, so each page is one
+    range scan on the (root, created_at) index
+    """
+    serializer_class = serializers.TweetSerializer
+    pagination_class = ConversationKeysetPagination
+    authentication_classes = (CachedTokenAuthentication, )
+    permission_classes = (IsAuthenticated, )
+
+    def get_queryset(self):
+        tweet = generics.get_object_or_404(
+            Tweet.objects.only('id', 'root_id'), pk=self.kwargs['pk']
+        )
+        return super().get_queryset() & \
+            Tweet.objects.conversation(tweet.root_id or tweet.id)
+
+
+class SearchTweetAPIView(generics.ListAPIView):
+    """
+    View for the full-text search of tweets, best match first.
+    `q` holds the terms, all of which must match, and the optional
+    `author` parameter (repeated or comma separated ids) restricts
+    the authors
+    """
+    serializer_class = serializers.TweetSerializer
+    pagination_class = SearchKeysetPagination
+    authentication_classes = (CachedTokenAuthentication, )
+    permission_classes = (IsAuthenticated, )
+
+    def get_author_ids(self):
+        try:
+            return [
+                int(value)
+                for param in self.request.query_params.getlist('author')
+                for value in param.split(',') if value
+            ]
+        except ValueError:
+            raise ValidationError({'author': ['Expect user ids']})
+
+    def list(self, request, *args, **kwargs):
+        query = request.query_params.get('q', '')
+        if not query.strip():
+            raise ValidationError({'q': ['This parameter is required']})
+        author_ids = self.get_author_ids()
+
+        def search(position, limit):
+            return Tweet.objects.search(query, request.user,
+                                        author_ids=author_ids,
+                                        after=position, limit=limit)
+
+        tweets = self.paginate_queryset(search)
+        serializer = self.get_serializer(tweets, many=True)
+        return self.get_paginated_response(serializer.data)
+
+
+class TweetLinkListMixin:
+    """
+    List tweets through rows linking them to a user or a tag
+    (timeline entries, hashtags, mentions), newest first.
+    The link rows are paginated on their own (x, created_at) index and
+    joined to their tweets, so a page is a single range scan.
+    Subclasses implement get_links()
+    """
+    serializer_class = serializers.TweetSerializer
+    pagination_class = TweetKeysetPagination
+    authentication_classes = (CachedTokenAuthentication, )
+    permission_classes = (IsAuthenticated, )
+
+    def get_links(self):
+        raise NotImplementedError
+
+    def get_queryset(self):
+        return self.get_links().select_related(
+            'tweet__author', 'tweet__replying_to'
+        ).annotate(
+            liked=Exists(Tweet.likes.through.objects.filter(
+                tweet_id=OuterRef('tweet_id'),
+                userprofile_id=self.request.user.pk
+            ))
+        )
+
+    def list(self, request, *args, **kwargs):
+        links = self.paginate_queryset(self.get_queryset())
+        tweets = []
+        for link in links:
+            link.tweet.liked = link.liked
+            tweets.append(link.tweet)
+        serializer = self.get_serializer(tweets, many=True)
+        return self.get_paginated_response(serializer.data)
+
+
+class TimelineAPIView(TweetLinkListMixin, generics.ListAPIView):
+    """
+    View for the home timeline of the login user, newest first.
+    Each page is one range scan on the materialized timeline
+    """
+
+    def get_links(self):
+        return TimelineEntry.objects.filter(owner=self.request.user)
+
+
+class TagTweetAPIView(TweetLinkListMixin, generics.ListAPIView):
+    """
+    View for listing the tweets with a hashtag, newest first
+    """
+
+    def get_links(self):
+        return TweetTag.objects.filter(tag=normalize_tag(self.kwargs['tag']))
+
+
+class MentionTweetAPIView(TweetLinkListMixin, generics.ListAPIView):
+    """
+    View for listing the tweets mentioning the login user, newest first
+    """
+
+    def get_links(self):
+        return Mention.objects.filter(user=self.request.user)
+
+
+class TrendingAPIView(generics.GenericAPIView):
+    """
+    View for the trending hashtags of the last TRENDING_WINDOW_SECONDS,
+    most used first. It reads the precomputed rollup, never the tweets,
+    and caches the answer for TRENDING_CACHE_SECONDS
+    """
+    authentication_classes = (CachedTokenAuthentication, )
+    permission_classes = (IsAuthenticated, )
+    cache_key = 'trending-tags'
+
+    def get(self, request, *args, **kwargs):
+        limit = bounded_int_param(request, 'limit', settings.TRENDING_TOP_K)
+        tags = cache.get(self.cache_key)
+        if tags is None:
+            tags = TrendingTagCount.objects.top(settings.TRENDING_TOP_K)
+            cache.set(self.cache_key, tags, settings.TRENDING_CACHE_SECONDS)
+        return Response({
+            'window': settings.TRENDING_WINDOW_SECONDS,
+            'results': tags[:limit]
+        })
+
+
+class FollowUserAPIView(generics.GenericAPIView):
+    """
+    View for follow a user (POST) or stop following them (DELETE)
+    """
+    queryset = get_user_model().objects.all()
+    authentication_classes = (CachedTokenAuthentication, )
+    permission_classes = (IsAuthenticated, )
+
+    def post(self, request, *args, **kwargs):
+        try:
+            Follow.objects.follow(request.user, self.get_object())
+        except ValueError as error:
+            raise ValidationError({'detail': str(error)})
+        return Response({'following': True})
+
+    def delete(self, request, *args, **kwargs):
+        Follow.objects.unfollow(request.user, self.get_object())
+        return Response({'following': False})
+
+
+class FollowListAPIView(generics.ListAPIView):
+    """
+    Base view listing one end of the follows of the user pk
+    """
+    serializer_class = serializers.UserProfileSerializer
+    authentication_classes = (CachedTokenAuthentication, )
+    permission_classes = (IsAuthenticated, )
+    # The filtered end of the follow and the listed end
+    user_field = None
+    listed_field = None
+
+    def get_queryset(self):
+        # An unknown or malformed user id is a 404, not an empty list
+        user = generics.get_object_or_404(
+            get_user_model().objects.only('id'), pk=self.kwargs['pk']
+        )
+        return Follow.objects.filter(
+            **{self.user_field: user}
+        ).select_related(self.listed_field)
+
+    def list(self, request, *args, **kwargs):
+        follows = self.paginate_queryset(self.get_queryset())
+        users = [getattr(follow, self.listed_field) for follow in follows]
+        serializer = self.get_serializer(users, many=True)
+        return self.get_paginated_response(serializer.data)
+
+
+class ListFollowerAPIView(FollowListAPIView):
+    """
+    View for listing the followers of a user
+    """
+    pagination_class = FollowerKeysetPagination
+    user_field = 'followee'
+    listed_field = 'follower'
+
+
+class ListFollowingAPIView(FollowListAPIView):
+    """
+    View for listing the users a user follows
+    """
+    pagination_class = FollowingKeysetPagination
+    user_field = 'follower'
+    listed_field = 'followee'
+
+
+def query_ids(request, limit):
+    """
+    Return the comma separated integers of the `ids` query parameter,
+    at most limit of them
+    """
+    try:
+        ids = [int(pk) for pk in
+               request.query_params.get('ids', '').split(',') if pk]
+    except ValueError:
+        raise ValidationError({'ids': ['Expect comma separated integers']})
+    if len(ids) > limit:
+        raise ValidationError({'ids': ['At most {} ids'.format(limit)]})
+    return ids
+
+
+class FollowingLookupAPIView(generics.GenericAPIView):
+    """
+    View telling which of the comma separated `ids` the login
+    user follows, with one query
+    """
+    authentication_classes = (CachedTokenAuthentication, )
+    permission_classes = (IsAuthenticated, )
+
+    def get(self, request, *args, **kwargs):
+        ids = query_ids(request, settings.API_MAX_PAGE_SIZE)
+        following = Follow.objects.following_ids(request.user, ids)
+        return Response({'following': sorted(following)})
+
+
+class BatchAPIView(generics.GenericAPIView):
+    """
+    View running a list of api sub-requests in one round trip,
+    authenticated once as the batch request (see api.batch.run_batch).
+    With `concurrent`, consecutive reads run on a thread pool
+    """
+    serializer_class = serializers.BatchSerializer
+    authentication_classes = (CachedTokenAuthentication, )
+    permission_classes = (IsAuthenticated, )
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return Response({'responses': run_batch(
+            request, serializer.validated_data['requests'],
+            concurrent=serializer.validated_data['concurrent']
+        )})
+
+
+class HashingMetricsAPIView(generics.GenericAPIView):
+    """
+    View for the metrics of the password hashing pool (admin only)
+    """
+    authentication_classes = (CachedTokenAuthentication, )
+    permission_classes = (IsAdminUser, )
+
+    def get(self, request, *args, **kwargs):
+        return Response(get_executor().metrics())
+
+
+class ExportAPIView(generics.GenericAPIView):
+    """
+    View for streaming a full table as NDJSON (admin only):
+    users, tweets or likes, ordered by id. `after` resumes after
+    the id of the last row received, `gzip` compresses on the fly
+    """
+    authentication_classes = (CachedTokenAuthentication, )
+    permission_classes = (IsAdminUser, )
+
+    def get(self, request, *args, **kwargs):
+        name = kwargs['name']
+        if name not in EXPORTS:
+            raise Http404
+        try:
+            after = int(request.query_params.get('after') or 0)
+        except ValueError:
+            raise ValidationError({'after': ['Expect the id of a row']})
+
+        chunks = ndjson_chunks(name, after,
+                               batch_size=settings.EXPORT_BATCH_SIZE)
+        filename = '{}.ndjson'.format(name)
+        content_type = 'application/x-ndjson'
+        if request.query_params.get('gzip') in ('1', 'true'):
+            chunks = gzip_chunks(chunks)
+            filename += '.gz'
+            content_type = 'application/gzip'
+        response = StreamingHttpResponse(chunks, content_type=content_type)
+        response['Content-Disposition'] = \
+            'attachment; filename="{}"'.format(filename)
+        return response
+
+
+def upload_rows(request, noun):
+    """
+    Return the (line number, row) pairs of a bulk import request:
+    a JSONL or CSV `file` upload, read line by line,
+    or a JSON list of objects
+    """
+    upload = request.FILES.get('file')
+    if upload is not None:
+        file_format = request.data.get('format') or \
+            upload.name.rsplit('.', 1)[-1].lower()
+        if file_format not in ('jsonl', 'csv'):
+            raise ValidationError({'format': ['Expect jsonl or csv']})
+        lines = io.TextIOWrapper(upload.file, encoding='utf-8',
+                                 newline='')
+        return read_rows(lines, file_format)
+    if isinstance(request.data, list):
+        return (
+            (number, row if isinstance(row, dict) else None)
+            for number, row in enumerate(request.data, start=1)
+        )
+    raise ValidationError(
+        {'detail': 'Expect a file upload or a list of {}'.format(noun)}
+    )
+
+
+class BulkCreateUserAPIView(generics.GenericAPIView):
+    """
+    View for creating users in bulk (admin only).
+    Invalid rows are reported by line
+    """
+    authentication_classes = (CachedTokenAuthentication, )
+    permission_classes = (IsAdminUser, )
+
+    def post(self, request, *args, **kwargs):
+        rows = upload_rows(request, 'users')
+        report = UserImporter(get_user_model(),
+                              batch_size=settings.USER_IMPORT_BATCH_SIZE,
+                              workers=settings.USER_IMPORT_WORKERS).run(rows)
+        return Response(report.as_dict())
+
+
+class BulkCreateTweetAPIView(generics.GenericAPIView):
+    """
+    View for creating tweets in bulk (admin only).
+    Rows hold text, author and an optional replying_to.
+    Invalid rows are reported by line
+    """
+    authentication_classes = (CachedTokenAuthentication, )
+    permission_classes = (IsAdminUser, )
+
+    def post(self, request, *args, **kwargs):
+        rows = upload_rows(request, 'tweets')
+        report = TweetImporter(
+            get_user_model(), Tweet,
+            batch_size=settings.TWEET_IMPORT_BATCH_SIZE
+        ).run(rows)
+        return Response(report.as_dict())
@@ -0,0 +1,67 @@
+"""
+Compare the database queries spent authenticating a request with
+DRF TokenAuthentication and with CachedTokenAuthentication.
+
+    python -m benchmarks.bench_auth [--requests N]
+"""
+import argparse
+
+from benchmarks.utils import create_users, print_table, setup_django, \
+    timer
+
+
+def run(requests):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    from rest_framework.authentication import TokenAuthentication
+    from rest_framework.authtoken.models import Token
+    from rest_framework.test import APIRequestFactory
+
+    from api.authentication import CachedTokenAuthentication, local_cache
+    from api.views import RetrieveUserAPIView
+
+    user = create_users(1)[0]
+    token = Token.objects.create(user=user)
+    factory = APIRequestFactory()
+
+    rows = []
+    for auth_class in (TokenAuthentication, CachedTokenAuthentication):
+        local_cache.clear()
+        view = RetrieveUserAPIView.as_view(
+            authentication_classes=(auth_class, ))
+        timings = {}
+        with CaptureQueriesContext(connection) as queries, \
+                timer(timings, 'total'):
+            for _ in range(requests):
+                request = factory.get(
+                    '/', HTTP_AUTHORIZATION='Token ' + token.key)
+                response = view(request, pk=user.pk)
+                assert response.status_code == 200, response.status_code
+        token_queries = sum(1 for query in queries.captured_queries
+                            if 'authtoken_token' in query['sql'])
+        rows.append([
+            auth_class.__name__,
+            requests,
+            '{:.2f}'.format(len(queries) / requests),
+            '{:.1%}'.format(token_queries / requests),
+            '{:.3f}'.format(timings['total'] * 1000 / requests),
+        ])
+
+    print_table(['authentication', 'requests', 'queries/request',
+                 'token lookup rate', 'ms/request'], rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=1000)
+    args = parser.parse_args()
+
+    teardown = setup_django()
+    try:
+        run(args.requests)
+    finally:
+        teardown()
+
+
+if __name__ == '__main__':
+    main()
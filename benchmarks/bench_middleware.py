@@ -0,0 +1,81 @@
+"""
+Measure the latency of a token authenticated api request through the
+full MIDDLEWARE chain (django WSGIHandler) and through API_MIDDLEWARE
+(chirper_project.handlers.APIWSGIHandler).
+
+The request is a cached user detail, so the middleware is a large
+share of the work.
+
+    python -m benchmarks.bench_middleware [--requests 5000]
+"""
+import argparse
+import statistics
+import time
+from io import BytesIO
+from wsgiref.util import setup_testing_defaults
+
+from benchmarks.utils import create_users, print_table, setup_django
+
+
+def make_environ(path, token):
+    environ = {'PATH_INFO': path, 'HTTP_HOST': 'testserver',
+               'HTTP_AUTHORIZATION': 'Token ' + token,
+               'wsgi.input': BytesIO()}
+    setup_testing_defaults(environ)
+    return environ
+
+
+def latencies(application, path, token, requests):
+    def start_response(status, headers):
+        assert status.startswith('200'), status
+
+    timings = []
+    for _ in range(requests):
+        environ = make_environ(path, token)
+        start = time.perf_counter()
+        b''.join(application(environ, start_response))
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def run(requests):
+    from django.core.handlers.wsgi import WSGIHandler
+    from django.urls import reverse
+    from rest_framework.authtoken.models import Token
+
+    from chirper_project.handlers import APIWSGIHandler
+
+    user = create_users(1)[0]
+    token = Token.objects.create(user=user).key
+    path = reverse('api:user-details/', args=[user.id])
+
+    rows = []
+    for name, application in [('MIDDLEWARE', WSGIHandler()),
+                              ('API_MIDDLEWARE', APIWSGIHandler())]:
+        # Warm the token and fragment caches
+        latencies(application, path, token, 100)
+        timings = sorted(latencies(application, path, token, requests))
+        rows.append([
+            name,
+            '{:.0f}'.format(statistics.median(timings) * 1e6),
+            '{:.0f}'.format(timings[int(len(timings) * 0.95)] * 1e6),
+            '{:,.0f}'.format(len(timings) / sum(timings)),
+        ])
+
+    print_table(['chain', 'median us', 'p95 us', 'requests/s'], rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=5000)
+    args = parser.parse_args()
+
+    teardown = setup_django()
+    try:
+        run(args.requests)
+    finally:
+        teardown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""
+Measure the latency of the first page of a tweet search on the FTS5
+index, and of the same search done with icontains, as the corpus grows.
+
+The searched term is in a fixed number of tweets, so a flat latency
+shows the cost depends on the matches, not on the corpus size.
+
+    python -m benchmarks.bench_search [--sizes 10000,100000,1000000]
+"""
+import argparse
+import random
+import statistics
+import time
+
+from benchmarks.utils import create_users, print_table, setup_django
+
+
+WORDS = ['word{}'.format(i) for i in range(5000)]
+NEEDLE = 'needle'
+NEEDLE_TWEETS = 100
+
+
+def grow_corpus(author, count, start):
+    """
+    Insert count tweets of random words, NEEDLE in the first ones
+    """
+    from django.db import transaction
+
+    from core.models import Tweet
+
+    rng = random.Random(start)
+    with transaction.atomic():
+        for offset in range(0, count, 5000):
+            Tweet.objects.bulk_create([
+                Tweet(author=author, text=' '.join(
+                    rng.choice(WORDS) for _ in range(12)
+                ) + (' ' + NEEDLE if start + offset + i < NEEDLE_TWEETS
+                     else ''))
+                for i in range(min(5000, count - offset))
+            ])
+
+
+def median_ms(fn, runs):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return '{:.2f}'.format(statistics.median(timings) * 1000)
+
+
+def run(sizes, runs):
+    from core.models import Tweet
+
+    user = create_users(1)[0]
+    rows = []
+    total = 0
+    for size in sizes:
+        grow_corpus(user, size - total, total)
+        total = size
+        rows.append([
+            size,
+            median_ms(lambda: Tweet.objects.search(NEEDLE, user, limit=50),
+                      runs),
+            median_ms(lambda: list(Tweet.objects.for_viewer(user).filter(
+                text__icontains=NEEDLE).order_by('-id')[:50]), runs),
+        ])
+
+    print_table(['tweets', 'fts5 search ms', 'icontains ms'], rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', default='10000,100000,1000000')
+    parser.add_argument('--runs', type=int, default=20)
+    args = parser.parse_args()
+    sizes = sorted(int(size) for size in args.sizes.split(','))
+
+    teardown = setup_django()
+    try:
+        run(sizes, args.runs)
+    finally:
+        teardown()
+
+
+if __name__ == '__main__':
+    main()
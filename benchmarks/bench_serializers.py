@@ -0,0 +1,63 @@
+"""
+Measure the users serialized per second by UserProfileSerializer and by
+its values_list() fast path (api.fastpath.ValuesSerializer), query and
+JSON rendering included, as in the user list api.
+
+    python -m benchmarks.bench_serializers [--users 10000] [--runs 5]
+"""
+import argparse
+import statistics
+import time
+
+from benchmarks.utils import create_users, print_table, setup_django
+
+
+def rows_per_second(fn, rows, runs):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return '{:,.0f}'.format(rows / statistics.median(timings))
+
+
+def run(users, page_sizes, runs):
+    from django.contrib.auth import get_user_model
+    from rest_framework.renderers import JSONRenderer
+
+    from api.serializers import UserProfileSerializer, user_values
+
+    create_users(users)
+    renderer = JSONRenderer()
+    rows = []
+    for page_size in page_sizes:
+        queryset = get_user_model().objects.order_by('id')[:page_size]
+        rows.append([
+            page_size,
+            rows_per_second(lambda: renderer.render(UserProfileSerializer(
+                queryset, many=True).data), page_size, runs),
+            rows_per_second(lambda: renderer.render(
+                user_values.serialize(queryset)), page_size, runs),
+        ])
+
+    print_table(['rows', 'ModelSerializer rows/s', 'fast path rows/s'],
+                rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--users', type=int, default=10000)
+    parser.add_argument('--page-sizes', default='50,1000,10000')
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+    page_sizes = [int(size) for size in args.page_sizes.split(',')]
+
+    teardown = setup_django()
+    try:
+        run(args.users, page_sizes, args.runs)
+    finally:
+        teardown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""
+Measure the response bytes and the CPU time of user list pages with
+every field and with the avatar fieldset (?fields=id,name,avatarURL),
+through the list api.
+
+The full list is measured with a cold fragment cache (every user
+serialized) and a warm one; a sparse list is never cached.
+
+    python -m benchmarks.bench_sparse_fields [--users 10000] [--runs 5]
+"""
+import argparse
+import statistics
+import time
+
+from benchmarks.utils import create_users, print_table, setup_django
+
+
+AVATAR_FIELDS = 'id,name,avatarURL'
+
+
+def walk_pages(view, factory, user, params):
+    """
+    Request every page of the list, return the total response bytes
+    """
+    from rest_framework.test import force_authenticate
+
+    total = 0
+    url = '/api/user/list/'
+    while url:
+        request = factory.get(url, params)
+        force_authenticate(request, user=user)
+        response = view(request)
+        response.render()
+        total += len(response.content)
+        url, params = response.data['next'], None
+    return total
+
+
+def measure(fn, runs, before=None):
+    """
+    Return (result, median CPU ms) of fn
+    """
+    timings = []
+    for _ in range(runs):
+        if before:
+            before()
+        start = time.process_time()
+        result = fn()
+        timings.append(time.process_time() - start)
+    return result, statistics.median(timings) * 1000
+
+
+def run(users, runs):
+    from django.conf import settings
+    from django.core.cache import cache
+    from rest_framework.test import APIRequestFactory
+
+    from api.views import ListUserAPIView
+
+    user = create_users(users)[0]
+    view = ListUserAPIView.as_view()
+    factory = APIRequestFactory()
+    page_size = {'page_size': settings.API_MAX_PAGE_SIZE}
+
+    def walk(params):
+        return lambda: walk_pages(view, factory, user, params)
+
+    variants = [
+        ('all fields, cold cache', walk(page_size), cache.clear),
+        ('all fields, warm cache', walk(page_size), None),
+        ('fields=' + AVATAR_FIELDS,
+         walk(dict(page_size, fields=AVATAR_FIELDS)), None),
+    ]
+    rows = []
+    for name, fn, before in variants:
+        size, cpu_ms = measure(fn, runs, before)
+        rows.append([name, '{:,}'.format(size), '{:.0f}'.format(cpu_ms)])
+
+    print_table(['{} users'.format(users), 'bytes', 'cpu ms'], rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--users', type=int, default=10000)
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    teardown = setup_django()
+    try:
+        run(args.users, args.runs)
+    finally:
+        teardown()
+
+
+if __name__ == '__main__':
+    main()
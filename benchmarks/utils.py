@@ -0,0 +1,76 @@
+"""
+Helpers for the benchmark scripts.
+
+Every benchmark runs against a throwaway test database:
+
+    python -m benchmarks.bench_auth
+"""
+import os
+import time
+from contextlib import contextmanager
+
+import django
+
+
+def setup_django():
+    """
+    Configure Django and create a test database.
+    Return a function that destroys it
+    """
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE',
+                          'chirper_project.settings')
+    django.setup()
+
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+
+    setup_test_environment()
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0)
+
+    def teardown():
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    return teardown
+
+
+def create_users(count, prefix='bench'):
+    """
+    Bulk create count users with an unusable password and return them
+    """
+    from django.contrib.auth import get_user_model
+
+    user_model = get_user_model()
+    user_model.objects.bulk_create([
+        user_model(email='{}{}@test.com'.format(prefix, i),
+                   name='{}{}'.format(prefix, i),
+                   avatarURL='https://avatar.test/{}{}'.format(prefix, i),
+                   password='!')
+        for i in range(count)
+    ], batch_size=500)
+    return list(user_model.objects.filter(
+        email__startswith=prefix).order_by('id'))
+
+
+@contextmanager
+def timer(results, name):
+    """
+    Store the elapsed seconds of the block in results[name]
+    """
+    start = time.perf_counter()
+    yield
+    results[name] = time.perf_counter() - start
+
+
+def print_table(headers, rows):
+    """
+    Print rows as an aligned text table
+    """
+    rows = [[str(cell) for cell in row] for row in rows]
+    widths = [max(len(str(header)), *(len(row[i]) for row in rows))
+              for i, header in enumerate(headers)]
+    line = '  '.join('{:<%d}' % width for width in widths)
+    print(line.format(*headers).rstrip())
+    print(line.format(*('-' * width for width in widths)))
+    for row in rows:
+        print(line.format(*row).rstrip())
@@ -0,0 +1,90 @@
+"""
+WSGI handlers running a lighter middleware chain for the api.
+
+The api is token authenticated JSON: it needs neither sessions, CSRF,
+messages, AuthenticationMiddleware nor X-Frame-Options, which the admin
+needs. PathDispatcher sends /api/ requests to an APIWSGIHandler running
+API_MIDDLEWARE and every other request to the WSGIHandler running
+MIDDLEWARE.
+"""
+import django
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured, MiddlewareNotUsed
+from django.core.handlers.exception import convert_exception_to_response
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.wsgi import get_wsgi_application
+from django.utils.module_loading import import_string
+
+
+class APIWSGIHandler(WSGIHandler):
+    """
+    WSGIHandler whose middleware chain is API_MIDDLEWARE
+    """
+
+    def load_middleware(self):
+        # As BaseHandler.load_middleware, from API_MIDDLEWARE
+        self._view_middleware = []
+        self._template_response_middleware = []
+        self._exception_middleware = []
+
+        handler = convert_exception_to_response(self._get_response)
+        for middleware_path in reversed(settings.API_MIDDLEWARE):
+            middleware = import_string(middleware_path)
+            try:
+                mw_instance = middleware(handler)
+            except MiddlewareNotUsed:
+                continue
+            if mw_instance is None:
+                raise ImproperlyConfigured(
+                    'Middleware factory %s returned None.' % middleware_path
+                )
+
+            if hasattr(mw_instance, 'process_view'):
+                self._view_middleware.insert(0, mw_instance.process_view)
+            if hasattr(mw_instance, 'process_template_response'):
+                self._template_response_middleware.append(
+                    mw_instance.process_template_response
+                )
+            if hasattr(mw_instance, 'process_exception'):
+                self._exception_middleware.append(
+                    mw_instance.process_exception
+                )
+            handler = convert_exception_to_response(mw_instance)
+
+        self._middleware_chain = handler
+
+
+class PathDispatcher:
+    """
+    WSGI application sending the requests whose path starts with
+    prefix to api_application, and the others to default_application
+    """
+
+    def __init__(self, default_application, api_application,
+                 prefix=None):
+        self.default_application = default_application
+        self.api_application = api_application
+        self.prefix = prefix or settings.API_PATH_PREFIX
+
+    def __call__(self, environ, start_response):
+        if environ.get('PATH_INFO', '').startswith(self.prefix):
+            return self.api_application(environ, start_response)
+        return self.default_application(environ, start_response)
+
+
+def get_api_wsgi_application():
+    """
+    Return the WSGI application of the api alone, as
+    django.core.wsgi.get_wsgi_application does for the whole site
+    """
+    django.setup(set_prefix=False)
+    return APIWSGIHandler()
+
+
+def get_dispatching_wsgi_application():
+    """
+    Return the WSGI application of the whole site, the api served with
+    API_MIDDLEWARE
+    """
+    return PathDispatcher(get_wsgi_application(),
+                          get_api_wsgi_application())
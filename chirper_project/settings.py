@@ -44,6 +44,8 @@ INSTALLED_APPS = [
     'rest_framework.authtoken',
     # Add core
     'core',
+    # Add api
+    'api',
 ]
 
 MIDDLEWARE = [
@@ -56,6 +58,15 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Middleware of the requests under API_PATH_PREFIX (see
+# chirper_project/handlers.py). The api is token authenticated JSON:
+# no sessions, CSRF, messages or frames
+API_PATH_PREFIX = '/api/'
+API_MIDDLEWARE = [
+    'django.middleware.security.SecurityMiddleware',
+    'django.middleware.common.CommonMiddleware',
+]
+
 ROOT_URLCONF = 'chirper_project.urls'
 
 TEMPLATES = [
@@ -107,6 +118,16 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Opt-in password hashing pool, used for login and signup when
+# PASSWORD_HASHERS lists core.hashing.PooledPBKDF2PasswordHasher in place
+# of django.contrib.auth.hashers.PBKDF2PasswordHasher.
+# A request waiting longer than the queue timeout for a free worker
+# gets a 503 response.
+
+PASSWORD_HASHING_MAX_WORKERS = 4
+PASSWORD_HASHING_QUEUE_TIMEOUT = 2.0
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/2.2/topics/i18n/
 
@@ -126,4 +147,79 @@ USE_TZ = True
 
 STATIC_URL = '/static/'
 
-AUTH_USER_MODEL = 'core.UserProfile'
\ No newline at end of file
+AUTH_USER_MODEL = 'core.UserProfile'
+
+# Django REST framework
+# Every list endpoint uses keyset pagination, see api/pagination.py
+
+REST_FRAMEWORK = {
+    'DEFAULT_PAGINATION_CLASS': 'api.pagination.KeysetPagination',
+    'PAGE_SIZE': 50,
+    'EXCEPTION_HANDLER': 'api.exceptions.exception_handler',
+}
+
+# Upper bound of the page_size query parameter of list endpoints
+API_MAX_PAGE_SIZE = 100
+
+# Upper bound of the ids of a batch user lookup (api user/batch/)
+USER_BATCH_MAX_IDS = 100
+
+# Batch api (api batch/): sub-requests per batch, and threads running
+# the reads of a concurrent batch
+BATCH_MAX_REQUESTS = 20
+BATCH_WORKERS = 4
+
+# Limits of the reply tree returned by Tweet.objects.thread()
+THREAD_MAX_DEPTH = 50
+THREAD_MAX_SIZE = 500
+
+# Home timelines: number of entries inserted per bulk INSERT when a
+# tweet is fanned out, and number of entries kept per user by the
+# prune_timelines command
+TIMELINE_FANOUT_BATCH_SIZE = 500
+TIMELINE_MAX_ENTRIES = 800
+
+# CachedTokenAuthentication: the shared cache tier (alias and timeout)
+# and the in-process LRU tier (max entries and timeout). The shared
+# tier is only used when the alias is a cache shared by the processes
+# (e.g. memcached or redis), not the default in-memory LocMemCache:
+# then the local timeout bounds how long another process may accept
+# a token after its user is changed or deleted
+AUTH_TOKEN_CACHE_ALIAS = 'default'
+AUTH_TOKEN_CACHE_TIMEOUT = 300
+AUTH_TOKEN_LOCAL_CACHE_SIZE = 10000
+AUTH_TOKEN_LOCAL_CACHE_TIMEOUT = 5
+
+# Bulk user import (api user/bulk-create/ and manage.py import_users):
+# users inserted per bulk_create, and password hashing processes,
+# started once per process and shared by the imports
+# (None: one per CPU, 0: hash in the importing process)
+USER_IMPORT_BATCH_SIZE = 500
+USER_IMPORT_WORKERS = 2
+
+# Bulk tweet ingestion (api tweet/bulk-create/ and manage.py
+# import_tweets): tweets validated and inserted per transaction
+TWEET_IMPORT_BATCH_SIZE = 1000
+
+# NDJSON export (api export/<name>/ and manage.py export_data):
+# rows fetched per keyset batch
+EXPORT_BATCH_SIZE = 2000
+
+# Trending hashtags (core/trending.py): each process counts tags per
+# bucket in a count-min sketch of width * depth integers and keeps the
+# top k, added to the rollup table every TRENDING_FLUSH_SECONDS, by the
+# tweet writes and by a background thread of the process.
+# The trending api sums the buckets of the window, cached for
+# TRENDING_CACHE_SECONDS
+TRENDING_BUCKET_SECONDS = 300
+TRENDING_WINDOW_SECONDS = 3600
+TRENDING_TOP_K = 100
+TRENDING_SKETCH_WIDTH = 2048
+TRENDING_SKETCH_DEPTH = 4
+TRENDING_FLUSH_SECONDS = 10
+TRENDING_CACHE_SECONDS = 10
+
+# Fragment cache (api/fragments.py): serialized representations of
+# objects, keyed by version, in this cache for FRAGMENT_CACHE_TIMEOUT
+FRAGMENT_CACHE_ALIAS = 'default'
+FRAGMENT_CACHE_TIMEOUT = 3600
@@ -0,0 +1,35 @@
+"""
+Settings profile of the api worker processes (chirper_project/wsgi_api.py).
+
+The settings of chirper_project/settings.py, without the apps, urls and
+middleware of the admin and of browsers: a worker serves token
+authenticated JSON only, so it does not import admin, sessions,
+messages, staticfiles or the template engine.
+"""
+
+from chirper_project.settings import *  # noqa: F401,F403
+from chirper_project.settings import API_MIDDLEWARE, INSTALLED_APPS, \
+    REST_FRAMEWORK
+
+
+INSTALLED_APPS = [
+    app for app in INSTALLED_APPS if app not in (
+        'django.contrib.admin',
+        'django.contrib.sessions',
+        'django.contrib.messages',
+        'django.contrib.staticfiles',
+    )
+]
+
+MIDDLEWARE = API_MIDDLEWARE
+
+ROOT_URLCONF = 'chirper_project.urls_api'
+
+# No browsable api, so no template
+TEMPLATES = []
+
+REST_FRAMEWORK = dict(REST_FRAMEWORK, DEFAULT_RENDERER_CLASSES=(
+    'rest_framework.renderers.JSONRenderer',
+))
+
+WSGI_APPLICATION = 'chirper_project.wsgi_api.application'
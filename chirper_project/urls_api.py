@@ -0,0 +1,9 @@
+"""
+URL configuration of the api worker processes (settings_api.py):
+the api alone, without the admin
+"""
+from django.urls import path, include
+
+urlpatterns = [
+    path('api/', include('api.urls'))
+]
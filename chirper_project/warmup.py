@@ -0,0 +1,80 @@
+"""
+Warm-up of a worker process, run before it serves its first request.
+
+The first request of a fresh process otherwise pays for populating the
+URL resolver, building the serializer fields (and the model metadata
+they read) and opening the database connection. The connections are
+opened by the process calling warm_up(): with a preforking server, call
+it in each worker (after the fork), never in a preloading master.
+"""
+import logging
+import time
+
+from django.db import connections
+from django.urls import URLResolver, get_resolver
+
+
+logger = logging.getLogger(__name__)
+
+
+def iter_views(patterns):
+    """
+    Yield the view functions of url patterns, included ones too
+    """
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from iter_views(pattern.url_patterns)
+        else:
+            yield pattern.callback
+
+
+def warm_urls():
+    resolver = get_resolver()
+    # Populate the reverse and namespace dicts of every resolver
+    resolver.reverse_dict
+    resolver.namespace_dict
+    return resolver
+
+
+def warm_serializers(resolver):
+    """
+    Build the fields of the serializer of every rest_framework view
+    """
+    built = set()
+    for view in iter_views(resolver.url_patterns):
+        serializer_class = getattr(getattr(view, 'cls', None),
+                                   'serializer_class', None)
+        if serializer_class is not None and serializer_class not in built:
+            serializer_class().fields
+            built.add(serializer_class)
+    return built
+
+
+def warm_connections():
+    for connection in connections.all():
+        connection.ensure_connection()
+
+
+def warm_up():
+    """
+    Prime the URL resolver, the serializer fields and the database
+    connections. Return the seconds spent by each step
+    """
+    timings = {}
+    start = time.perf_counter()
+    resolver = warm_urls()
+    timings['urls'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    warm_serializers(resolver)
+    timings['serializers'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    warm_connections()
+    timings['database'] = time.perf_counter() - start
+
+    logger.info('Worker warmed up in %.1f ms (%s)',
+                sum(timings.values()) * 1000,
+                ', '.join('{} {:.1f} ms'.format(step, seconds * 1000)
+                          for step, seconds in timings.items()))
+    return timings
@@ -2,6 +2,8 @@
 WSGI config for chirper_project project.
 
 It exposes the WSGI callable as a module-level variable named ``application``.
+Requests to /api/ go through the lighter API_MIDDLEWARE chain, see
+chirper_project/handlers.py.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/2.2/howto/deployment/wsgi/
@@ -9,8 +11,8 @@ https://docs.djangoproject.com/en/2.2/howto/deployment/wsgi/
 
 import os
 
-from django.core.wsgi import get_wsgi_application
+from chirper_project.handlers import get_dispatching_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'chirper_project.settings')
 
-application = get_wsgi_application()
+application = get_dispatching_wsgi_application()
@@ -0,0 +1,19 @@
+"""
+WSGI config of the api worker processes.
+
+It serves the api alone, with the settings profile
+chirper_project/settings_api.py, and warms the worker up
+(chirper_project/warmup.py) before exposing ``application``, so a
+worker is ready when the server reports it ready.
+"""
+
+import os
+
+from chirper_project.handlers import get_api_wsgi_application
+from chirper_project.warmup import warm_up
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE',
+                      'chirper_project.settings_api')
+
+application = get_api_wsgi_application()
+warm_up()
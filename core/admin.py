@@ -35,5 +35,15 @@ class UserAdmin(BaseUserAdmin):
     )
 
 
+class TweetAdmin(admin.ModelAdmin):
+    ordering = ['-id']
+    list_display = ['id', 'author', 'text', 'like_count', 'reply_count']
+    # Maintained by the tweet write paths (counters, versions and the
+    # conversation tree), or feeding them (likes, replying_to): an
+    # admin edit would desynchronize them
+    readonly_fields = ['likes', 'replying_to', 'like_count', 'reply_count',
+                       'version', 'root', 'depth']
+
+
 admin.site.register(models.UserProfile, UserAdmin)
-admin.site.register(models.Tweet)
\ No newline at end of file
+admin.site.register(models.Tweet, TweetAdmin)
\ No newline at end of file
@@ -1,5 +1,24 @@
 from django.apps import AppConfig
+from django.db import connections
+from django.db.models.signals import post_migrate
+
+from core import search
 
 
 class CoreConfig(AppConfig):
     name = 'core'
+
+    def ready(self):
+        # Connect signal handlers that keep denormalized data in sync
+        from core import signals  # noqa: F401
+        # Migrations rebuilding core_tweet on SQLite drop the triggers
+        # of the search index: create them again after every migrate
+        post_migrate.connect(install_search_triggers, sender=self)
+
+
+def install_search_triggers(sender, using, **kwargs):
+    """
+    post_migrate receiver creating the missing triggers of the tweet
+    search index (core/search.py)
+    """
+    search.reinstall_triggers(connections[using])
@@ -0,0 +1,41 @@
+import re
+
+
+# A hashtag or mention starts after a non-word character
+HASHTAG_RE = re.compile(r'(?<![\w#@])#(\w+)')
+# @ followed by an email address or by a user name
+MENTION_RE = re.compile(
+    r'(?<![\w#@])@([\w.+-]+@[\w-]+(?:\.[\w-]+)+|\w+)'
+)
+
+MAX_TAG_LENGTH = 100
+
+
+def normalize_tag(tag):
+    """
+    Return the stored form of a hashtag, without # and case folded
+    """
+    return tag.lstrip('#').casefold()
+
+
+def extract_hashtags(text):
+    """
+    Return the set of normalized hashtags of a text
+    """
+    return {
+        normalize_tag(tag) for tag in HASHTAG_RE.findall(text or '')
+        if len(tag) <= MAX_TAG_LENGTH
+    }
+
+
+def extract_mentions(text):
+    """
+    Return (emails, names) mentioned in a text
+    """
+    emails, names = set(), set()
+    for mention in MENTION_RE.findall(text or ''):
+        if '@' in mention:
+            emails.add(mention)
+        else:
+            names.add(mention)
+    return emails, names
@@ -0,0 +1,75 @@
+import zlib
+
+from django.contrib.auth import get_user_model
+from django.core.serializers.json import DjangoJSONEncoder
+
+from core.models import Tweet
+
+
+# Exported tables: name -> (model getter, [(key, column)]).
+# The first column is the primary key the export is ordered and
+# resumed by. Password hashes are never exported
+EXPORTS = {
+    'users': (get_user_model, [
+        ('id', 'id'), ('email', 'email'), ('name', 'name'),
+        ('avatarURL', 'avatarURL'), ('is_active', 'is_active'),
+        ('follower_count', 'follower_count'),
+        ('following_count', 'following_count'),
+    ]),
+    'tweets': (lambda: Tweet, [
+        ('id', 'id'), ('text', 'text'), ('author', 'author_id'),
+        ('replying_to', 'replying_to_id'), ('like_count', 'like_count'),
+        ('reply_count', 'reply_count'), ('created_at', 'created_at'),
+    ]),
+    'likes': (lambda: Tweet.likes.through, [
+        ('id', 'id'), ('tweet', 'tweet_id'), ('user', 'userprofile_id'),
+    ]),
+}
+
+
+def export_batches(name, after=None, batch_size=2000):
+    """
+    Yield lists of at most batch_size row dicts of the export name,
+    ordered by primary key and starting after the key `after`.
+    Rows are walked by keyset batches of values_list, so no model
+    instance is built and memory stays flat whatever the table size.
+    Raise KeyError for an unknown export
+    """
+    get_model, columns = EXPORTS[name]
+    keys = [key for key, _ in columns]
+    rows = get_model()._default_manager.order_by('pk').values_list(
+        *[column for _, column in columns]
+    )
+    last_id = after or 0
+    while True:
+        batch = list(rows.filter(pk__gt=last_id)[:batch_size])
+        if not batch:
+            return
+        yield [dict(zip(keys, row)) for row in batch]
+        if len(batch) < batch_size:
+            return
+        last_id = batch[-1][0]
+
+
+def ndjson_chunks(name, after=None, batch_size=2000):
+    """
+    Yield the export name as NDJSON bytes, one chunk per batch
+    """
+    encoder = DjangoJSONEncoder(separators=(',', ':'))
+    for batch in export_batches(name, after, batch_size):
+        yield ''.join(
+            encoder.encode(row) + '\n' for row in batch
+        ).encode()
+
+
+def gzip_chunks(chunks):
+    """
+    Compress a stream of bytes chunks into a gzip stream on the fly
+    """
+    # wbits=31: zlib with a gzip header and trailer
+    compressor = zlib.compressobj(wbits=31)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
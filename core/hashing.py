@@ -0,0 +1,162 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import django
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher, make_password
+
+
+class HashingQueueTimeout(Exception):
+    """
+    No hashing worker became free within the queue timeout
+    """
+
+
+class HashingExecutor:
+    """
+    Run password hashing on a fixed number of worker threads.
+    A caller waits at most queue_timeout seconds for a free worker,
+    then gets HashingQueueTimeout, so a burst of logins cannot queue
+    without bound and starve the other requests.
+    PBKDF2 (hashlib) releases the GIL, so workers hash in parallel
+    """
+
+    def __init__(self, max_workers, queue_timeout):
+        self.max_workers = max_workers
+        self.queue_timeout = queue_timeout
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix='password-hashing'
+        )
+        self._slots = threading.BoundedSemaphore(max_workers)
+        self._lock = threading.Lock()
+        self._waiting = 0
+        self._running = 0
+        self._completed = 0
+        self._rejected = 0
+        self._wait_seconds = 0.0
+        self._hash_seconds = 0.0
+        self._max_hash_seconds = 0.0
+
+    def run(self, fn, *args, **kwargs):
+        """
+        Run fn(*args, **kwargs) on a worker and return its result.
+        Raise HashingQueueTimeout if no worker is free in time
+        """
+        with self._lock:
+            self._waiting += 1
+        start = time.monotonic()
+        acquired = self._slots.acquire(timeout=self.queue_timeout)
+        with self._lock:
+            self._waiting -= 1
+            self._wait_seconds += time.monotonic() - start
+            if not acquired:
+                self._rejected += 1
+        if not acquired:
+            raise HashingQueueTimeout(
+                'No password hashing worker free after {}s'.format(
+                    self.queue_timeout)
+            )
+        try:
+            return self._pool.submit(self._timed, fn, args, kwargs).result()
+        finally:
+            self._slots.release()
+
+    def _timed(self, fn, args, kwargs):
+        """
+        Run fn on the worker thread and record its duration
+        """
+        with self._lock:
+            self._running += 1
+        start = time.monotonic()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            elapsed = time.monotonic() - start
+            with self._lock:
+                self._running -= 1
+                self._completed += 1
+                self._hash_seconds += elapsed
+                self._max_hash_seconds = max(self._max_hash_seconds, elapsed)
+
+    def metrics(self):
+        """
+        Return a snapshot of the executor metrics
+        """
+        with self._lock:
+            return {
+                'max_workers': self.max_workers,
+                'queue_timeout': self.queue_timeout,
+                'queue_depth': self._waiting,
+                'running': self._running,
+                'completed': self._completed,
+                'rejected': self._rejected,
+                'wait_seconds_total': self._wait_seconds,
+                'hash_seconds_total': self._hash_seconds,
+                'hash_seconds_max': self._max_hash_seconds,
+                'hash_seconds_avg': (
+                    self._hash_seconds / self._completed
+                    if self._completed else 0.0
+                ),
+            }
+
+    def shutdown(self):
+        self._pool.shutdown(wait=True)
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """
+    Return the process wide executor configured by
+    PASSWORD_HASHING_MAX_WORKERS and PASSWORD_HASHING_QUEUE_TIMEOUT
+    """
+    global _executor
+    config = (settings.PASSWORD_HASHING_MAX_WORKERS,
+              settings.PASSWORD_HASHING_QUEUE_TIMEOUT)
+    with _executor_lock:
+        if _executor is None or \
+                (_executor.max_workers, _executor.queue_timeout) != config:
+            if _executor is not None:
+                _executor.shutdown()
+            _executor = HashingExecutor(*config)
+        return _executor
+
+
+class PooledPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """
+    PBKDF2 hasher that computes the hash on the HashingExecutor.
+    Only the CPU work leaves the request thread: database access in
+    authenticate() and set_password() callers stays where it was.
+    It keeps the pbkdf2_sha256 algorithm, so stored hashes are
+    compatible both ways. Enable it by listing it in place of
+    PBKDF2PasswordHasher in PASSWORD_HASHERS
+    """
+
+    def encode(self, password, salt, iterations=None):
+        parent = super()
+        return get_executor().run(parent.encode, password, salt, iterations)
+
+
+def init_hashing_process():
+    """
+    Initializer of hashing worker processes.
+    A spawned process starts without Django configured. A forked one
+    inherits the HashingExecutor of its parent without its threads:
+    forget it, so PooledPBKDF2PasswordHasher starts a new one
+    """
+    global _executor, _executor_lock
+    _executor = None
+    _executor_lock = threading.Lock()
+    if not apps.ready:
+        django.setup()
+
+
+def hash_password(password):
+    """
+    Return the hash of password, for worker processes
+    """
+    return make_password(password)
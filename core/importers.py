@@ -0,0 +1,343 @@
+import csv
+import json
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+
+from core.hashing import hash_password, init_hashing_process
+
+
+def read_rows(lines, file_format):
+    """
+    Yield (line number, row dict) from an iterable of text lines
+    in 'jsonl' or 'csv' format, one line at a time.
+    A line that cannot be parsed yields (line number, None)
+    """
+    if file_format == 'csv':
+        reader = csv.DictReader(lines)
+        for row in reader:
+            yield reader.line_num, row
+    elif file_format == 'jsonl':
+        for number, line in enumerate(lines, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                row = None
+            yield number, row if isinstance(row, dict) else None
+    else:
+        raise ValueError('Unknown format {}'.format(file_format))
+
+
+def chunked(iterable, size):
+    """
+    Yield lists of at most size items of iterable
+    """
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def parse_id(value):
+    """
+    Return the primary key held by a JSON or CSV value, None if empty.
+    Raise ValueError if it is not a positive integer
+    """
+    if value is None or value == '':
+        return None
+    if isinstance(value, bool):
+        raise ValueError('Not an id')
+    number = int(value)
+    if number < 1:
+        raise ValueError('Not an id')
+    return number
+
+
+_pool = None
+_pool_workers = None
+_pool_lock = threading.Lock()
+
+
+def get_hashing_pool(workers):
+    """
+    Return the process wide pool of password hashing processes, started
+    once and reused by every import. The processes are spawned, not
+    forked, so they never inherit the threads and locks of a web worker
+    """
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown()
+            _pool_workers = workers
+            _pool = ProcessPoolExecutor(
+                max_workers=workers, initializer=init_hashing_process,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        return _pool
+
+
+def reset_hashing_pool():
+    """
+    Forget a broken pool, the next import starts a new one
+    """
+    global _pool
+    with _pool_lock:
+        _pool = None
+
+
+class ImportReport:
+    """
+    Result of a bulk import: the number of created rows and the
+    errors of the rejected ones, by line
+    """
+
+    def __init__(self):
+        self.created = 0
+        self.errors = []
+
+    def add_error(self, line, message, **extra):
+        self.errors.append(dict(line=line, error=message, **extra))
+
+    def as_dict(self):
+        return {
+            'created': self.created,
+            'errors': sorted(self.errors, key=lambda error: error['line'])
+        }
+
+
+def error_message(error):
+    """
+    Return a readable message of a validation error
+    """
+    if isinstance(error, ValidationError):
+        return ' '.join(error.messages)
+    return str(error)
+
+
+class UserImporter:
+    """
+    Create users from rows of email, name, password and avatarURL.
+    Rows are validated with UserProfileManager.validate_user, their
+    passwords are hashed on a process pool and each chunk is inserted
+    with bulk_create. Invalid rows are reported, never abort the import
+    """
+
+    def __init__(self, user_model, batch_size=500, workers=None):
+        self.user_model = user_model
+        self.batch_size = batch_size
+        # Size of the shared hashing pool: 0 hashes in this process,
+        # None uses one process per CPU
+        self.workers = workers
+
+    def run(self, rows):
+        """
+        Import the (line number, row) pairs and return an ImportReport
+        """
+        report = ImportReport()
+        pool = get_hashing_pool(self.workers) if self.workers != 0 else None
+        try:
+            for chunk in chunked(rows, self.batch_size):
+                self.import_chunk(chunk, report, pool)
+        except BrokenProcessPool:
+            reset_hashing_pool()
+            raise
+        return report
+
+    def validate_chunk(self, chunk, report):
+        """
+        Return the list of (line, user fields) of the valid rows
+        """
+        manager = self.user_model.objects
+        valid = []
+        seen = set()
+        for line, row in chunk:
+            if row is None:
+                report.add_error(line, 'Malformed row')
+                continue
+            wrong = [name for name in ('email', 'name', 'password',
+                                       'avatarURL')
+                     if row.get(name) is not None and
+                     not isinstance(row[name], str)]
+            if wrong:
+                report.add_error(line, 'Malformed ' + ', '.join(wrong))
+                continue
+            try:
+                email = manager.validate_user(
+                    row.get('email'), row.get('name'), row.get('password')
+                )
+            except (ValueError, ValidationError) as error:
+                report.add_error(line, error_message(error),
+                                 email=row.get('email'))
+                continue
+            if email in seen:
+                report.add_error(line, 'Duplicated email in file',
+                                 email=email)
+                continue
+            seen.add(email)
+            valid.append((line, {
+                'email': email,
+                'name': row['name'],
+                'password': row['password'],
+                'avatarURL': row.get('avatarURL') or '',
+            }))
+
+        # One query for the emails already taken
+        existing = set(manager.filter(
+            email__in=[fields['email'] for _, fields in valid]
+        ).values_list('email', flat=True))
+        accepted = []
+        for line, fields in valid:
+            if fields['email'] in existing:
+                report.add_error(line, 'User with this email already exists',
+                                 email=fields['email'])
+            else:
+                accepted.append((line, fields))
+        return accepted
+
+    def import_chunk(self, chunk, report, pool):
+        """
+        Validate, hash and insert a chunk of rows
+        """
+        accepted = self.validate_chunk(chunk, report)
+        if not accepted:
+            return
+
+        passwords = [fields.pop('password') for _, fields in accepted]
+        if pool is None:
+            hashes = [hash_password(password) for password in passwords]
+        else:
+            hashes = list(pool.map(hash_password, passwords))
+        users = [
+            (line, self.user_model(password=hashed, **fields))
+            for (line, fields), hashed in zip(accepted, hashes)
+        ]
+
+        try:
+            with transaction.atomic():
+                self.user_model.objects.bulk_create(
+                    [user for _, user in users]
+                )
+            report.created += len(users)
+        except IntegrityError:
+            # A concurrent insert took one of the emails:
+            # retry the chunk row by row to report the culprits
+            for line, user in users:
+                try:
+                    with transaction.atomic():
+                        user.save()
+                    report.created += 1
+                except IntegrityError:
+                    report.add_error(
+                        line, 'User with this email already exists',
+                        email=user.email
+                    )
+
+
+class TweetImporter:
+    """
+    Create tweets from rows of text, author (user id) and optional
+    replying_to (tweet id). Rows are validated with the same
+    TweetManager.validate as Tweet.objects.create, the author and
+    replied tweet of a whole chunk are resolved with one in_bulk each,
+    and each chunk is inserted with bulk_create in its own transaction.
+    Invalid rows are reported, never abort the import
+    """
+
+    def __init__(self, user_model, tweet_model, batch_size=1000):
+        self.user_model = user_model
+        self.tweet_model = tweet_model
+        self.batch_size = batch_size
+
+    def run(self, rows):
+        """
+        Import the (line number, row) pairs and return an ImportReport
+        """
+        report = ImportReport()
+        for chunk in chunked(rows, self.batch_size):
+            self.import_chunk(chunk, report)
+        return report
+
+    def parse_chunk(self, chunk, report):
+        """
+        Return the list of (line, text, author id, replying_to id)
+        of the rows passing the checks that need no database access
+        """
+        manager = self.tweet_model.objects
+        parsed = []
+        for line, row in chunk:
+            if row is None:
+                report.add_error(line, 'Malformed row')
+                continue
+            text = row.get('text')
+            if text is not None and not isinstance(text, str):
+                report.add_error(line, 'Malformed text')
+                continue
+            try:
+                manager.validate_text(text)
+            except ValueError as error:
+                report.add_error(line, error_message(error))
+                continue
+            try:
+                author_id = parse_id(row.get('author'))
+                replying_to_id = parse_id(row.get('replying_to'))
+            except (TypeError, ValueError):
+                report.add_error(line, 'Malformed author or replying_to')
+                continue
+            if author_id is None:
+                report.add_error(line, 'The author is required')
+                continue
+            parsed.append((line, text, author_id, replying_to_id))
+        return parsed
+
+    def import_chunk(self, chunk, report):
+        """
+        Validate and insert a chunk of rows
+        """
+        parsed = self.parse_chunk(chunk, report)
+        if not parsed:
+            return
+
+        # One query each for the authors and the replied tweets
+        authors = self.user_model.objects.in_bulk(
+            {author_id for _, _, author_id, _ in parsed}
+        )
+        parents = self.tweet_model.objects.in_bulk(
+            {parent_id for _, _, _, parent_id in parsed if parent_id}
+        )
+
+        manager = self.tweet_model.objects
+        tweets = []
+        for line, text, author_id, replying_to_id in parsed:
+            author = authors.get(author_id)
+            if author is None:
+                report.add_error(line, 'Unknown author {}'.format(author_id))
+                continue
+            extra = {}
+            if replying_to_id:
+                replying_to = parents.get(replying_to_id)
+                if replying_to is None:
+                    report.add_error(
+                        line, 'Unknown tweet {}'.format(replying_to_id)
+                    )
+                    continue
+                extra['replying_to'] = replying_to
+                extra['root_id'], extra['depth'] = \
+                    manager.thread_position(replying_to)
+            tweets.append(self.tweet_model(text=text, author=author,
+                                           **extra))
+        if not tweets:
+            return
+
+        with transaction.atomic():
+            manager.bulk_insert(tweets)
+        report.created += len(tweets)
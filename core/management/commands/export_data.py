@@ -0,0 +1,53 @@
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.exporters import EXPORTS, gzip_chunks, ndjson_chunks
+
+
+class Command(BaseCommand):
+    """
+    Export users, tweets or likes as NDJSON
+    """
+    help = 'Stream a table as NDJSON, ordered by id, to a file or stdout'
+
+    def add_arguments(self, parser):
+        parser.add_argument('name', choices=sorted(EXPORTS))
+        parser.add_argument(
+            '--output', default=None,
+            help='Output file, stdout by default'
+        )
+        parser.add_argument(
+            '--after', type=int, default=0,
+            help='Resume after the row with this id'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=settings.EXPORT_BATCH_SIZE,
+            help='Number of rows fetched per query'
+        )
+        parser.add_argument(
+            '--gzip', action='store_true',
+            help='Compress the output with gzip'
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be a positive integer')
+
+        chunks = ndjson_chunks(options['name'], options['after'],
+                               batch_size=options['batch_size'])
+        if options['gzip']:
+            chunks = gzip_chunks(chunks)
+
+        if options['output'] is None:
+            for chunk in chunks:
+                sys.stdout.buffer.write(chunk)
+            sys.stdout.buffer.flush()
+            return
+        try:
+            with open(options['output'], 'wb') as output:
+                for chunk in chunks:
+                    output.write(chunk)
+        except OSError as error:
+            raise CommandError(str(error))
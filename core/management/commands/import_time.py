@@ -0,0 +1,121 @@
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+# Imports of a worker process: Django, its apps and the url
+# configuration, which imports every view, serializer and model
+STARTUP_CODE = (
+    'import django; django.setup(); '
+    'from importlib import import_module; '
+    'from django.conf import settings; '
+    'import_module(settings.ROOT_URLCONF); '
+    'import_module("chirper_project.handlers"); '
+    '[import_module(name) for name in {modules!r}]'
+)
+
+
+def parse_importtime(output):
+    """
+    Return (module, self us, cumulative us, depth) of every import
+    reported by python -X importtime
+    """
+    imports = []
+    for line in output.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        columns = line[len('import time:'):].split('|')
+        if len(columns) != 3 or not columns[0].strip().isdigit():
+            # The header line
+            continue
+        name = columns[2].rstrip()
+        module = name.lstrip()
+        depth = (len(name) - len(module) - 1) // 2
+        imports.append((module, int(columns[0]), int(columns[1]), depth))
+    return imports
+
+
+def package_of(module, depth):
+    """
+    Return the first depth dotted components of a module name
+    """
+    return '.'.join(module.split('.')[:depth])
+
+
+class Command(BaseCommand):
+    """
+    Report the import cost of a worker process, per module
+    """
+    help = 'Start Django and import the url configuration in a fresh ' \
+           'python -X importtime process, then report the modules ' \
+           'or packages costing the most import time'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--settings-module',
+            help='Settings of the measured process, e.g. '
+                 'chirper_project.settings_api for an api worker '
+                 '(default: the current DJANGO_SETTINGS_MODULE)'
+        )
+        parser.add_argument(
+            '--module', action='append', default=[], dest='modules',
+            help='Other module imported by the measured process '
+                 '(repeatable)'
+        )
+        parser.add_argument(
+            '--limit', type=int, default=20,
+            help='Number of modules or packages reported'
+        )
+        parser.add_argument(
+            '--package-depth', type=int, default=0,
+            help='Sum the self time per package of this many dotted '
+                 'components (e.g. 3 for django.contrib.admin) instead '
+                 'of reporting modules'
+        )
+
+    def measure(self, settings_module, modules):
+        env = dict(os.environ)
+        if settings_module:
+            env['DJANGO_SETTINGS_MODULE'] = settings_module
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c',
+             STARTUP_CODE.format(modules=modules)],
+            env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+            universal_newlines=True
+        )
+        if result.returncode:
+            raise CommandError('The measured process failed:\n' +
+                               result.stderr[-2000:])
+        return parse_importtime(result.stderr)
+
+    def handle(self, *args, **options):
+        if options['limit'] < 1:
+            raise CommandError('--limit must be a positive integer')
+        imports = self.measure(options['settings_module'],
+                               options['modules'])
+        total = sum(cumulative for _, _, cumulative, depth in imports
+                    if depth == 0)
+        self.stdout.write('{} modules imported in {:.1f} ms'.format(
+            len(imports), total / 1000))
+
+        if options['package_depth'] > 0:
+            costs = defaultdict(int)
+            for module, self_us, _, _ in imports:
+                costs[package_of(module, options['package_depth'])] += \
+                    self_us
+            rows = sorted(costs.items(), key=lambda item: -item[1])
+            self.stdout.write('{:>10}  {}'.format('self ms', 'package'))
+            for package, self_us in rows[:options['limit']]:
+                self.stdout.write('{:>10.1f}  {}'.format(self_us / 1000,
+                                                         package))
+            return
+
+        rows = sorted(imports, key=lambda item: -item[2])
+        self.stdout.write('{:>10}  {:>10}  {}'.format(
+            'self ms', 'cumul. ms', 'module'))
+        for module, self_us, cumulative, _ in rows[:options['limit']]:
+            self.stdout.write('{:>10.1f}  {:>10.1f}  {}'.format(
+                self_us / 1000, cumulative / 1000, module))
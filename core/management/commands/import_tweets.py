@@ -0,0 +1,57 @@
+import os
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from core.importers import TweetImporter, read_rows
+from core.models import Tweet
+
+
+class Command(BaseCommand):
+    """
+    Create tweets in bulk from a JSONL or CSV file
+    """
+    help = 'Stream tweets (text, author, replying_to) from a ' \
+           'JSONL or CSV file and create them in chunks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='JSONL or CSV file')
+        parser.add_argument(
+            '--format', choices=('jsonl', 'csv'), default=None,
+            help='File format, guessed from the extension by default'
+        )
+        parser.add_argument(
+            '--batch-size', type=int,
+            default=settings.TWEET_IMPORT_BATCH_SIZE,
+            help='Number of tweets inserted per transaction'
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format'] or \
+            os.path.splitext(path)[1].lstrip('.').lower()
+        if file_format == 'json':
+            file_format = 'jsonl'
+        if file_format not in ('jsonl', 'csv'):
+            raise CommandError('Cannot guess the format of {}, '
+                               'use --format'.format(path))
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be a positive integer')
+
+        importer = TweetImporter(get_user_model(), Tweet,
+                                 batch_size=options['batch_size'])
+        try:
+            with open(path, newline='', encoding='utf-8') as lines:
+                report = importer.run(read_rows(lines, file_format))
+        except OSError as error:
+            raise CommandError(str(error))
+
+        for error in report.as_dict()['errors']:
+            self.stderr.write(
+                'Line {}: {}'.format(error['line'], error['error'])
+            )
+        self.stdout.write(self.style.SUCCESS(
+            'Created {} tweets, rejected {}'.format(
+                report.created, len(report.errors))
+        ))
@@ -0,0 +1,60 @@
+import os
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from core.importers import UserImporter, read_rows
+
+
+class Command(BaseCommand):
+    """
+    Create users in bulk from a JSONL or CSV file
+    """
+    help = 'Stream users (email, name, password, avatarURL) from a ' \
+           'JSONL or CSV file and create them in chunks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='JSONL or CSV file')
+        parser.add_argument(
+            '--format', choices=('jsonl', 'csv'), default=None,
+            help='File format, guessed from the extension by default'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=settings.USER_IMPORT_BATCH_SIZE,
+            help='Number of users inserted per bulk_create'
+        )
+        parser.add_argument(
+            '--workers', type=int, default=settings.USER_IMPORT_WORKERS,
+            help='Password hashing processes (0 hashes in this process)'
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format'] or \
+            os.path.splitext(path)[1].lstrip('.').lower()
+        if file_format == 'json':
+            file_format = 'jsonl'
+        if file_format not in ('jsonl', 'csv'):
+            raise CommandError('Cannot guess the format of {}, '
+                               'use --format'.format(path))
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be a positive integer')
+
+        importer = UserImporter(get_user_model(),
+                                batch_size=options['batch_size'],
+                                workers=options['workers'])
+        try:
+            with open(path, newline='', encoding='utf-8') as lines:
+                report = importer.run(read_rows(lines, file_format))
+        except OSError as error:
+            raise CommandError(str(error))
+
+        for error in report.as_dict()['errors']:
+            self.stderr.write(
+                'Line {}: {}'.format(error['line'], error['error'])
+            )
+        self.stdout.write(self.style.SUCCESS(
+            'Created {} users, rejected {}'.format(
+                report.created, len(report.errors))
+        ))
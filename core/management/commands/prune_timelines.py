@@ -0,0 +1,34 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import TimelineEntry
+
+
+class Command(BaseCommand):
+    """
+    Keep only the newest entries of every home timeline
+    """
+    help = 'Delete the timeline entries beyond the per user cap ' \
+           '(TIMELINE_MAX_ENTRIES by default)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--keep', type=int, default=None,
+            help='Number of entries kept per user'
+        )
+
+    def handle(self, *args, **options):
+        keep = options['keep']
+        if keep is None:
+            keep = settings.TIMELINE_MAX_ENTRIES
+        if keep < 0:
+            raise CommandError('--keep must not be negative')
+
+        owners = deleted = 0
+        for owner_id in TimelineEntry.objects.owners_over(keep).iterator():
+            owners += 1
+            deleted += TimelineEntry.objects.prune(owner_id, keep)
+
+        self.stdout.write(self.style.SUCCESS(
+            'Deleted {} entries from {} timelines'.format(deleted, owners)
+        ))
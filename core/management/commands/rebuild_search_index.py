@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import NotSupportedError
+
+from core import search
+
+
+class Command(BaseCommand):
+    """
+    Rebuild the full-text search index of tweets
+    """
+    help = 'Re-create the tweet search triggers if missing and index ' \
+           'every tweet again, in batches of ascending ids'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=5000,
+            help='Number of tweets indexed per statement'
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be a positive integer')
+        try:
+            indexed = search.rebuild(batch_size=options['batch_size'])
+        except NotSupportedError as error:
+            raise CommandError(str(error))
+        self.stdout.write(
+            self.style.SUCCESS('Indexed {} tweets'.format(indexed))
+        )
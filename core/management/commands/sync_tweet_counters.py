@@ -0,0 +1,60 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Max
+
+from core.models import Tweet
+
+
+class Command(BaseCommand):
+    """
+    Repair or check the denormalized like_count / reply_count of tweets
+    """
+    help = 'Recompute the stored like and reply counters of tweets ' \
+           'in batches, or check them with --check'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Number of tweet ids updated per statement'
+        )
+        parser.add_argument(
+            '--check', action='store_true',
+            help='Only report tweets whose counters are out of sync'
+        )
+
+    def handle(self, *args, **options):
+        if options['check']:
+            return self.check_counters()
+
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError('--batch-size must be a positive integer')
+
+        max_id = Tweet.objects.aggregate(max_id=Max('id'))['max_id'] or 0
+        updated = 0
+        for start in range(0, max_id + 1, batch_size):
+            updated += Tweet.objects.recount(start, start + batch_size)
+
+        self.stdout.write(
+            self.style.SUCCESS('Repaired {} tweets'.format(updated))
+        )
+
+    def check_counters(self):
+        """
+        Print the out of sync tweets, fail if there is any
+        """
+        mismatches = Tweet.objects.counter_mismatches().values_list(
+            'id', 'like_count', 'actual_like_count',
+            'reply_count', 'actual_reply_count'
+        )
+        count = 0
+        for row in mismatches.iterator():
+            count += 1
+            self.stdout.write(
+                'Tweet {}: likes {} (actual {}), '
+                'replies {} (actual {})'.format(*row)
+            )
+        if count:
+            raise CommandError(
+                '{} tweets have out of sync counters'.format(count)
+            )
+        self.stdout.write(self.style.SUCCESS('All counters are in sync'))
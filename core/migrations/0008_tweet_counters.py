@@ -0,0 +1,60 @@
+# Generated by Django 2.2 on 2026-10-17 02:15
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+BATCH_SIZE = 1000
+
+
+def backfill_counters(apps, schema_editor):
+    """
+    Fill like_count and reply_count of existing tweets, one id range
+    at a time so a large table is never updated in a single statement
+    """
+    Tweet = apps.get_model('core', 'Tweet')
+    likes = Tweet.likes.through.objects.filter(
+        tweet_id=OuterRef('pk')
+    ).order_by().values('tweet_id').annotate(
+        count=Count('*')
+    ).values('count')
+    replies = Tweet.objects.filter(
+        replying_to=OuterRef('pk')
+    ).order_by().values('replying_to').annotate(
+        count=Count('*')
+    ).values('count')
+
+    max_id = Tweet.objects.aggregate(max_id=Max('id'))['max_id'] or 0
+    for start in range(0, max_id + 1, BATCH_SIZE):
+        Tweet.objects.filter(
+            id__gte=start, id__lt=start + BATCH_SIZE
+        ).update(
+            like_count=Coalesce(
+                Subquery(likes, output_field=IntegerField()), 0
+            ),
+            reply_count=Coalesce(
+                Subquery(replies, output_field=IntegerField()), 0
+            )
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_auto_20220306_0911'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tweet',
+            name='like_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='tweet',
+            name='reply_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
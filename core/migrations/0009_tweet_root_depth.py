@@ -0,0 +1,28 @@
+# Generated by Django 2.2 on 2026-10-17 02:19
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_tweet_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tweet',
+            name='depth',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='tweet',
+            name='root',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='core.Tweet'),
+        ),
+        migrations.AddIndex(
+            model_name='tweet',
+            index=models.Index(fields=['root', 'created_at'], name='core_tweet_root_created_idx'),
+        ),
+    ]
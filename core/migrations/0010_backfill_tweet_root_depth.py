@@ -0,0 +1,57 @@
+from django.db import migrations
+
+
+BATCH_SIZE = 1000
+
+
+def backfill_root_depth(apps, schema_editor, batch_size=BATCH_SIZE):
+    """
+    Compute root and depth of existing replies.
+    A reply is always created after the tweet it replies to, so ids
+    ascend along a thread: walking the replies by ascending id in
+    batches, the parent of a reply is either already stored or
+    earlier in the same batch. Only one batch is held in memory.
+    """
+    Tweet = apps.get_model('core', 'Tweet')
+    replies = Tweet.objects.filter(
+        replying_to__isnull=False
+    ).order_by('id')
+
+    last_id = 0
+    while True:
+        batch = list(replies.filter(id__gt=last_id).values_list(
+            'id', 'replying_to_id'
+        )[:batch_size])
+        if not batch:
+            break
+
+        # (root_id, depth) of every parent, this batch first
+        known = {}
+        outside = {parent_id for _, parent_id in batch} - \
+            {tweet_id for tweet_id, _ in batch}
+        for tweet_id, root_id, depth in Tweet.objects.filter(
+            id__in=outside
+        ).values_list('id', 'root_id', 'depth'):
+            known[tweet_id] = (root_id, depth)
+
+        updates = []
+        for tweet_id, parent_id in batch:
+            parent_root_id, parent_depth = known.get(parent_id, (None, 0))
+            known[tweet_id] = (parent_root_id or parent_id, parent_depth + 1)
+            updates.append(Tweet(
+                id=tweet_id, root_id=known[tweet_id][0],
+                depth=known[tweet_id][1]
+            ))
+        Tweet.objects.bulk_update(updates, ['root', 'depth'])
+        last_id = batch[-1][0]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_tweet_root_depth'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_root_depth, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,34 @@
+from django.db import migrations
+
+from core import search
+
+
+def create_index(apps, schema_editor):
+    """
+    Create the FTS5 index of tweets with its triggers and index the
+    existing tweets. Search is only available on SQLite
+    """
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    search.install_triggers(schema_editor.connection)
+    schema_editor.execute(
+        "INSERT INTO core_tweet_search(core_tweet_search) VALUES ('rebuild')"
+    )
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for sql in search.DROP_SQL:
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_follow'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 2.2 on 2026-10-17 02:37
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_tweet_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Mention',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='TweetTag',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tag', models.CharField(max_length=100)),
+                ('created_at', models.DateTimeField()),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='userprofile',
+            index=models.Index(fields=['name'], name='core_user_name_idx'),
+        ),
+        migrations.AddField(
+            model_name='tweettag',
+            name='tweet',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tags', to='core.Tweet'),
+        ),
+        migrations.AddField(
+            model_name='mention',
+            name='tweet',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='mentions', to='core.Tweet'),
+        ),
+        migrations.AddField(
+            model_name='mention',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='mentioned_in', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='tweettag',
+            index=models.Index(fields=['tag', 'created_at'], name='core_tweettag_tag_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='tweettag',
+            unique_together={('tweet', 'tag')},
+        ),
+        migrations.AddIndex(
+            model_name='mention',
+            index=models.Index(fields=['user', 'created_at'], name='core_mention_user_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='mention',
+            unique_together={('tweet', 'user')},
+        ),
+    ]
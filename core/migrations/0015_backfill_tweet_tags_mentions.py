@@ -0,0 +1,92 @@
+from django.db import migrations
+from django.db.models import Q
+
+from core.entities import extract_hashtags, extract_mentions
+
+
+BATCH_SIZE = 1000
+
+
+def normalize_email(email):
+    """
+    Lowercase the domain, as UserProfileManager.normalize_email
+    """
+    name, _, domain = email.rpartition('@')
+    return '{}@{}'.format(name, domain.lower())
+
+
+def backfill_tags_mentions(apps, schema_editor, batch_size=BATCH_SIZE):
+    """
+    Store the hashtags and mentions of existing tweets, walking the
+    tweets that may hold one by ascending id in batches
+    """
+    Tweet = apps.get_model('core', 'Tweet')
+    TweetTag = apps.get_model('core', 'TweetTag')
+    Mention = apps.get_model('core', 'Mention')
+    UserProfile = apps.get_model('core', 'UserProfile')
+    tweets = Tweet.objects.filter(
+        Q(text__contains='#') | Q(text__contains='@')
+    ).order_by('id')
+
+    last_id = 0
+    while True:
+        batch = list(tweets.filter(id__gt=last_id).values_list(
+            'id', 'text', 'created_at'
+        )[:batch_size])
+        if not batch:
+            break
+
+        tags, mentions = [], []
+        all_emails, all_names = set(), set()
+        for tweet_id, text, created_at in batch:
+            tags.extend(
+                TweetTag(tweet_id=tweet_id, tag=tag, created_at=created_at)
+                for tag in extract_hashtags(text)
+            )
+            emails, names = extract_mentions(text)
+            emails = {normalize_email(email) for email in emails}
+            if emails or names:
+                mentions.append((tweet_id, created_at, emails, names))
+                all_emails |= emails
+                all_names |= names
+
+        by_email, by_name, ambiguous = {}, {}, set()
+        if mentions:
+            for user_id, email, name in UserProfile.objects.filter(
+                Q(email__in=all_emails) | Q(name__in=all_names)
+            ).values_list('id', 'email', 'name'):
+                if email in all_emails:
+                    by_email[email] = user_id
+                if name in all_names:
+                    if name in by_name:
+                        ambiguous.add(name)
+                    by_name[name] = user_id
+        for name in ambiguous:
+            del by_name[name]
+
+        links = []
+        for tweet_id, created_at, emails, names in mentions:
+            user_ids = {by_email.get(email) for email in emails} | \
+                {by_name.get(name) for name in names}
+            user_ids.discard(None)
+            links.extend(
+                Mention(tweet_id=tweet_id, user_id=user_id,
+                        created_at=created_at)
+                for user_id in user_ids
+            )
+
+        TweetTag.objects.bulk_create(tags, ignore_conflicts=True)
+        Mention.objects.bulk_create(links, ignore_conflicts=True)
+        last_id = batch[-1][0]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_tweet_tags_mentions'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_tags_mentions,
+                             migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 2.2 on 2026-10-17 02:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_backfill_tweet_tags_mentions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrendingTagCount',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.DateTimeField()),
+                ('tag', models.CharField(max_length=100)),
+                ('count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'unique_together': {('bucket', 'tag')},
+            },
+        ),
+    ]
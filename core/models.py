@@ -1,8 +1,74 @@
-from django.db import models
+from collections import Counter, defaultdict
+from itertools import chain
+
+from django.db import IntegrityError, NotSupportedError, connections, \
+    models, transaction
+from django.db.models import Count, Exists, F, IntegerField, OuterRef, \
+    Subquery, Sum
+from django.db.models.functions import Coalesce
 from django.conf import settings
 from django.core.validators import validate_email
 from django.contrib.auth.models import AbstractBaseUser,\
     PermissionsMixin, BaseUserManager    # To create custom user model
+from django.utils import timezone
+
+from core import trending
+from core.entities import extract_hashtags, extract_mentions
+from core.search import search_ids
+
+
+def version_bump():
+    """
+    Return the update() kwargs marking rows as changed: a new version
+    and updated_at, behind the ETag and Last-Modified of the api.
+    Every update() of a rendered column must include them
+    """
+    return {'version': F('version') + 1, 'updated_at': timezone.now()}
+
+
+def delete_likes(likes):
+    """
+    Delete a queryset of like rows in one DELETE and return the number
+    of deleted rows. The m2m_changed receiver of the likes (see
+    core/signals.py) makes QuerySet.delete() select the rows first, and
+    the callers keep the counters themselves
+    """
+    return likes._raw_delete(likes.db)
+
+
+class VersionedModelMixin:
+    """
+    Count a new version on every save of an existing row.
+    The version is counted by the database, so the save of a stale
+    instance still gets a version of its own. previous_version holds
+    the version the instance was loaded with, None when deferred
+    """
+    previous_version = None
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if self._state.adding or \
+                (update_fields is not None and not update_fields):
+            # An insert, or a save of no field, which Django skips
+            super().save(*args, **kwargs)
+            return
+        self.previous_version = None \
+            if 'version' in self.get_deferred_fields() else self.version
+        self.version = F('version') + 1
+        if update_fields is not None:
+            kwargs['update_fields'] = \
+                set(update_fields) | {'version', 'updated_at'}
+        try:
+            super().save(*args, **kwargs)
+        except Exception:
+            # Nothing was saved: put back the version as it was loaded
+            if self.previous_version is None:
+                del self.version
+            else:
+                self.version = self.previous_version
+            raise
+        # Read the counted version back, in place of the expression
+        self.refresh_from_db(fields=['version'])
 
 
 class UserProfileManager(BaseUserManager):
@@ -10,9 +76,10 @@ class UserProfileManager(BaseUserManager):
     Manager for user profiles.
     We customize create_user and create_superuser function.
     """
-    def create_user(self, email, name, password, avatarURL=''):
+    def validate_user(self, email, name, password):
         """
-        Create a new user
+        Check the rules of a new user and return the normalized email.
+        Shared by create_user and the bulk import (core/importers.py)
         """
         if not email:
             raise ValueError('User must have an email')
@@ -26,7 +93,13 @@ class UserProfileManager(BaseUserManager):
         # Validate email, if email is not valid => throw Validation Error
         validate_email(email)
 
-        email = self.normalize_email(email)
+        return self.normalize_email(email)
+
+    def create_user(self, email, name, password, avatarURL=''):
+        """
+        Create a new user
+        """
+        email = self.validate_user(email, name, password)
         user = self.model(email=email, name=name, avatarURL=avatarURL)
         user.set_password(password)
         # Save to db
@@ -47,7 +120,7 @@ class UserProfileManager(BaseUserManager):
         return user
 
 
-class UserProfile(AbstractBaseUser, PermissionsMixin):
+class UserProfile(VersionedModelMixin, AbstractBaseUser, PermissionsMixin):
     """
     Custom user model use email as username.
     Fields: email, name, password, avatarURL
@@ -59,6 +132,14 @@ class UserProfile(AbstractBaseUser, PermissionsMixin):
     avatarURL = models.CharField(max_length=255, blank=True)
     is_active = models.BooleanField(default=True)
     is_staff = models.BooleanField(default=False)
+    # Denormalized counters of the follow graph, kept in sync
+    # with F() expressions by FollowManager and core/signals.py
+    follower_count = models.PositiveIntegerField(default=0)
+    following_count = models.PositiveIntegerField(default=0)
+    # Incremented on every change (see version_bump), for the ETag
+    # and Last-Modified of the api
+    version = models.PositiveIntegerField(default=1)
+    updated_at = models.DateTimeField(auto_now=True)
 
     # Because we customize user model, we need to define UserManager
     # And assign to objects
@@ -66,6 +147,12 @@ class UserProfile(AbstractBaseUser, PermissionsMixin):
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ['name']
 
+    class Meta:
+        # Mentions are resolved by name (see MentionManager)
+        indexes = [
+            models.Index(fields=['name'], name='core_user_name_idx'),
+        ]
+
     def tweets(self):
         """
         Return a queryset of of tweet made by this user
@@ -82,28 +169,332 @@ class UserProfile(AbstractBaseUser, PermissionsMixin):
         return self.email
 
 
+# SQL left-padding a tweet id so that the ids of a thread path
+# sort as strings in depth-first order, per database vendor
+THREAD_PATH_SQL = {
+    'sqlite': "substr('00000000000000000000' || {}, -20)",
+    'postgresql': "lpad(CAST({} AS text), 20, '0')",
+}
+
+
 class TweetManager(models.Manager):
     """
     Manager for tweet
     """
-    def create(self, text=None, author=None, **extra_kwargs):
+    def validate_text(self, text):
         """
-        Create a tweet
+        Check the text of a new tweet, raise ValueError if invalid.
+        Shared by create and the bulk ingestion (core/importers.py)
         """
         if not text or len(text.strip()) == 0:
             raise ValueError('The text is required')
         if len(text) > 160:
             raise ValueError('The text should not exceed 160 characters')
+
+    def validate(self, text, author):
+        """
+        Check the rules of a new tweet, raise ValueError if broken
+        """
+        self.validate_text(text)
         if not author:
             raise ValueError('The author is required')
-        
+
+    def thread_position(self, replying_to):
+        """
+        Return (root_id, depth) of a tweet replying to replying_to
+        """
+        return replying_to.root_id or replying_to.pk, replying_to.depth + 1
+
+    def create(self, text=None, author=None, **extra_kwargs):
+        """
+        Create a tweet
+        """
+        self.validate(text, author)
+
+        # Store the thread root and depth, so a conversation can be
+        # fetched with an indexed range scan on (root, created_at)
+        replying_to = extra_kwargs.get('replying_to')
+        if replying_to is not None:
+            extra_kwargs['root_id'], extra_kwargs['depth'] = \
+                self.thread_position(replying_to)
+
         tweet = Tweet(text=text, author=author, **extra_kwargs)
-        tweet.save(using=self._db)
+        with transaction.atomic(using=self._db):
+            tweet.save(using=self._db)
+            self.after_insert([tweet])
 
         return tweet
 
+    def bulk_insert(self, tweets):
+        """
+        Insert tweets with bulk_create and make sure they get their ids,
+        then run after_insert. Must run inside a transaction
+        """
+        self.bulk_create(tweets)
+        if tweets and tweets[0].pk is None:
+            # The backend (SQLite) does not return the ids of a bulk
+            # insert. The transaction holds the write lock since the
+            # first INSERT, so the newest len(tweets) ids are ours,
+            # in insertion order
+            ids = list(self.order_by('-id').values_list(
+                'id', flat=True)[:len(tweets)])
+            for tweet, tweet_id in zip(tweets, reversed(ids)):
+                tweet.pk = tweet_id
+        self.after_insert(tweets)
+
+    def after_insert(self, tweets):
+        """
+        Keep the denormalized data in sync after inserting tweets:
+        reply counters of the replied tweets, hashtags, mentions
+        and home timelines
+        """
+        # Keep the parents' stored reply counters in sync,
+        # one UPDATE per distinct number of new replies
+        replies = Counter(tweet.replying_to_id for tweet in tweets
+                          if tweet.replying_to_id)
+        by_count = defaultdict(list)
+        for parent_id, count in replies.items():
+            by_count[count].append(parent_id)
+        for count, parent_ids in by_count.items():
+            self.filter(pk__in=parent_ids).update(
+                reply_count=F('reply_count') + count, **version_bump()
+            )
+        # Link hashtags and mentioned users, parsed once here
+        tags = TweetTag.objects.link(tweets)
+        Mention.objects.link(tweets)
+        # Count the hashtags for trending, once the tweets are committed
+        if tags:
+            transaction.on_commit(lambda: trending.tracker.record(
+                (tag.tag, tag.created_at) for tag in tags
+            ), using=self.db)
+        # Push the tweets to the home timeline of their audience
+        TimelineEntry.objects.fan_out(tweets)
+
+    def for_viewer(self, user):
+        """
+        Return a queryset of tweets ready to be rendered for user:
+        author and replied tweet are joined, and each tweet is annotated
+        with `liked`, so a page of tweets costs a single query
+        """
+        liked = self.model.likes.through.objects.filter(
+            tweet_id=OuterRef('pk'), userprofile_id=user.pk
+        )
+        return self.select_related('author', 'replying_to').annotate(
+            liked=Exists(liked)
+        )
+
+    def search(self, query, user, author_ids=None, after=None, limit=50):
+        """
+        Return the tweets matching query, best bm25 match first,
+        rendered for user as in for_viewer and with their `search_rank`.
+        One query on the FTS5 index (core/search.py), one for the tweets
+        """
+        hits = search_ids(query, author_ids=author_ids, after=after,
+                          limit=limit, using=self.db)
+        tweets = self.for_viewer(user).in_bulk(
+            [tweet_id for _, tweet_id in hits]
+        )
+        results = []
+        for rank, tweet_id in hits:
+            tweet = tweets.get(tweet_id)
+            # Skip a tweet deleted between the two queries
+            if tweet is not None:
+                tweet.search_rank = rank
+                results.append(tweet)
+        return results
+
+    def conversation(self, root_id):
+        """
+        Return a queryset of the root tweet and all the tweets of
+        its conversation, using the stored root
+        """
+        return self.filter(models.Q(pk=root_id) | models.Q(root_id=root_id))
+
+    def thread(self, root_id, user=None, max_depth=None, limit=None):
+        """
+        Return the subtree of replies under root_id (root included)
+        with one recursive-CTE query, in depth-first order.
+        Each tweet gets `thread_depth` (0 for the root) and `liked`
+        (for user), and has its author loaded.
+        max_depth and limit default to THREAD_MAX_DEPTH and
+        THREAD_MAX_SIZE settings.
+        """
+        if max_depth is None:
+            max_depth = settings.THREAD_MAX_DEPTH
+        if limit is None:
+            limit = settings.THREAD_MAX_SIZE
+
+        connection = connections[self.db]
+        if connection.vendor not in THREAD_PATH_SQL:
+            raise NotSupportedError(
+                'Thread queries are not supported on {}'.format(
+                    connection.vendor)
+            )
+        qn = connection.ops.quote_name
+        pad = THREAD_PATH_SQL[connection.vendor]
+        user_model = self.model.author.field.related_model
+        tweet_fields = [
+            field.attname for field in self.model._meta.concrete_fields
+        ]
+        author_fields = ['id', 'name', 'avatarURL']
+        # SQLite takes the rows of the recursion from a queue: ordered by
+        # path, it walks the tree depth first and the LIMIT stops the
+        # walk after limit rows, so only the replies of the first limit
+        # tweets are read, not the whole subtree.
+        # PostgreSQL allows neither in the recursive term: there the
+        # walk covers the whole subtree down to max_depth and the final
+        # LIMIT only caps the output
+        bounded = connection.vendor == 'sqlite'
+        sql = """
+            WITH RECURSIVE thread (id, depth, path) AS (
+                SELECT id, 0, {root_path} FROM {tweet} WHERE id = %s
+                UNION ALL
+                SELECT child.id, thread.depth + 1,
+                       thread.path || '/' || {child_path}
+                FROM {tweet} AS child
+                JOIN thread ON child.{replying_to} = thread.id
+                WHERE thread.depth < %s
+                {walk_limit}
+            )
+            SELECT {tweet_columns}, {author_columns}, thread.depth,
+                   EXISTS (
+                       SELECT 1 FROM {likes} AS l
+                       WHERE l.tweet_id = t.id AND l.userprofile_id = %s
+                   )
+            FROM thread
+            JOIN {tweet} AS t ON t.id = thread.id
+            JOIN {user} AS u ON u.id = t.{author}
+            ORDER BY thread.path
+            LIMIT %s
+        """.format(
+            tweet=qn(self.model._meta.db_table),
+            likes=qn(self.model.likes.through._meta.db_table),
+            user=qn(user_model._meta.db_table),
+            replying_to=qn(self.model._meta.get_field('replying_to').column),
+            author=qn(self.model._meta.get_field('author').column),
+            root_path=pad.format('id'),
+            child_path=pad.format('child.id'),
+            tweet_columns=', '.join('t.' + qn(name) for name in tweet_fields),
+            author_columns=', '.join('u.' + qn(name)
+                                     for name in author_fields),
+            walk_limit='ORDER BY 3 LIMIT %s' if bounded else '',
+        )
+        # A NULL user id matches no like, so liked is false for everyone
+        user_id = user.pk if user is not None else None
+        params = [root_id, max_depth] + ([limit] if bounded else []) + \
+            [user_id, limit]
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            rows = cursor.fetchall()
+
+        tweets = []
+        split = len(tweet_fields)
+        for row in rows:
+            tweet = self.model.from_db(self.db, tweet_fields, row[:split])
+            author = user_model.from_db(
+                self.db, author_fields, row[split:split + len(author_fields)]
+            )
+            self.model.author.field.set_cached_value(tweet, author)
+            tweet.thread_depth = row[-2]
+            tweet.liked = bool(row[-1])
+            tweets.append(tweet)
+        return tweets
+
+    def toggle_many(self, user, tweet_ids):
+        """
+        Toggle the like of user on every tweet of tweet_ids, with a
+        constant number of queries whatever the number of tweets.
+        Duplicated ids are toggled once and unknown ids are ignored.
+        Return a dict {tweet_id: (liked, like_count)}
+        """
+        Like = self.model.likes.through
+        tweet_ids = list(dict.fromkeys(int(pk) for pk in tweet_ids))
+
+        with transaction.atomic(using=self._db):
+            # Lock the tweets so concurrent toggles on them are serialized
+            existing = set(self.select_for_update().filter(
+                id__in=tweet_ids
+            ).values_list('id', flat=True))
+            likes = Like.objects.filter(userprofile_id=user.pk)
+            to_remove = set(likes.filter(
+                tweet_id__in=existing
+            ).values_list('tweet_id', flat=True))
+            to_add = existing - to_remove
+
+            if to_remove:
+                delete_likes(likes.filter(tweet_id__in=to_remove))
+                self.filter(id__in=to_remove).update(
+                    like_count=F('like_count') - 1, **version_bump()
+                )
+            if to_add:
+                Like.objects.bulk_create([
+                    Like(tweet_id=tweet_id, userprofile_id=user.pk)
+                    for tweet_id in to_add
+                ])
+                self.filter(id__in=to_add).update(
+                    like_count=F('like_count') + 1, **version_bump()
+                )
+            counts = dict(self.filter(id__in=existing).values_list(
+                'id', 'like_count'
+            ))
+
+        return {
+            tweet_id: (tweet_id in to_add, counts[tweet_id])
+            for tweet_id in tweet_ids if tweet_id in counts
+        }
+
+    def like_count_subquery(self):
+        """
+        Return an expression counting the likes of the outer tweet
+        """
+        likes = self.model.likes.through.objects.filter(
+            tweet_id=OuterRef('pk')
+        ).order_by().values('tweet_id').annotate(
+            count=Count('*')
+        ).values('count')
+        return Coalesce(Subquery(likes, output_field=IntegerField()), 0)
+
+    def reply_count_subquery(self):
+        """
+        Return an expression counting the replies of the outer tweet
+        """
+        replies = self.model.objects.filter(
+            replying_to=OuterRef('pk')
+        ).order_by().values('replying_to').annotate(
+            count=Count('*')
+        ).values('count')
+        return Coalesce(Subquery(replies, output_field=IntegerField()), 0)
+
+    def recount(self, start_id, end_id):
+        """
+        Recompute like_count and reply_count for tweets whose id is in
+        [start_id, end_id). Only the out of sync tweets are written, so
+        the others keep their version. Return the number of rows updated.
+        """
+        mismatches = self.counter_mismatches().filter(
+            id__gte=start_id, id__lt=end_id
+        )
+        return self.filter(pk__in=mismatches.values('pk')).update(
+            like_count=self.like_count_subquery(),
+            reply_count=self.reply_count_subquery(),
+            **version_bump()
+        )
+
+    def counter_mismatches(self):
+        """
+        Return a queryset of tweets whose stored counters
+        differ from the real number of likes/replies
+        """
+        return self.annotate(
+            actual_like_count=self.like_count_subquery(),
+            actual_reply_count=self.reply_count_subquery()
+        ).exclude(
+            like_count=F('actual_like_count'),
+            reply_count=F('actual_reply_count')
+        )
 
-class Tweet(models.Model):
+
+class Tweet(VersionedModelMixin, models.Model):
     """
     Tweet model
     """
@@ -144,8 +535,39 @@ class Tweet(models.Model):
         on_delete=models.CASCADE
     )
     created_at = models.DateTimeField(auto_now_add=True)
+    # Denormalized counters, so we can render the totals of a tweet
+    # without running COUNT queries on likes and replies.
+    # They are kept in sync with F() expressions by toggle,
+    # TweetManager.create and the delete signals (core/signals.py)
+    like_count = models.PositiveIntegerField(default=0)
+    reply_count = models.PositiveIntegerField(default=0)
+    # Incremented on every change (see version_bump), for the ETag
+    # and Last-Modified of the api
+    version = models.PositiveIntegerField(default=1)
+    updated_at = models.DateTimeField(auto_now=True)
+    # The first tweet of the conversation (null for the first tweet
+    # itself) and the number of replies between it and this tweet.
+    # Computed by TweetManager.create from replying_to.
+    # related_name='+': we do not need the reverse relation.
+    # db_index=False: the (root, created_at) index covers root
+    root = models.ForeignKey(
+        'self',
+        blank=True,
+        null=True,
+        related_name='+',
+        on_delete=models.CASCADE,
+        db_index=False
+    )
+    depth = models.PositiveIntegerField(default=0)
     objects = TweetManager()
 
+    class Meta:
+        indexes = [
+            # Load a whole conversation in one range scan
+            models.Index(fields=['root', 'created_at'],
+                         name='core_tweet_root_created_idx'),
+        ]
+
     def replies(self):
         """
         Get a queryset of replies of this tweet
@@ -154,11 +576,420 @@ class Tweet(models.Model):
 
     # Handle like/remove a tweet
     def toggle(self, user):
-        # If user already like, remove like
-        if self.likes.filter(id=user.id).exists():
-            self.likes.remove(user)
-        else:
-            self.likes.add(user)
+        """
+        Like the tweet, or remove the like if the user already likes it.
+        Return a tuple (liked, like_count) with the new state.
+        """
+        Like = Tweet.likes.through
+        with transaction.atomic():
+            # Try to remove the like first: the number of deleted rows
+            # tells us whether the user liked the tweet, in one statement
+            removed = delete_likes(Like.objects.filter(
+                tweet_id=self.pk, userprofile_id=user.pk
+            ))
+            if removed:
+                liked, delta = False, -1
+            else:
+                try:
+                    with transaction.atomic():
+                        Like.objects.create(tweet_id=self.pk,
+                                            userprofile_id=user.pk)
+                    liked, delta = True, 1
+                except IntegrityError:
+                    # A concurrent toggle of the same user already
+                    # inserted the like, which is the state we want
+                    liked, delta = True, 0
+            if delta:
+                Tweet.objects.filter(pk=self.pk).update(
+                    like_count=F('like_count') + delta, **version_bump()
+                )
+            self.like_count = Tweet.objects.values_list(
+                'like_count', flat=True
+            ).get(pk=self.pk)
+
+        return liked, self.like_count
 
     def __str__(self) -> str:
         return self.text
+
+
+class FollowManager(models.Manager):
+    """
+    Manager for the follow graph
+    """
+
+    def follow(self, follower, followee):
+        """
+        Make follower follow followee.
+        Return True if created, False if already following
+        """
+        if follower.pk == followee.pk:
+            raise ValueError('A user cannot follow themselves')
+
+        with transaction.atomic(using=self._db):
+            try:
+                # The unique (follower, followee) index settles races
+                with transaction.atomic(using=self._db):
+                    self.create(follower=follower, followee=followee)
+            except IntegrityError:
+                return False
+            self._update_counts(follower.pk, followee.pk, 1)
+        return True
+
+    def unfollow(self, follower, followee):
+        """
+        Make follower stop following followee.
+        Return True if removed, False if was not following
+        """
+        with transaction.atomic(using=self._db):
+            deleted, _ = self.filter(
+                follower_id=follower.pk, followee_id=followee.pk
+            ).delete()
+            if deleted:
+                self._update_counts(follower.pk, followee.pk, -1)
+        return bool(deleted)
+
+    def _update_counts(self, follower_id, followee_id, delta):
+        """
+        Apply delta to the counters of both ends of a follow
+        """
+        user_model = self.model.follower.field.related_model
+        user_model.objects.filter(pk=follower_id).update(
+            following_count=F('following_count') + delta, **version_bump()
+        )
+        user_model.objects.filter(pk=followee_id).update(
+            follower_count=F('follower_count') + delta, **version_bump()
+        )
+
+    def following_ids(self, follower, user_ids):
+        """
+        Return the set of ids among user_ids that follower follows,
+        with one query
+        """
+        return set(self.filter(
+            follower_id=follower.pk, followee_id__in=list(user_ids)
+        ).values_list('followee_id', flat=True))
+
+    def follower_ids(self, followee_id, batch_size):
+        """
+        Yield lists of at most batch_size ids of the followers of
+        followee_id, using keyset batches on the follower id
+        """
+        followers = self.filter(followee_id=followee_id).order_by(
+            'follower_id'
+        ).values_list('follower_id', flat=True)
+        last_id = 0
+        while True:
+            batch = list(
+                followers.filter(follower_id__gt=last_id)[:batch_size]
+            )
+            if not batch:
+                return
+            yield batch
+            # A short batch is the last one
+            if len(batch) < batch_size:
+                return
+            last_id = batch[-1]
+
+
+class Follow(models.Model):
+    """
+    follower follows followee
+    """
+    # related_name='following_set': the follows made by a user
+    follower = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='following_set'
+    )
+    # related_name='follower_set': the follows a user receives
+    followee = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='follower_set'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    objects = FollowManager()
+
+    class Meta:
+        # Also the index of "who does this user follow"
+        unique_together = (('follower', 'followee'), )
+        indexes = [
+            # Iterate the followers of a user by keyset
+            models.Index(fields=['followee', 'follower'],
+                         name='core_follow_followee_idx'),
+        ]
+
+    def __str__(self) -> str:
+        return '{} -> {}'.format(self.follower_id, self.followee_id)
+
+
+class TimelineEntryManager(models.Manager):
+    """
+    Manager for the materialized home timelines
+    """
+
+    def fan_out(self, tweets):
+        """
+        Add tweets to the home timeline of their audience: the author,
+        the followers of the author (walked by keyset batches) and the
+        author of the replied tweet. Entries are inserted with one bulk
+        INSERT per TIMELINE_FANOUT_BATCH_SIZE entries
+        """
+        batch_size = settings.TIMELINE_FANOUT_BATCH_SIZE
+        pending = []
+
+        def add(owner_id, tweet):
+            pending.append(self.model(owner_id=owner_id, tweet=tweet,
+                                      created_at=tweet.created_at))
+            if len(pending) >= batch_size:
+                flush()
+
+        def flush():
+            self.bulk_create(pending, ignore_conflicts=True)
+            pending.clear()
+
+        by_author = defaultdict(list)
+        for tweet in tweets:
+            by_author[tweet.author_id].append(tweet)
+            if tweet.replying_to_id:
+                add(tweet.replying_to.author_id, tweet)
+        for author_id, author_tweets in by_author.items():
+            followers = Follow.objects.follower_ids(author_id, batch_size)
+            for owner_ids in chain([[author_id]], followers):
+                for owner_id in owner_ids:
+                    for tweet in author_tweets:
+                        add(owner_id, tweet)
+        if pending:
+            flush()
+
+    def prune(self, owner_id, keep):
+        """
+        Delete the timeline entries of owner older than the
+        keep newest ones. Return the number of deleted entries
+        """
+        entries = self.filter(owner_id=owner_id)
+        cutoff = entries.order_by('-created_at', '-id').values_list(
+            'created_at', 'id'
+        )[keep:keep + 1]
+        if not cutoff:
+            return 0
+        created_at, entry_id = cutoff[0]
+        deleted, _ = entries.filter(
+            models.Q(created_at__lt=created_at) |
+            models.Q(created_at=created_at, id__lte=entry_id)
+        ).delete()
+        return deleted
+
+    def owners_over(self, keep):
+        """
+        Return a queryset of ids of users with more than keep entries
+        """
+        return self.values('owner').annotate(
+            entries=Count('id')
+        ).filter(entries__gt=keep).values_list('owner', flat=True)
+
+
+class TimelineEntry(models.Model):
+    """
+    A tweet in the home timeline of a user.
+    Entries are written when the tweet is created (fan-out on write),
+    so reading a timeline is one range scan on (owner, created_at)
+    """
+    owner = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='timeline_entries'
+    )
+    # related_name='+': a tweet does not need to know its entries
+    tweet = models.ForeignKey(
+        Tweet,
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    # Copy of tweet.created_at, so the timeline is ordered without a join
+    created_at = models.DateTimeField()
+    objects = TimelineEntryManager()
+
+    class Meta:
+        unique_together = (('owner', 'tweet'), )
+        indexes = [
+            models.Index(fields=['owner', 'created_at'],
+                         name='core_timeline_owner_idx'),
+        ]
+
+    def __str__(self) -> str:
+        return '{} <- {}'.format(self.owner_id, self.tweet_id)
+
+
+class TweetTagManager(models.Manager):
+    """
+    Manager of the hashtags of tweets
+    """
+
+    def link(self, tweets):
+        """
+        Store the hashtags of tweets, one bulk INSERT for all of them.
+        Return the TweetTag instances
+        """
+        return self.bulk_create([
+            self.model(tweet=tweet, tag=tag, created_at=tweet.created_at)
+            for tweet in tweets for tag in extract_hashtags(tweet.text)
+        ], ignore_conflicts=True)
+
+
+class TweetTag(models.Model):
+    """
+    A hashtag of a tweet, stored case folded without the #.
+    Tweets of a tag are one range scan on (tag, created_at)
+    """
+    tweet = models.ForeignKey(
+        Tweet,
+        on_delete=models.CASCADE,
+        related_name='tags'
+    )
+    tag = models.CharField(max_length=100)
+    # Copy of tweet.created_at, so the tag page is ordered without a join
+    created_at = models.DateTimeField()
+    objects = TweetTagManager()
+
+    class Meta:
+        unique_together = (('tweet', 'tag'), )
+        indexes = [
+            models.Index(fields=['tag', 'created_at'],
+                         name='core_tweettag_tag_idx'),
+        ]
+
+    def __str__(self) -> str:
+        return '#{} <- {}'.format(self.tag, self.tweet_id)
+
+
+class MentionManager(models.Manager):
+    """
+    Manager of the users mentioned by tweets
+    """
+
+    def resolve(self, emails, names):
+        """
+        Return ({email: user id}, {name: user id}) of the mentioned
+        users, found with one query. A name shared by several users
+        is ambiguous and resolves to nobody
+        """
+        user_model = self.model.user.field.related_model
+        emails = {user_model.objects.normalize_email(email)
+                  for email in emails}
+        if not emails and not names:
+            return {}, {}
+        users = user_model.objects.filter(
+            models.Q(email__in=emails) | models.Q(name__in=names)
+        ).values_list('id', 'email', 'name')
+
+        by_email, by_name, ambiguous = {}, {}, set()
+        for user_id, email, name in users:
+            if email in emails:
+                by_email[email] = user_id
+            if name in names:
+                if name in by_name:
+                    ambiguous.add(name)
+                by_name[name] = user_id
+        for name in ambiguous:
+            del by_name[name]
+        return by_email, by_name
+
+    def link(self, tweets):
+        """
+        Store the users mentioned by tweets. The mentions of all the
+        tweets are resolved together, one query and one bulk INSERT
+        """
+        user_model = self.model.user.field.related_model
+        mentions = []
+        all_emails, all_names = set(), set()
+        for tweet in tweets:
+            emails, names = extract_mentions(tweet.text)
+            if emails or names:
+                mentions.append((tweet, emails, names))
+                all_emails |= emails
+                all_names |= names
+        if not mentions:
+            return
+
+        by_email, by_name = self.resolve(all_emails, all_names)
+        links = []
+        for tweet, emails, names in mentions:
+            user_ids = {
+                by_email.get(user_model.objects.normalize_email(email))
+                for email in emails
+            } | {by_name.get(name) for name in names}
+            user_ids.discard(None)
+            links.extend(
+                self.model(tweet=tweet, user_id=user_id,
+                           created_at=tweet.created_at)
+                for user_id in user_ids
+            )
+        self.bulk_create(links, ignore_conflicts=True)
+
+
+class Mention(models.Model):
+    """
+    A user mentioned by a tweet, with @email or @name.
+    Tweets mentioning a user are one range scan on (user, created_at)
+    """
+    tweet = models.ForeignKey(
+        Tweet,
+        on_delete=models.CASCADE,
+        related_name='mentions'
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='mentioned_in'
+    )
+    # Copy of tweet.created_at, so mentions are ordered without a join
+    created_at = models.DateTimeField()
+    objects = MentionManager()
+
+    class Meta:
+        unique_together = (('tweet', 'user'), )
+        indexes = [
+            models.Index(fields=['user', 'created_at'],
+                         name='core_mention_user_idx'),
+        ]
+
+    def __str__(self) -> str:
+        return '@{} <- {}'.format(self.user_id, self.tweet_id)
+
+
+class TrendingTagCountManager(models.Manager):
+    """
+    Manager of the trending rollup
+    """
+
+    def top(self, limit):
+        """
+        Return the limit tags with the most uses in the trending window,
+        as dicts of tag and count. The rollup holds at most
+        TRENDING_TOP_K rows per bucket of the window, so the cost does
+        not depend on the number of tweets
+        """
+        return list(self.filter(
+            bucket__gte=trending.window_start()
+        ).values('tag').annotate(
+            count=Sum('count')
+        ).order_by('-count', 'tag')[:limit])
+
+
+class TrendingTagCount(models.Model):
+    """
+    Uses of a hashtag in a time bucket of TRENDING_BUCKET_SECONDS,
+    merged from the in-process trackers of core/trending.py
+    """
+    bucket = models.DateTimeField()
+    tag = models.CharField(max_length=100)
+    count = models.PositiveIntegerField(default=0)
+    objects = TrendingTagCountManager()
+
+    class Meta:
+        unique_together = (('bucket', 'tag'), )
+
+    def __str__(self) -> str:
+        return '#{} {}: {}'.format(self.tag, self.bucket, self.count)
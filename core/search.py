@@ -0,0 +1,164 @@
+import re
+
+from django.db import NotSupportedError, connections, transaction
+
+
+# FTS5 index of Tweet.text. It is an external content table: it stores
+# only the inverted index and reads the text from core_tweet, keyed by
+# the tweet id. Triggers on core_tweet keep it in sync with every
+# INSERT, DELETE and UPDATE of the text, bulk ones included
+SCHEMA_SQL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS core_tweet_search USING fts5("
+    "text, content='core_tweet', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2')",
+]
+
+# Rebuilding core_tweet (SQLite ALTER TABLE emulation in migrations)
+# drops these triggers: reinstall_triggers() creates them again after
+# every migrate (post_migrate, see core/apps.py)
+TRIGGER_SQL = [
+    "CREATE TRIGGER IF NOT EXISTS core_tweet_search_insert "
+    "AFTER INSERT ON core_tweet BEGIN "
+    "INSERT INTO core_tweet_search(rowid, text) VALUES (new.id, new.text); "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS core_tweet_search_delete "
+    "AFTER DELETE ON core_tweet BEGIN "
+    "INSERT INTO core_tweet_search(core_tweet_search, rowid, text) "
+    "VALUES ('delete', old.id, old.text); "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS core_tweet_search_update "
+    "AFTER UPDATE OF text ON core_tweet BEGIN "
+    "INSERT INTO core_tweet_search(core_tweet_search, rowid, text) "
+    "VALUES ('delete', old.id, old.text); "
+    "INSERT INTO core_tweet_search(rowid, text) VALUES (new.id, new.text); "
+    "END",
+]
+
+DROP_SQL = [
+    'DROP TRIGGER IF EXISTS core_tweet_search_insert',
+    'DROP TRIGGER IF EXISTS core_tweet_search_delete',
+    'DROP TRIGGER IF EXISTS core_tweet_search_update',
+    'DROP TABLE IF EXISTS core_tweet_search',
+]
+
+TERM_RE = re.compile(r'\w+')
+
+
+def check_supported(connection):
+    """
+    Raise NotSupportedError unless the database has FTS5
+    """
+    if connection.vendor != 'sqlite':
+        raise NotSupportedError(
+            'Tweet search is not supported on {}'.format(connection.vendor)
+        )
+
+
+def install_triggers(connection):
+    """
+    Create the index table and its triggers if missing
+    """
+    check_supported(connection)
+    with connection.cursor() as cursor:
+        for sql in SCHEMA_SQL + TRIGGER_SQL:
+            cursor.execute(sql)
+
+
+def reinstall_triggers(connection):
+    """
+    Create the missing triggers of the index, if the index exists
+    """
+    if connection.vendor != 'sqlite' or \
+            'core_tweet_search' not in connection.introspection.table_names():
+        return
+    with connection.cursor() as cursor:
+        for sql in TRIGGER_SQL:
+            cursor.execute(sql)
+
+
+def match_expression(query):
+    """
+    Turn a user query into an FTS5 MATCH expression, every term quoted
+    so that FTS5 operators and syntax in the query are never
+    interpreted. All the terms must match. Return None if the query
+    has no term
+    """
+    terms = TERM_RE.findall(query or '')
+    if not terms:
+        return None
+    return ' '.join('"{}"'.format(term) for term in terms)
+
+
+def search_ids(query, author_ids=None, after=None, limit=50,
+               using='default'):
+    """
+    Return a list of (rank, tweet id) of the tweets matching query,
+    best bm25 rank first (FTS5 ranks are negative, lower is better),
+    then newest first. author_ids restricts the authors.
+    after is the (rank, id) of the last result of the previous page
+    """
+    expression = match_expression(query)
+    if expression is None:
+        return []
+    connection = connections[using]
+    check_supported(connection)
+
+    sql = [
+        'SELECT bm25(core_tweet_search) AS search_rank, '
+        'core_tweet_search.rowid AS tweet_id FROM core_tweet_search'
+    ]
+    params = []
+    if author_ids:
+        sql.append('INNER JOIN core_tweet '
+                   'ON core_tweet.id = core_tweet_search.rowid')
+    sql.append('WHERE core_tweet_search MATCH %s')
+    params.append(expression)
+    if author_ids:
+        sql.append('AND core_tweet.author_id IN ({})'.format(
+            ', '.join(['%s'] * len(author_ids))))
+        params.extend(author_ids)
+    if after is not None:
+        sql.append('AND (bm25(core_tweet_search) > %s OR '
+                   '(bm25(core_tweet_search) = %s '
+                   'AND core_tweet_search.rowid < %s))')
+        params.extend([after[0], after[0], after[1]])
+    sql.append('ORDER BY search_rank, tweet_id DESC LIMIT %s')
+    params.append(limit)
+
+    with connection.cursor() as cursor:
+        cursor.execute(' '.join(sql), params)
+        return cursor.fetchall()
+
+
+def rebuild(batch_size=5000, using='default'):
+    """
+    Empty the index and index every tweet again, batch_size tweets per
+    statement in ascending id order. Return the number of indexed tweets.
+    It runs in one transaction, so the triggers cannot index a new tweet
+    that a later batch would index again
+    """
+    connection = connections[using]
+    install_triggers(connection)
+    indexed = 0
+    with transaction.atomic(using=using), connection.cursor() as cursor:
+        cursor.execute(
+            "INSERT INTO core_tweet_search(core_tweet_search) "
+            "VALUES ('delete-all')"
+        )
+        last_id = 0
+        while True:
+            cursor.execute(
+                'SELECT max(id), count(*) FROM (SELECT id FROM core_tweet '
+                'WHERE id > %s ORDER BY id LIMIT %s)', [last_id, batch_size]
+            )
+            max_id, count = cursor.fetchone()
+            if not count:
+                break
+            cursor.execute(
+                'INSERT INTO core_tweet_search(rowid, text) '
+                'SELECT id, text FROM core_tweet WHERE id > %s AND id <= %s',
+                [last_id, max_id]
+            )
+            indexed += count
+            last_id = max_id
+    return indexed
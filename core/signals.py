@@ -0,0 +1,98 @@
+from collections import Counter, defaultdict
+
+from django.db.models import F
+from django.db.models.signals import m2m_changed, post_delete, pre_delete
+from django.dispatch import receiver
+from core.models import Follow, Tweet, UserProfile, version_bump
+
+
+@receiver(post_delete, sender=Tweet)
+def decrement_reply_count(sender, instance, **kwargs):
+    """
+    When a reply is deleted (directly or by cascade),
+    decrement the reply counter of the tweet it replies to
+    """
+    if instance.replying_to_id:
+        Tweet.objects.filter(
+            pk=instance.replying_to_id, reply_count__gt=0
+        ).update(reply_count=F('reply_count') - 1, **version_bump())
+
+
+@receiver(pre_delete, sender=UserProfile)
+def decrement_like_count(sender, instance, **kwargs):
+    """
+    Likes of a deleted user are removed by cascade without
+    any m2m signal, so decrement the counters of the liked tweets here
+    """
+    Tweet.objects.filter(likes=instance, like_count__gt=0).update(
+        like_count=F('like_count') - 1, **version_bump()
+    )
+
+
+@receiver(pre_delete, sender=UserProfile)
+def decrement_follow_counts(sender, instance, **kwargs):
+    """
+    Follows of a deleted user are removed by cascade,
+    so decrement the counters at the other end of each follow
+    """
+    UserProfile.objects.filter(
+        pk__in=Follow.objects.filter(
+            followee=instance).values('follower'),
+        following_count__gt=0
+    ).update(following_count=F('following_count') - 1, **version_bump())
+    UserProfile.objects.filter(
+        pk__in=Follow.objects.filter(
+            follower=instance).values('followee'),
+        follower_count__gt=0
+    ).update(follower_count=F('follower_count') - 1, **version_bump())
+
+
+def like_counts(instance, reverse, pk_set=None):
+    """
+    Return a Counter {tweet_id: number of likes} of the like rows of
+    instance, a tweet (or a user when reverse), restricted to pk_set
+    """
+    rows = Tweet.likes.through.objects.filter(
+        **{'userprofile_id' if reverse else 'tweet_id': instance.pk}
+    )
+    if pk_set is not None:
+        rows = rows.filter(
+            **{'tweet_id__in' if reverse else 'userprofile_id__in': pk_set}
+        )
+    return Counter(rows.values_list('tweet_id', flat=True))
+
+
+@receiver(m2m_changed, sender=Tweet.likes.through)
+def update_like_count(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Likes changed through the related managers (tweet.likes or
+    user.like_set add/remove/set/clear): apply the change to the
+    counters. Tweet.toggle and toggle_many write the like rows directly
+    and keep the counters themselves
+    """
+    if action in ('pre_remove', 'pre_clear'):
+        # The rows actually removed, counted before they are gone
+        instance._removed_likes = like_counts(
+            instance, reverse, pk_set if action == 'pre_remove' else None
+        )
+        return
+    if action == 'post_add':
+        # pk_set only holds the new likes
+        if reverse:
+            counts = Counter(pk_set)
+        else:
+            counts = Counter({instance.pk: len(pk_set)})
+        sign = 1
+    elif action in ('post_remove', 'post_clear'):
+        counts = instance.__dict__.pop('_removed_likes', Counter())
+        sign = -1
+    else:
+        return
+    by_count = defaultdict(list)
+    for tweet_id, count in counts.items():
+        if count:
+            by_count[count].append(tweet_id)
+    for count, tweet_ids in by_count.items():
+        Tweet.objects.filter(pk__in=tweet_ids).update(
+            like_count=F('like_count') + sign * count, **version_bump()
+        )
@@ -2,6 +2,8 @@ from django.test import TestCase, Client
 from django.contrib.auth import get_user_model
 from django.urls import reverse
 
+from core.models import Tweet
+
 
 class AdminSiteTests(TestCase):
 
@@ -58,3 +60,36 @@ class AdminSiteTests(TestCase):
         res = self.client.get(url)
 
         self.assertEqual(res.status_code, 200)
+
+    def test_tweet_change_page(self):
+        """
+        Test the tweet edit page shows the maintained fields read only
+        """
+        tweet = Tweet.objects.create(text='Hello', author=self.user)
+        url = reverse('admin:core_tweet_change', args=[tweet.id])
+        res = self.client.get(url)
+
+        self.assertEqual(res.status_code, 200)
+        form = res.context['adminform'].form
+        for field in ('likes', 'replying_to', 'like_count', 'reply_count',
+                      'version', 'root', 'depth'):
+            self.assertNotIn(field, form.fields)
+        self.assertIn('text', form.fields)
+
+    def test_tweet_change_keeps_likes(self):
+        """
+        Test posting likes to the tweet edit page changes neither the
+        likes nor their counter
+        """
+        tweet = Tweet.objects.create(text='Hello', author=self.user)
+        url = reverse('admin:core_tweet_change', args=[tweet.id])
+        res = self.client.post(url, {
+            'text': 'Edited', 'author': self.user.id,
+            'likes': [self.user.id, self.admin_user.id],
+        })
+
+        self.assertEqual(res.status_code, 302)
+        tweet.refresh_from_db()
+        self.assertEqual(tweet.text, 'Edited')
+        self.assertEqual(tweet.likes.count(), 0)
+        self.assertEqual(tweet.like_count, 0)
@@ -0,0 +1,97 @@
+import gzip
+import json
+import os
+import tempfile
+
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+
+from core.exporters import export_batches, gzip_chunks, ndjson_chunks
+from core.models import Tweet
+
+
+def read_ndjson(data):
+    """
+    Return the rows of NDJSON bytes
+    """
+    return [json.loads(line) for line in data.decode().splitlines()]
+
+
+class ExporterTests(TestCase):
+    """
+    Test the NDJSON export
+    """
+
+    def setUp(self) -> None:
+        self.users = [
+            get_user_model().objects.create_user(
+                email='user{}@test.com'.format(i), password='testpass123',
+                name='user{}'.format(i)
+            )
+            for i in range(5)
+        ]
+        self.tweet = Tweet.objects.create(text='A tweet',
+                                          author=self.users[0])
+        self.tweet.toggle(self.users[1])
+
+    def test_export_in_keyset_batches(self):
+        """
+        Test the export walks the table by id, one query per batch,
+        without the password hashes
+        """
+        with self.assertNumQueries(3):
+            batches = list(export_batches('users', batch_size=2))
+
+        self.assertEqual([len(batch) for batch in batches], [2, 2, 1])
+        rows = [row for batch in batches for row in batch]
+        self.assertEqual([row['id'] for row in rows],
+                         [user.id for user in self.users])
+        self.assertNotIn('password', rows[0])
+        self.assertEqual(rows[0]['email'], 'user0@test.com')
+
+    def test_export_resumes_after_id(self):
+        """
+        Test the export resumes after the id of the last row received
+        """
+        data = b''.join(ndjson_chunks('users', after=self.users[2].id))
+        self.assertEqual([row['id'] for row in read_ndjson(data)],
+                         [self.users[3].id, self.users[4].id])
+
+    def test_export_tweets_and_likes(self):
+        """
+        Test the tweet and like exports hold the related ids
+        """
+        tweets = read_ndjson(b''.join(ndjson_chunks('tweets')))
+        likes = read_ndjson(b''.join(ndjson_chunks('likes')))
+
+        self.assertEqual(tweets[0]['author'], self.users[0].id)
+        self.assertEqual(tweets[0]['like_count'], 1)
+        self.assertTrue(tweets[0]['created_at'])
+        self.assertEqual([(like['tweet'], like['user']) for like in likes],
+                         [(self.tweet.id, self.users[1].id)])
+
+    def test_gzip_on_the_fly(self):
+        """
+        Test the compressed stream decompresses to the NDJSON export
+        """
+        data = b''.join(ndjson_chunks('users', batch_size=2))
+        compressed = b''.join(
+            gzip_chunks(ndjson_chunks('users', batch_size=2))
+        )
+        self.assertEqual(gzip.decompress(compressed), data)
+
+    def test_export_data_command(self):
+        """
+        Test the export_data management command
+        """
+        with tempfile.NamedTemporaryFile(suffix='.ndjson.gz',
+                                         delete=False) as file:
+            pass
+        self.addCleanup(os.remove, file.name)
+
+        call_command('export_data', 'tweets', output=file.name, gzip=True)
+
+        with gzip.open(file.name) as exported:
+            rows = read_ndjson(exported.read())
+        self.assertEqual([row['id'] for row in rows], [self.tweet.id])
@@ -0,0 +1,122 @@
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+
+from core.models import Follow, TimelineEntry, Tweet
+
+
+class FollowModelTests(TestCase):
+    """
+    Test the follow graph
+    """
+
+    def setUp(self):
+        """
+        Create three users
+        """
+        self.users = [
+            get_user_model().objects.create_user(
+                email='user{}@test.com'.format(i),
+                name='user{}'.format(i),
+                password='testpass123'
+            )
+            for i in range(3)
+        ]
+
+    def assertCounts(self, user, follower_count, following_count):
+        """
+        Assert the stored counters of user
+        """
+        user.refresh_from_db()
+        self.assertEqual(user.follower_count, follower_count)
+        self.assertEqual(user.following_count, following_count)
+
+    def test_follow_updates_counts(self):
+        """
+        Test follow creates the edge and updates both counters
+        """
+        first, second, _ = self.users
+        self.assertTrue(Follow.objects.follow(first, second))
+
+        self.assertCounts(first, 0, 1)
+        self.assertCounts(second, 1, 0)
+
+    def test_follow_twice(self):
+        """
+        Test follow twice does not count twice
+        """
+        first, second, _ = self.users
+        Follow.objects.follow(first, second)
+        self.assertFalse(Follow.objects.follow(first, second))
+
+        self.assertEqual(Follow.objects.count(), 1)
+        self.assertCounts(second, 1, 0)
+
+    def test_follow_self(self):
+        """
+        Test a user cannot follow themselves.
+        This should fail
+        """
+        with self.assertRaises(ValueError):
+            Follow.objects.follow(self.users[0], self.users[0])
+
+    def test_unfollow_updates_counts(self):
+        """
+        Test unfollow removes the edge and updates both counters
+        """
+        first, second, _ = self.users
+        Follow.objects.follow(first, second)
+
+        self.assertTrue(Follow.objects.unfollow(first, second))
+        self.assertFalse(Follow.objects.unfollow(first, second))
+        self.assertCounts(first, 0, 0)
+        self.assertCounts(second, 0, 0)
+
+    def test_delete_user_updates_counts(self):
+        """
+        Test deleting a user updates the counters of the other end
+        """
+        first, second, third = self.users
+        Follow.objects.follow(first, second)
+        Follow.objects.follow(second, third)
+
+        second.delete()
+
+        self.assertCounts(first, 0, 0)
+        self.assertCounts(third, 0, 0)
+
+    def test_following_ids_one_query(self):
+        """
+        Test which users of a list are followed, in one query
+        """
+        first, second, third = self.users
+        Follow.objects.follow(first, third)
+
+        with self.assertNumQueries(1):
+            following = Follow.objects.following_ids(
+                first, [second.id, third.id, 999]
+            )
+        self.assertEqual(following, {third.id})
+
+    def test_follower_ids_batches(self):
+        """
+        Test the followers are iterated in keyset batches
+        """
+        first, second, third = self.users
+        Follow.objects.follow(second, first)
+        Follow.objects.follow(third, first)
+
+        batches = list(Follow.objects.follower_ids(first.id, 1))
+        self.assertEqual(batches, [[second.id], [third.id]])
+
+    def test_tweet_fans_out_to_followers(self):
+        """
+        Test a tweet shows in the timeline of the followers of the author
+        """
+        first, second, third = self.users
+        Follow.objects.follow(second, first)
+
+        tweet = Tweet.objects.create(text='A tweet', author=first)
+
+        owners = TimelineEntry.objects.filter(tweet=tweet).values_list(
+            'owner_id', flat=True)
+        self.assertEqual(sorted(owners), [first.id, second.id])
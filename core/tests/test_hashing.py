@@ -0,0 +1,87 @@
+import threading
+
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+
+from core.hashing import HashingExecutor, HashingQueueTimeout, get_executor
+
+
+POOLED_HASHERS = ['core.hashing.PooledPBKDF2PasswordHasher']
+
+
+class HashingExecutorTests(TestCase):
+    """
+    Test the bounded password hashing executor
+    """
+
+    def setUp(self):
+        self.executor = HashingExecutor(max_workers=1, queue_timeout=0.05)
+
+    def tearDown(self):
+        self.executor.shutdown()
+
+    def test_run_returns_result(self):
+        """
+        Test run returns the result of the function and records it
+        """
+        self.assertEqual(self.executor.run(sum, [1, 2]), 3)
+        metrics = self.executor.metrics()
+        self.assertEqual(metrics['completed'], 1)
+        self.assertEqual(metrics['queue_depth'], 0)
+
+    def test_queue_timeout(self):
+        """
+        Test a caller gives up when every worker stays busy.
+        This should fail
+        """
+        started, release = threading.Event(), threading.Event()
+
+        def busy():
+            started.set()
+            release.wait()
+
+        thread = threading.Thread(target=self.executor.run, args=(busy, ))
+        thread.start()
+        started.wait()
+        try:
+            with self.assertRaises(HashingQueueTimeout):
+                self.executor.run(sum, [1])
+        finally:
+            release.set()
+            thread.join()
+
+        self.assertEqual(self.executor.metrics()['rejected'], 1)
+
+
+@override_settings(PASSWORD_HASHERS=POOLED_HASHERS)
+class PooledHasherTests(TestCase):
+    """
+    Test PooledPBKDF2PasswordHasher
+    """
+
+    def test_set_and_check_password(self):
+        """
+        Test passwords are hashed and checked on the executor
+        """
+        completed = get_executor().metrics()['completed']
+        user = get_user_model().objects.create_user(
+            email='user1@test.com', name='user1', password='testpass123'
+        )
+
+        self.assertTrue(user.check_password('testpass123'))
+        self.assertFalse(user.check_password('wrongpass'))
+        self.assertTrue(user.password.startswith('pbkdf2_sha256$'))
+        self.assertEqual(get_executor().metrics()['completed'],
+                         completed + 3)
+
+    @override_settings(PASSWORD_HASHERS=[
+        'django.contrib.auth.hashers.PBKDF2PasswordHasher'])
+    def test_compatible_with_default_hasher(self):
+        """
+        Test a hash of the default hasher is checked by the pooled one
+        """
+        user = get_user_model().objects.create_user(
+            email='user1@test.com', name='user1', password='testpass123'
+        )
+        with self.settings(PASSWORD_HASHERS=POOLED_HASHERS):
+            self.assertTrue(user.check_password('testpass123'))
@@ -0,0 +1,263 @@
+import io
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+
+from core import hashing
+from core.hashing import get_executor, init_hashing_process
+from core.importers import TweetImporter, UserImporter, read_rows
+from core.models import TimelineEntry, Tweet
+
+
+class UserImporterTests(TestCase):
+    """
+    Test the bulk user import
+    """
+
+    def jsonl(self, *rows):
+        """
+        Return JSONL lines of rows
+        """
+        return io.StringIO(''.join(json.dumps(row) + '\n' for row in rows))
+
+    def sample_row(self, i, **extra):
+        row = {'email': 'user{}@test.com'.format(i),
+               'name': 'user{}'.format(i),
+               'password': 'testpass{}'.format(i)}
+        row.update(extra)
+        return row
+
+    def run_import(self, lines, file_format='jsonl', **kwargs):
+        kwargs.setdefault('workers', 0)
+        importer = UserImporter(get_user_model(), **kwargs)
+        return importer.run(read_rows(lines, file_format))
+
+    def test_import_jsonl(self):
+        """
+        Test import valid users from JSONL in several chunks
+        """
+        rows = [self.sample_row(i, avatarURL='avatar{}'.format(i))
+                for i in range(3)]
+
+        report = self.run_import(self.jsonl(*rows), batch_size=2)
+
+        self.assertEqual(report.as_dict(), {'created': 3, 'errors': []})
+        user = get_user_model().objects.get(email='user2@test.com')
+        self.assertEqual(user.name, 'user2')
+        self.assertEqual(user.avatarURL, 'avatar2')
+        self.assertTrue(user.check_password('testpass2'))
+
+    def test_import_csv(self):
+        """
+        Test import users from CSV
+        """
+        lines = io.StringIO(
+            'email,name,password,avatarURL\n'
+            'user1@test.com,user1,testpass1,\n'
+        )
+        report = self.run_import(lines, 'csv')
+
+        self.assertEqual(report.created, 1)
+        user = get_user_model().objects.get(email='user1@test.com')
+        self.assertEqual(user.avatarURL, '')
+
+    def test_invalid_rows_are_reported(self):
+        """
+        Test invalid rows are reported by line without
+        aborting the valid ones
+        """
+        get_user_model().objects.create_user(**self.sample_row(0))
+        lines = io.StringIO('\n'.join([
+            json.dumps(self.sample_row(0)),
+            json.dumps(self.sample_row(1, email='invalid')),
+            json.dumps(self.sample_row(2, name='')),
+            'not json',
+            json.dumps(self.sample_row(3)),
+            json.dumps(self.sample_row(3)),
+        ]))
+
+        report = self.run_import(lines)
+
+        self.assertEqual(report.created, 1)
+        errors = report.as_dict()['errors']
+        self.assertEqual([error['line'] for error in errors],
+                         [1, 2, 3, 4, 6])
+        self.assertTrue(
+            get_user_model().objects.filter(email='user3@test.com').exists()
+        )
+
+    def test_hash_on_process_pool(self):
+        """
+        Test passwords hashed by worker processes are valid
+        """
+        report = self.run_import(self.jsonl(self.sample_row(1)), workers=2)
+
+        self.assertEqual(report.created, 1)
+        user = get_user_model().objects.get(email='user1@test.com')
+        self.assertTrue(user.check_password('testpass1'))
+
+    def test_wrong_value_types(self):
+        """
+        Test a row with non text values is reported, the others imported
+        """
+        report = self.run_import(self.jsonl(
+            self.sample_row(1, email=5),
+            self.sample_row(2, name=['x']),
+            self.sample_row(3),
+        ))
+
+        self.assertEqual(report.created, 1)
+        self.assertEqual(report.as_dict()['errors'], [
+            {'line': 1, 'error': 'Malformed email'},
+            {'line': 2, 'error': 'Malformed name'},
+        ])
+
+    def test_process_pool_after_hashing_executor(self):
+        """
+        Test an import runs while this process owns a hashing executor
+        """
+        with override_settings(PASSWORD_HASHERS=[
+                'core.hashing.PooledPBKDF2PasswordHasher']):
+            get_executor().run(lambda: None)
+            report = self.run_import(self.jsonl(self.sample_row(1)),
+                                     workers=2)
+
+        self.assertEqual(report.created, 1)
+
+    def test_init_hashing_process_forgets_executor(self):
+        """
+        Test a forked hashing process does not reuse the executor of
+        its parent
+        """
+        get_executor()
+        init_hashing_process()
+
+        self.assertIsNone(hashing._executor)
+
+    def test_import_users_command(self):
+        """
+        Test the import_users management command
+        """
+        with tempfile.NamedTemporaryFile('w', suffix='.jsonl',
+                                         delete=False) as file:
+            file.write(json.dumps(self.sample_row(1)) + '\n')
+            file.write(json.dumps(self.sample_row(2, email='')) + '\n')
+        self.addCleanup(os.remove, file.name)
+
+        stdout, stderr = StringIO(), StringIO()
+        call_command('import_users', file.name, workers=0,
+                     stdout=stdout, stderr=stderr)
+
+        self.assertIn('Created 1 users, rejected 1', stdout.getvalue())
+        self.assertIn('Line 2', stderr.getvalue())
+
+
+class TweetImporterTests(TestCase):
+    """
+    Test the bulk tweet ingestion
+    """
+
+    def setUp(self) -> None:
+        self.author = get_user_model().objects.create_user(
+            email='user1@test.com', password='testpass123', name='user1'
+        )
+        self.follower = get_user_model().objects.create_user(
+            email='user2@test.com', password='testpass123', name='user2'
+        )
+        self.follower.following_set.create(followee=self.author)
+
+    def run_import(self, rows, **kwargs):
+        importer = TweetImporter(get_user_model(), Tweet, **kwargs)
+        return importer.run(enumerate(rows, start=1))
+
+    def test_import_tweets(self):
+        """
+        Test import tweets and replies in several chunks, keeping
+        thread positions, reply counters and timelines in sync
+        """
+        parent = Tweet.objects.create(text='parent', author=self.follower)
+        rows = [
+            {'text': 'tweet {}'.format(i), 'author': self.author.pk,
+             'replying_to': parent.pk if i % 2 else None}
+            for i in range(5)
+        ]
+
+        report = self.run_import(rows, batch_size=2)
+
+        self.assertEqual(report.as_dict(), {'created': 5, 'errors': []})
+        tweets = Tweet.objects.filter(author=self.author).order_by('id')
+        self.assertEqual([tweet.text for tweet in tweets],
+                         ['tweet {}'.format(i) for i in range(5)])
+        reply = tweets[1]
+        self.assertEqual(reply.replying_to, parent)
+        self.assertEqual((reply.root_id, reply.depth), (parent.pk, 1))
+        parent.refresh_from_db()
+        self.assertEqual(parent.reply_count, 2)
+        self.assertEqual(
+            TimelineEntry.objects.filter(owner=self.follower,
+                                         tweet__author=self.author).count(),
+            5
+        )
+
+    def test_invalid_rows_are_reported(self):
+        """
+        Test rows breaking the rules of Tweet.objects.create
+        are reported by line without aborting the valid ones
+        """
+        rows = [
+            {'text': '', 'author': self.author.pk},
+            {'text': 'a' * 161, 'author': self.author.pk},
+            {'text': 'no author'},
+            {'text': 'unknown author', 'author': 999},
+            {'text': 'unknown tweet', 'author': self.author.pk,
+             'replying_to': 999},
+            {'text': 'malformed', 'author': 'abc'},
+            None,
+            {'text': 'valid', 'author': self.author.pk},
+        ]
+
+        report = self.run_import(rows)
+
+        self.assertEqual(report.created, 1)
+        self.assertEqual(
+            [error['line'] for error in report.as_dict()['errors']],
+            [1, 2, 3, 4, 5, 6, 7]
+        )
+        self.assertEqual(Tweet.objects.get().text, 'valid')
+
+    def test_import_chunk_queries(self):
+        """
+        Test the authors and replied tweets of a chunk are resolved
+        with one query each, whatever the number of rows
+        """
+        parent = Tweet.objects.create(text='parent', author=self.author)
+        rows = [{'text': 'tweet', 'author': self.author.pk,
+                 'replying_to': parent.pk}] * 20
+
+        # authors, parents, savepoint, INSERT, ids, reply counters,
+        # followers batch, timeline INSERT, savepoint release
+        with self.assertNumQueries(9):
+            self.run_import(rows, batch_size=20)
+
+    def test_import_tweets_command(self):
+        """
+        Test the import_tweets management command
+        """
+        with tempfile.NamedTemporaryFile('w', suffix='.csv',
+                                         delete=False) as file:
+            file.write('text,author,replying_to\n')
+            file.write('hello,{},\n'.format(self.author.pk))
+            file.write(',{},\n'.format(self.author.pk))
+        self.addCleanup(os.remove, file.name)
+
+        stdout, stderr = StringIO(), StringIO()
+        call_command('import_tweets', file.name,
+                     stdout=stdout, stderr=stderr)
+
+        self.assertIn('Created 1 tweets, rejected 1', stdout.getvalue())
+        self.assertIn('Line 3', stderr.getvalue())
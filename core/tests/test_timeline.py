@@ -0,0 +1,87 @@
+from io import StringIO
+
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+
+from core.models import TimelineEntry, Tweet
+
+
+class TimelineTests(TestCase):
+    """
+    Test the materialized home timeline
+    """
+
+    def setUp(self):
+        """
+        Setup first user and second user.
+        """
+        self.first_user = get_user_model().objects.create_user(
+            email='user1@test.com', name='user1', password='user1'
+        )
+        self.second_user = get_user_model().objects.create_user(
+            email='user2@test.com', name='user2', password='user2'
+        )
+
+    def timeline(self, user):
+        """
+        Return the tweet ids of the timeline of user, newest first
+        """
+        return list(TimelineEntry.objects.filter(owner=user).order_by(
+            '-created_at', '-id'
+        ).values_list('tweet_id', flat=True))
+
+    def test_tweet_fans_out_to_author(self):
+        """
+        Test a tweet shows in the timeline of its author only
+        """
+        tweet = Tweet.objects.create(text='A tweet', author=self.first_user)
+        self.assertEqual(self.timeline(self.first_user), [tweet.id])
+        self.assertEqual(self.timeline(self.second_user), [])
+
+    def test_reply_fans_out_to_replied_author(self):
+        """
+        Test a reply shows in the timeline of the replied author
+        """
+        tweet = Tweet.objects.create(text='A tweet', author=self.first_user)
+        reply = Tweet.objects.create(text='A reply', author=self.second_user,
+                                     replying_to=tweet)
+        self.assertEqual(self.timeline(self.first_user), [reply.id, tweet.id])
+        self.assertEqual(self.timeline(self.second_user), [reply.id])
+
+    @override_settings(TIMELINE_FANOUT_BATCH_SIZE=1)
+    def test_fan_out_in_batches(self):
+        """
+        Test fan out with a batch smaller than the audience
+        """
+        tweet = Tweet.objects.create(text='A tweet', author=self.first_user)
+        reply = Tweet.objects.create(text='A reply', author=self.second_user,
+                                     replying_to=tweet)
+        self.assertEqual(self.timeline(self.first_user), [reply.id, tweet.id])
+
+    def test_prune_keeps_newest_entries(self):
+        """
+        Test prune deletes all but the newest entries
+        """
+        tweets = [
+            Tweet.objects.create(text='Tweet', author=self.first_user)
+            for _ in range(5)
+        ]
+        deleted = TimelineEntry.objects.prune(self.first_user.id, 2)
+
+        self.assertEqual(deleted, 3)
+        self.assertEqual(self.timeline(self.first_user),
+                         [tweets[4].id, tweets[3].id])
+
+    def test_prune_timelines_command(self):
+        """
+        Test the prune_timelines command only trims timelines over the cap
+        """
+        for _ in range(3):
+            Tweet.objects.create(text='Tweet', author=self.first_user)
+        Tweet.objects.create(text='Tweet', author=self.second_user)
+
+        call_command('prune_timelines', keep=1, stdout=StringIO())
+
+        self.assertEqual(len(self.timeline(self.first_user)), 1)
+        self.assertEqual(len(self.timeline(self.second_user)), 1)
@@ -0,0 +1,149 @@
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.contrib.auth import get_user_model
+from django.utils import timezone as django_timezone
+
+from core import trending
+from core.models import TrendingTagCount, Tweet
+
+
+class SketchTests(TestCase):
+    """
+    Test the count-min sketch and the top k
+    """
+
+    def test_count_min_sketch_never_underestimates(self):
+        """
+        Test estimates are at least the true counts, and exact
+        when the sketch is wide enough
+        """
+        sketch = trending.CountMinSketch(width=64, depth=4)
+        counts = {'tag{}'.format(i): i + 1 for i in range(200)}
+        for key, count in counts.items():
+            sketch.add(key, count)
+
+        for key, count in counts.items():
+            self.assertGreaterEqual(sketch.estimate(key), count)
+
+        wide = trending.CountMinSketch(width=100000, depth=4)
+        wide.add('django', 3)
+        self.assertEqual(wide.estimate('django'), 3)
+
+    def test_top_k_keeps_the_largest(self):
+        """
+        Test the top k keeps the k keys with the highest estimates
+        """
+        top = trending.TopK(2)
+        for key, estimate in [('a', 1), ('b', 5), ('c', 3), ('a', 2),
+                              ('d', 4), ('c', 6)]:
+            top.offer(key, estimate)
+        self.assertEqual(top.items(), [('c', 6), ('b', 5)])
+
+
+@override_settings(TRENDING_FLUSH_SECONDS=3600)
+class TrackerTests(TestCase):
+    """
+    Test the trending tracker and its rollup
+    """
+
+    def setUp(self) -> None:
+        self.tracker = trending.TrendingTracker()
+        self.now = django_timezone.now()
+
+    def tearDown(self) -> None:
+        # Nothing left for the flush at exit, after the test database
+        self.tracker.clear()
+
+    def test_flush_merges_into_rollup(self):
+        """
+        Test flushes of several trackers add up in the rollup
+        """
+        other = trending.TrendingTracker()
+        self.tracker.record([('django', self.now), ('django', self.now),
+                             ('flask', self.now)])
+        other.record([('django', self.now)])
+
+        self.assertEqual(self.tracker.flush(), 2)
+        self.assertEqual(other.flush(), 1)
+        self.assertEqual(self.tracker.flush(), 0)
+
+        self.assertEqual(TrendingTagCount.objects.top(10), [
+            {'tag': 'django', 'count': 3},
+            {'tag': 'flask', 'count': 1},
+        ])
+
+    def test_old_buckets_leave_the_window(self):
+        """
+        Test buckets older than the window are not trending
+        and are pruned on flush
+        """
+        old = self.now - timedelta(hours=3)
+        self.tracker.record([('old', old), ('new', self.now)])
+        self.tracker.flush()
+
+        self.assertEqual([row['tag']
+                          for row in TrendingTagCount.objects.top(10)],
+                         ['new'])
+        self.assertFalse(TrendingTagCount.objects.filter(tag='old').exists())
+
+    def test_failed_flush_keeps_counts(self):
+        """
+        Test a failing flush due on record is logged, not raised, and
+        the counts reach the rollup with the next flush
+        """
+        with patch('core.trending.add_counts',
+                   side_effect=RuntimeError('database is locked')), \
+                self.assertLogs('core.trending', 'ERROR'), \
+                self.settings(TRENDING_FLUSH_SECONDS=0):
+            self.tracker.record([('django', self.now)])
+
+        self.assertEqual(self.tracker.flush(), 1)
+        self.assertEqual(TrendingTagCount.objects.top(10),
+                         [{'tag': 'django', 'count': 1}])
+
+    def test_record_starts_flusher(self):
+        """
+        Test the first record starts one periodic flush thread
+        """
+        self.tracker.record([('django', self.now)])
+        flusher = self.tracker._flusher
+        self.tracker.record([('django', self.now)])
+
+        self.assertTrue(flusher.daemon)
+        self.assertTrue(flusher.is_alive())
+        self.assertIs(self.tracker._flusher, flusher)
+
+    def test_bucket_start(self):
+        """
+        Test a datetime falls in the bucket starting at a multiple
+        of the bucket size
+        """
+        moment = datetime(2022, 3, 6, 9, 14, 59, tzinfo=timezone.utc)
+        self.assertEqual(trending.bucket_start(moment, 300),
+                         datetime(2022, 3, 6, 9, 10, tzinfo=timezone.utc))
+
+
+@override_settings(TRENDING_FLUSH_SECONDS=0)
+class TrendingWritePathTests(TransactionTestCase):
+    """
+    Test the tweet write path feeds the tracker once committed
+    """
+
+    def tearDown(self) -> None:
+        trending.tracker.clear()
+
+    def test_create_tweet_counts_tags(self):
+        """
+        Test the hashtags of a created tweet reach the rollup
+        """
+        user = get_user_model().objects.create_user(
+            email='user1@test.com', password='testpass123', name='user1'
+        )
+        Tweet.objects.create(text='#Django #django #rest', author=user)
+
+        self.assertEqual(TrendingTagCount.objects.top(10), [
+            {'tag': 'django', 'count': 1},
+            {'tag': 'rest', 'count': 1},
+        ])
@@ -0,0 +1,70 @@
+from importlib import import_module
+
+from django.apps import apps
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+
+from core.models import Tweet
+
+
+backfill_migration = import_module(
+    'core.migrations.0010_backfill_tweet_root_depth'
+)
+
+
+class TweetConversationTests(TestCase):
+    """
+    Test the stored root and depth of tweets
+    """
+
+    def setUp(self):
+        """
+        Create a conversation root <- reply <- reply_of_reply
+        and an unrelated tweet
+        """
+        self.user = get_user_model().objects.create_user(
+            email='user1@test.com', name='user1', password='user1'
+        )
+        self.root = Tweet.objects.create(text='Root', author=self.user)
+        self.reply = Tweet.objects.create(text='Reply', author=self.user,
+                                          replying_to=self.root)
+        self.reply_of_reply = Tweet.objects.create(
+            text='Reply of reply', author=self.user, replying_to=self.reply
+        )
+        self.other = Tweet.objects.create(text='Other', author=self.user)
+
+    def test_create_sets_root_and_depth(self):
+        """
+        Test create computes root and depth from replying_to
+        """
+        self.assertIsNone(self.root.root_id)
+        self.assertEqual(self.root.depth, 0)
+        self.assertEqual(self.reply.root_id, self.root.id)
+        self.assertEqual(self.reply.depth, 1)
+        self.assertEqual(self.reply_of_reply.root_id, self.root.id)
+        self.assertEqual(self.reply_of_reply.depth, 2)
+
+    def test_conversation(self):
+        """
+        Test conversation returns the root and all its replies
+        """
+        conversation = Tweet.objects.conversation(self.root.id)
+        self.assertEqual(
+            sorted(conversation.values_list('id', flat=True)),
+            [self.root.id, self.reply.id, self.reply_of_reply.id]
+        )
+
+    def test_backfill_migration(self):
+        """
+        Test the data migration recomputes root and depth in batches
+        """
+        Tweet.objects.update(root=None, depth=0)
+
+        backfill_migration.backfill_root_depth(apps, None, batch_size=1)
+
+        self.reply_of_reply.refresh_from_db()
+        self.assertEqual(self.reply_of_reply.root_id, self.root.id)
+        self.assertEqual(self.reply_of_reply.depth, 2)
+        self.reply.refresh_from_db()
+        self.assertEqual(self.reply.root_id, self.root.id)
+        self.assertEqual(self.reply.depth, 1)
@@ -0,0 +1,172 @@
+from io import StringIO
+
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from core.models import Tweet
+
+
+class TweetCounterTests(TestCase):
+    """
+    Test the denormalized like_count and reply_count of tweet
+    """
+
+    def setUp(self):
+        """
+        Setup two users and a tweet of first user.
+        """
+        self.first_user = get_user_model().objects.create_user(
+            email='user1@test.com', name='user1', password='user1'
+        )
+        self.second_user = get_user_model().objects.create_user(
+            email='user2@test.com', name='user2', password='user2'
+        )
+        self.tweet = Tweet.objects.create(
+            text='A sample tweet', author=self.first_user
+        )
+
+    def test_like_increments_and_decrements_count(self):
+        """
+        Test toggle keeps like_count in sync
+        """
+        self.tweet.toggle(self.second_user)
+        self.tweet.refresh_from_db()
+        self.assertEqual(self.tweet.like_count, 1)
+
+        self.tweet.toggle(self.second_user)
+        self.tweet.refresh_from_db()
+        self.assertEqual(self.tweet.like_count, 0)
+
+    def test_related_manager_likes_update_count(self):
+        """
+        Test likes changed through tweet.likes and user.like_set keep
+        like_count in sync and count new versions
+        """
+        third_user = get_user_model().objects.create_user(
+            email='user3@test.com', name='user3', password='user3'
+        )
+        version = self.tweet.version
+
+        self.tweet.likes.add(self.first_user, self.second_user)
+        self.tweet.likes.add(self.second_user)
+        third_user.like_set.add(self.tweet)
+        self.tweet.refresh_from_db()
+        self.assertEqual(self.tweet.like_count, 3)
+        self.assertGreater(self.tweet.version, version)
+
+        self.tweet.likes.remove(self.first_user, self.first_user.pk + 100)
+        self.tweet.refresh_from_db()
+        self.assertEqual(self.tweet.like_count, 2)
+
+        third_user.like_set.clear()
+        self.tweet.refresh_from_db()
+        self.assertEqual(self.tweet.like_count, 1)
+
+        self.tweet.likes.set([self.first_user])
+        self.tweet.refresh_from_db()
+        self.assertEqual(self.tweet.like_count, 1)
+
+        self.tweet.likes.clear()
+        self.tweet.refresh_from_db()
+        self.assertEqual(self.tweet.like_count, 0)
+        self.assertFalse(Tweet.objects.counter_mismatches().exists())
+
+    def test_reply_increments_count(self):
+        """
+        Test creating replies increments reply_count of the parent
+        """
+        Tweet.objects.create(text='Reply 1', author=self.second_user,
+                             replying_to=self.tweet)
+        Tweet.objects.create(text='Reply 2', author=self.second_user,
+                             replying_to=self.tweet)
+        self.tweet.refresh_from_db()
+        self.assertEqual(self.tweet.reply_count, 2)
+
+    def test_delete_reply_decrements_count(self):
+        """
+        Test deleting a reply decrements reply_count of the parent
+        """
+        reply = Tweet.objects.create(text='Reply', author=self.second_user,
+                                     replying_to=self.tweet)
+        reply.delete()
+        self.tweet.refresh_from_db()
+        self.assertEqual(self.tweet.reply_count, 0)
+
+    def test_delete_author_of_reply_decrements_count(self):
+        """
+        Test deleting a user removes their replies from the counter
+        """
+        Tweet.objects.create(text='Reply', author=self.second_user,
+                             replying_to=self.tweet)
+        self.second_user.delete()
+        self.tweet.refresh_from_db()
+        self.assertEqual(self.tweet.reply_count, 0)
+
+    def test_delete_liking_user_decrements_count(self):
+        """
+        Test deleting a user removes their likes from the counter
+        """
+        self.tweet.toggle(self.second_user)
+        self.second_user.delete()
+        self.tweet.refresh_from_db()
+        self.assertEqual(self.tweet.like_count, 0)
+
+    def test_counter_mismatches(self):
+        """
+        Test counter_mismatches finds only the out of sync tweets
+        """
+        self.tweet.toggle(self.second_user)
+        other = Tweet.objects.create(text='Another tweet',
+                                     author=self.second_user)
+        self.assertFalse(Tweet.objects.counter_mismatches().exists())
+
+        Tweet.objects.filter(pk=other.pk).update(like_count=7)
+        mismatches = Tweet.objects.counter_mismatches()
+        self.assertEqual(list(mismatches.values_list('id', flat=True)),
+                         [other.id])
+
+    def test_sync_command_repairs_counters(self):
+        """
+        Test the sync_tweet_counters command recount broken counters
+        """
+        Tweet.objects.create(text='Reply', author=self.second_user,
+                             replying_to=self.tweet)
+        self.tweet.toggle(self.second_user)
+        Tweet.objects.update(like_count=0, reply_count=5)
+
+        call_command('sync_tweet_counters', batch_size=1, stdout=StringIO())
+
+        self.tweet.refresh_from_db()
+        self.assertEqual(self.tweet.like_count, 1)
+        self.assertEqual(self.tweet.reply_count, 1)
+        self.assertFalse(Tweet.objects.counter_mismatches().exists())
+
+    def test_recount_keeps_version_of_synced_tweets(self):
+        """
+        Test recount writes only the out of sync tweets
+        """
+        other = Tweet.objects.create(text='Another tweet',
+                                     author=self.second_user)
+        Tweet.objects.filter(pk=other.pk).update(like_count=7)
+        versions = dict(Tweet.objects.values_list('id', 'version'))
+
+        self.assertEqual(Tweet.objects.recount(0, other.pk + 1), 1)
+
+        self.tweet.refresh_from_db()
+        other.refresh_from_db()
+        self.assertEqual(self.tweet.version, versions[self.tweet.pk])
+        self.assertEqual(other.version, versions[other.pk] + 1)
+        self.assertEqual(other.like_count, 0)
+
+    def test_sync_command_check(self):
+        """
+        Test --check fails only when a counter is out of sync
+        """
+        call_command('sync_tweet_counters', check=True, stdout=StringIO())
+
+        Tweet.objects.filter(pk=self.tweet.pk).update(reply_count=3)
+        with self.assertRaises(CommandError):
+            call_command('sync_tweet_counters', check=True,
+                         stdout=StringIO())
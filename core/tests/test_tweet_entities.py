@@ -0,0 +1,95 @@
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+
+from core.entities import extract_hashtags, extract_mentions
+from core.models import Mention, Tweet, TweetTag
+
+
+class EntityParsingTests(TestCase):
+    """
+    Test the parsing of hashtags and mentions
+    """
+
+    def test_extract_hashtags(self):
+        """
+        Test hashtags are case folded, deduplicated, and a # inside
+        a word is not a hashtag
+        """
+        self.assertEqual(
+            extract_hashtags('#Django and #django, #rest_api. C#sharp ##x'),
+            {'django', 'rest_api'}
+        )
+
+    def test_extract_mentions(self):
+        """
+        Test mentions by email and by name
+        """
+        self.assertEqual(
+            extract_mentions('Hi @user1, @user2@Test.com. me@test.com'),
+            ({'user2@Test.com'}, {'user1'})
+        )
+
+
+class TweetEntityTests(TestCase):
+    """
+    Test hashtags and mentions are stored when tweets are created
+    """
+
+    def setUp(self) -> None:
+        self.user = get_user_model().objects.create_user(
+            email='user1@test.com', password='testpass123', name='user1'
+        )
+        self.other_user = get_user_model().objects.create_user(
+            email='user2@test.com', password='testpass123', name='user2'
+        )
+
+    def test_create_links_tags_and_mentions(self):
+        """
+        Test create a tweet stores its hashtags and mentioned users
+        """
+        tweet = Tweet.objects.create(
+            text='#Hello @user2 and @user1@TEST.com, #hello @nobody',
+            author=self.user
+        )
+
+        self.assertEqual(
+            list(TweetTag.objects.filter(tweet=tweet).values_list(
+                'tag', 'created_at')),
+            [('hello', tweet.created_at)]
+        )
+        self.assertEqual(
+            set(Mention.objects.filter(tweet=tweet).values_list(
+                'user_id', flat=True)),
+            {self.user.id, self.other_user.id}
+        )
+
+    def test_ambiguous_name_is_not_mentioned(self):
+        """
+        Test a name shared by several users mentions nobody
+        """
+        get_user_model().objects.create_user(
+            email='user3@test.com', password='testpass123', name='user2'
+        )
+        Tweet.objects.create(text='Hi @user2', author=self.user)
+        self.assertFalse(Mention.objects.exists())
+
+    def test_link_many_tweets_queries(self):
+        """
+        Test the tags and mentions of many tweets are stored with one
+        INSERT each, mentions resolved with one query
+        """
+        Tweet.objects.bulk_create([
+            Tweet(text='@user2 #bulk {}'.format(i), author=self.user)
+            for i in range(10)
+        ])
+        tweets = list(Tweet.objects.all())
+
+        # tags INSERT, users SELECT, mentions INSERT
+        with self.assertNumQueries(3):
+            TweetTag.objects.link(tweets)
+            Mention.objects.link(tweets)
+
+        self.assertEqual(TweetTag.objects.filter(tag='bulk').count(), 10)
+        self.assertEqual(
+            Mention.objects.filter(user=self.other_user).count(), 10
+        )
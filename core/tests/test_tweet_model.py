@@ -2,6 +2,8 @@ from django.test import TestCase
 from django.contrib.auth import get_user_model
 from django.db.utils import IntegrityError
 
+from unittest.mock import patch
+
 from core.models import Tweet
 
 
@@ -415,3 +417,75 @@ class TweetModelTests(TestCase):
         # Expect the second_user does not have reply
         exist_4 = self.second_user.tweets().filter(id=reply.id).exists()
         self.assertFalse(exist_4)
+
+    def test_toggle_returns_state_and_count(self):
+        """
+        Test toggle returns the new liked state and like count.
+        """
+        tweet = Tweet.objects.create(text='A sample tweet',
+                                     author=self.first_user)
+
+        self.assertEqual(tweet.toggle(self.second_user), (True, 1))
+        self.assertEqual(tweet.toggle(self.first_user), (True, 2))
+        self.assertEqual(tweet.toggle(self.second_user), (False, 1))
+        self.assertEqual(tweet.like_count, 1)
+
+    def test_toggle_lost_race_does_not_count_twice(self):
+        """
+        Test toggle when a concurrent toggle of the same user inserts
+        the like between our delete and our insert.
+        The like must be kept and counted once.
+        """
+        tweet = Tweet.objects.create(text='A sample tweet',
+                                     author=self.first_user)
+        tweet.toggle(self.second_user)
+        # Make the delete see nothing, as if the like was inserted
+        # by the concurrent toggle right after it ran
+        with patch('core.models.delete_likes', return_value=0):
+            result = tweet.toggle(self.second_user)
+
+        self.assertEqual(result, (True, 1))
+        self.assertEqual(tweet.likes.count(), 1)
+
+    def test_toggle_many(self):
+        """
+        Test toggle_many likes and unlikes a batch of tweets.
+        """
+        tweets = [
+            Tweet.objects.create(text='Tweet {}'.format(i),
+                                 author=self.first_user)
+            for i in range(3)
+        ]
+        tweets[0].toggle(self.second_user)
+        ids = [tweet.id for tweet in tweets]
+
+        result = Tweet.objects.toggle_many(self.second_user, ids + [0])
+
+        # Expect the first tweet unliked, the others liked,
+        # and the unknown id ignored
+        self.assertEqual(result, {
+            ids[0]: (False, 0),
+            ids[1]: (True, 1),
+            ids[2]: (True, 1),
+        })
+        liked = self.second_user.likes().values_list('id', flat=True)
+        self.assertEqual(sorted(liked), ids[1:])
+
+    def test_toggle_many_query_count_is_constant(self):
+        """
+        Test toggle_many costs the same number of queries
+        for 2 and 20 tweets.
+        """
+        def sample_ids(count):
+            return [
+                Tweet.objects.create(text='Tweet', author=self.first_user).id
+                for _ in range(count)
+            ]
+        small, large = sample_ids(2), sample_ids(20)
+        # Like half the tweets so both removal and insertion run
+        Tweet.objects.toggle_many(self.second_user, small[:1] + large[:10])
+
+        with self.assertNumQueries(9):
+            Tweet.objects.toggle_many(self.second_user, small)
+        with self.assertNumQueries(9):
+            Tweet.objects.toggle_many(self.second_user, large)
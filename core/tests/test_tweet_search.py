@@ -0,0 +1,138 @@
+from io import StringIO
+
+from django.test import TestCase
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.db.models.signals import post_migrate
+
+from core import search
+from core.models import Tweet
+
+
+class TweetSearchTests(TestCase):
+    """
+    Test the full-text search of tweets
+    """
+
+    def setUp(self) -> None:
+        self.user = get_user_model().objects.create_user(
+            email='user1@test.com', password='testpass123', name='user1'
+        )
+        self.other_user = get_user_model().objects.create_user(
+            email='user2@test.com', password='testpass123', name='user2'
+        )
+
+    def search_texts(self, query, **kwargs):
+        return [tweet.text
+                for tweet in Tweet.objects.search(query, self.user, **kwargs)]
+
+    def test_match_expression_quotes_terms(self):
+        """
+        Test FTS5 syntax in a query is never interpreted
+        """
+        self.assertEqual(search.match_expression('cats OR "dogs*'),
+                         '"cats" "OR" "dogs"')
+        self.assertIsNone(search.match_expression(' -* '))
+
+    def test_index_follows_create_and_delete(self):
+        """
+        Test created tweets are searchable and deleted ones are not
+        """
+        tweet = Tweet.objects.create(text='Sunny day in Hanoi',
+                                     author=self.user)
+        Tweet.objects.create(text='Rainy day', author=self.user)
+
+        self.assertEqual(self.search_texts('hanoi'), ['Sunny day in Hanoi'])
+        self.assertEqual(len(self.search_texts('day')), 2)
+
+        tweet.delete()
+        self.assertEqual(self.search_texts('hanoi'), [])
+
+    def test_index_follows_bulk_insert(self):
+        """
+        Test tweets inserted in bulk are searchable
+        """
+        Tweet.objects.bulk_create([
+            Tweet(text='bulk tweet {}'.format(i), author=self.user)
+            for i in range(3)
+        ])
+        self.assertEqual(len(self.search_texts('bulk')), 3)
+
+    def test_rank_and_keyset(self):
+        """
+        Test results come best match first, newest first among equals,
+        and a page resumes after the (rank, id) of the last result
+        """
+        Tweet.objects.create(text='coffee', author=self.user)
+        old = Tweet.objects.create(text='coffee and tea, plenty of tea',
+                                   author=self.user)
+        new = Tweet.objects.create(text='coffee and tea, plenty of tea',
+                                   author=self.user)
+
+        results = Tweet.objects.search('coffee tea', self.user)
+        self.assertEqual([tweet.id for tweet in results], [new.id, old.id])
+
+        first = results[0]
+        rest = Tweet.objects.search('coffee tea', self.user,
+                                    after=(first.search_rank, first.id))
+        self.assertEqual([tweet.id for tweet in rest], [old.id])
+
+    def test_filter_authors(self):
+        """
+        Test restrict the search to some authors
+        """
+        Tweet.objects.create(text='hello from user1', author=self.user)
+        Tweet.objects.create(text='hello from user2', author=self.other_user)
+
+        self.assertEqual(
+            self.search_texts('hello', author_ids=[self.other_user.id]),
+            ['hello from user2']
+        )
+
+    def test_search_queries(self):
+        """
+        Test a search costs one query on the index and one for the tweets
+        """
+        for i in range(5):
+            Tweet.objects.create(text='tweet {}'.format(i), author=self.user)
+
+        with self.assertNumQueries(2):
+            results = Tweet.objects.search('tweet', self.user)
+            [(tweet.author.name, tweet.liked) for tweet in results]
+
+    def test_rebuild_command(self):
+        """
+        Test the rebuild_search_index command restores a lost index
+        """
+        Tweet.objects.create(text='Lost and found', author=self.user)
+        with connection.cursor() as cursor:
+            cursor.execute("INSERT INTO core_tweet_search(core_tweet_search) "
+                           "VALUES ('delete-all')")
+        self.assertEqual(self.search_texts('found'), [])
+
+        stdout = StringIO()
+        call_command('rebuild_search_index', batch_size=1, stdout=stdout)
+
+        self.assertIn('Indexed 1 tweets', stdout.getvalue())
+        self.assertEqual(self.search_texts('found'), ['Lost and found'])
+
+    def test_migrate_reinstalls_triggers(self):
+        """
+        Test the triggers dropped by a rebuild of core_tweet are
+        created again after migrate
+        """
+        with connection.cursor() as cursor:
+            for sql in search.DROP_SQL[:3]:
+                cursor.execute(sql)
+        Tweet.objects.create(text='Before migrate', author=self.user)
+        self.assertEqual(self.search_texts('before'), [])
+
+        post_migrate.send(sender=apps.get_app_config('core'),
+                          app_config=apps.get_app_config('core'),
+                          verbosity=0, interactive=False, using='default',
+                          apps=apps, plan=[])
+        Tweet.objects.create(text='After migrate', author=self.user)
+
+        self.assertEqual(self.search_texts('after'), ['After migrate'])
@@ -0,0 +1,94 @@
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+
+from core.models import Tweet
+
+
+class TweetThreadTests(TestCase):
+    """
+    Test retrieving a reply tree with Tweet.objects.thread
+    """
+
+    def setUp(self):
+        """
+        Build the thread:
+        root
+        ├── a
+        │   ├── a1
+        │   │   └── a1x
+        │   └── a2
+        └── b
+        """
+        self.user = get_user_model().objects.create_user(
+            email='user1@test.com', name='user1', password='user1'
+        )
+        self.tweets = {}
+        for name, parent in [('root', None), ('a', 'root'), ('b', 'root'),
+                             ('a1', 'a'), ('a2', 'a'), ('a1x', 'a1')]:
+            self.tweets[name] = Tweet.objects.create(
+                text=name, author=self.user,
+                replying_to=self.tweets.get(parent)
+            )
+
+    def test_thread_depth_first_order(self):
+        """
+        Test the thread is returned in depth-first order with depths
+        """
+        thread = Tweet.objects.thread(self.tweets['root'].id)
+        self.assertEqual(
+            [(tweet.text, tweet.thread_depth) for tweet in thread],
+            [('root', 0), ('a', 1), ('a1', 2), ('a1x', 3), ('a2', 2),
+             ('b', 1)]
+        )
+
+    def test_thread_of_subtree(self):
+        """
+        Test the thread of a reply only contains its own subtree
+        """
+        thread = Tweet.objects.thread(self.tweets['a1'].id)
+        self.assertEqual([tweet.text for tweet in thread], ['a1', 'a1x'])
+        self.assertEqual(thread[0].thread_depth, 0)
+
+    def test_thread_limits(self):
+        """
+        Test max_depth and limit bound the thread
+        """
+        root_id = self.tweets['root'].id
+        thread = Tweet.objects.thread(root_id, max_depth=1)
+        self.assertEqual([tweet.text for tweet in thread],
+                         ['root', 'a', 'b'])
+
+        thread = Tweet.objects.thread(root_id, limit=3)
+        self.assertEqual([tweet.text for tweet in thread],
+                         ['root', 'a', 'a1'])
+
+    def test_thread_limit_keeps_depth_first_order(self):
+        """
+        Test every limit returns the start of the depth-first thread
+        """
+        root_id = self.tweets['root'].id
+        full = [tweet.text for tweet in Tweet.objects.thread(root_id)]
+        for limit in range(1, len(full) + 1):
+            thread = Tweet.objects.thread(root_id, limit=limit)
+            self.assertEqual([tweet.text for tweet in thread],
+                             full[:limit])
+
+    def test_thread_is_one_query(self):
+        """
+        Test the whole thread with authors and liked costs one query
+        """
+        self.tweets['a2'].toggle(self.user)
+        with self.assertNumQueries(1):
+            thread = Tweet.objects.thread(self.tweets['root'].id,
+                                          user=self.user)
+            authors = [tweet.author.name for tweet in thread]
+            liked = [tweet.text for tweet in thread if tweet.liked]
+
+        self.assertEqual(authors, ['user1'] * 6)
+        self.assertEqual(liked, ['a2'])
+
+    def test_thread_unknown_root(self):
+        """
+        Test the thread of an unknown tweet is empty
+        """
+        self.assertEqual(Tweet.objects.thread(999), [])
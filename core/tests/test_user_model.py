@@ -1,5 +1,6 @@
 from django.test import TestCase
 from django.contrib.auth import get_user_model
+from django.db import transaction
 from django.db.utils import IntegrityError
 from django.core.exceptions import ValidationError
 
@@ -149,3 +150,53 @@ class UserModelTests(TestCase):
         # We expect this is staff and superuser
         self.assertTrue(user.is_staff)
         self.assertTrue(user.is_superuser)
+
+    def test_save_counts_versions(self):
+        """
+        Test every save of a user counts a new version, a save of a
+        stale instance too
+        """
+        user = get_user_model().objects.create_user(
+            **self.sample_user_info()
+        )
+        stale = get_user_model().objects.get(pk=user.pk)
+
+        user.name = 'first'
+        user.save()
+        stale.name = 'second'
+        stale.save()
+
+        self.assertEqual(user.version, 2)
+        self.assertEqual(stale.version, 3)
+        user.refresh_from_db()
+        self.assertEqual(user.version, 3)
+
+    def test_failed_save_keeps_version(self):
+        """
+        Test a save failing in the database raises its own error and
+        leaves the version as loaded.
+        This should fail
+        """
+        get_user_model().objects.create_user(**self.sample_user_info())
+        payload = self.sample_user_info()
+        payload['email'] = 'other@test.com'
+        user = get_user_model().objects.create_user(**payload)
+
+        user.email = self.sample_user_info()['email']
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            user.save(update_fields=['email'])
+
+        self.assertEqual(user.version, 1)
+
+    def test_save_no_field(self):
+        """
+        Test a save of no field writes nothing and keeps the version
+        """
+        user = get_user_model().objects.create_user(
+            **self.sample_user_info()
+        )
+        with self.assertNumQueries(0):
+            user.save(update_fields=[])
+
+        user.refresh_from_db()
+        self.assertEqual(user.version, 1)
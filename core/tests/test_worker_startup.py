@@ -0,0 +1,123 @@
+import json
+import os
+import subprocess
+import sys
+from io import StringIO
+
+from django.test import TestCase
+from django.core.management import call_command
+from django.db import connection
+
+from api import serializers
+from chirper_project import warmup
+from core.management.commands.import_time import package_of, \
+    parse_importtime
+
+
+IMPORTTIME_OUTPUT = '''\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |     _io
+import time:       300 |        900 |   django.utils
+import time:      1000 |       1900 | django
+something else
+'''
+
+
+class ApiWorkerSettingsTests(TestCase):
+    """
+    Test the api worker settings profile
+    """
+
+    def test_worker_imports(self):
+        """
+        Test an api worker does not install or import the apps of the
+        admin and of browsers
+        """
+        code = (
+            'import json, sys, django; django.setup(); '
+            'from importlib import import_module; '
+            'from django.apps import apps; '
+            'from django.conf import settings; '
+            'import_module(settings.ROOT_URLCONF); '
+            'print(json.dumps({'
+            '"installed": [app.name for app in apps.get_app_configs()], '
+            '"modules": list(sys.modules)}))'
+        )
+        env = dict(os.environ,
+                   DJANGO_SETTINGS_MODULE='chirper_project.settings_api')
+        output = subprocess.run(
+            [sys.executable, '-c', code], env=env, check=True,
+            stdout=subprocess.PIPE, universal_newlines=True
+        ).stdout
+        report = json.loads(output)
+
+        self.assertIn('api', report['installed'])
+        self.assertIn('rest_framework.authtoken', report['installed'])
+        for app in ('django.contrib.admin', 'django.contrib.sessions',
+                    'django.contrib.messages', 'django.contrib.staticfiles'):
+            self.assertNotIn(app, report['installed'])
+        for module in ('django.contrib.sessions.middleware',
+                       'django.contrib.staticfiles', 'core.admin'):
+            self.assertNotIn(module, report['modules'])
+
+
+class WarmUpTests(TestCase):
+    """
+    Test the warm-up of a worker
+    """
+
+    def test_warm_up(self):
+        """
+        Test every step runs and reports its time
+        """
+        timings = warmup.warm_up()
+
+        self.assertEqual(set(timings), {'urls', 'serializers', 'database'})
+        self.assertIsNotNone(connection.connection)
+
+    def test_serializers_of_views(self):
+        """
+        Test the serializers of the api views are built
+        """
+        built = warmup.warm_serializers(warmup.warm_urls())
+
+        self.assertIn(serializers.UserProfileSerializer, built)
+        self.assertIn(serializers.TweetSerializer, built)
+        self.assertIn(serializers.BatchSerializer, built)
+
+
+class ImportTimeCommandTests(TestCase):
+    """
+    Test the import_time command
+    """
+
+    def test_parse_importtime(self):
+        """
+        Test the report of python -X importtime is parsed
+        """
+        self.assertEqual(parse_importtime(IMPORTTIME_OUTPUT), [
+            ('_io', 120, 120, 2),
+            ('django.utils', 300, 900, 1),
+            ('django', 1000, 1900, 0),
+        ])
+
+    def test_package_of(self):
+        """
+        Test a module is grouped by its first components
+        """
+        self.assertEqual(package_of('django.contrib.admin.sites', 3),
+                         'django.contrib.admin')
+        self.assertEqual(package_of('api', 3), 'api')
+
+    def test_report(self):
+        """
+        Test the command reports the import time of an api worker
+        """
+        out = StringIO()
+        call_command('import_time', settings_module='chirper_project.'
+                     'settings_api', package_depth=1, limit=100, stdout=out)
+
+        report = out.getvalue()
+        self.assertIn('modules imported in', report)
+        self.assertRegex(report, r'\n\s+[\d.]+  api\n')
+        self.assertRegex(report, r'\n\s+[\d.]+  rest_framework\n')
@@ -0,0 +1,256 @@
+import atexit
+import logging
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from hashlib import blake2b
+
+from django.conf import settings
+from django.db import connections, transaction
+
+
+logger = logging.getLogger(__name__)
+
+
+class CountMinSketch:
+    """
+    Approximate counter of a stream of keys in width * depth integers.
+    An estimate is never below the true count, and above it by at most
+    2 * total / width with probability 1 - 1 / 2 ** depth
+    """
+
+    def __init__(self, width, depth):
+        if not 1 <= depth <= 8:
+            raise ValueError('depth must be between 1 and 8')
+        self.width = width
+        self.depth = depth
+        self.rows = [[0] * width for _ in range(depth)]
+
+    def _columns(self, key):
+        # One 64 bits hash per row, all from one digest. blake2b is
+        # stable across processes, unlike hash() of a str
+        digest = blake2b(key.encode(), digest_size=8 * self.depth).digest()
+        for row in range(self.depth):
+            chunk = digest[row * 8:(row + 1) * 8]
+            yield row, int.from_bytes(chunk, 'little') % self.width
+
+    def add(self, key, count=1):
+        """
+        Count key and return its new estimate
+        """
+        estimate = None
+        for row, column in self._columns(key):
+            self.rows[row][column] += count
+            value = self.rows[row][column]
+            estimate = value if estimate is None else min(estimate, value)
+        return estimate
+
+    def estimate(self, key):
+        return min(self.rows[row][column]
+                   for row, column in self._columns(key))
+
+
+class TopK:
+    """
+    The k keys with the highest estimates seen so far
+    """
+
+    def __init__(self, k):
+        self.k = k
+        self.counts = {}
+        self._min_key = None
+
+    def offer(self, key, estimate):
+        """
+        Update the estimate of key, replacing the smallest of the
+        top k if key beats it
+        """
+        if key in self.counts:
+            self.counts[key] = estimate
+            if key == self._min_key:
+                self._min_key = min(self.counts, key=self.counts.get)
+        elif len(self.counts) < self.k:
+            self.counts[key] = estimate
+            if self._min_key is None or \
+                    estimate < self.counts[self._min_key]:
+                self._min_key = key
+        elif estimate > self.counts[self._min_key]:
+            del self.counts[self._min_key]
+            self.counts[key] = estimate
+            self._min_key = min(self.counts, key=self.counts.get)
+
+    def items(self):
+        return sorted(self.counts.items(), key=lambda item: -item[1])
+
+
+class Bucket:
+    """
+    Tag counts of one time bucket: a count-min sketch and its top k
+    """
+
+    def __init__(self):
+        self.sketch = CountMinSketch(settings.TRENDING_SKETCH_WIDTH,
+                                     settings.TRENDING_SKETCH_DEPTH)
+        self.top = TopK(settings.TRENDING_TOP_K)
+
+    def add(self, tag, count=1):
+        self.top.offer(tag, self.sketch.add(tag, count))
+
+
+def bucket_start(moment, size=None):
+    """
+    Return the start of the bucket of a datetime, as an aware datetime
+    """
+    size = size or settings.TRENDING_BUCKET_SECONDS
+    seconds = int(moment.timestamp()) // size * size
+    return datetime.fromtimestamp(seconds, tz=timezone.utc)
+
+
+class TrendingTracker:
+    """
+    In-process, bounded memory counts of hashtags per time bucket.
+    The top k of each bucket is added to the TrendingTagCount rollup at
+    most every TRENDING_FLUSH_SECONDS, then the bucket starts over, so
+    the rollup merges the counts of every worker process. Memory holds
+    at most the buckets touched since the last flush.
+    The first record starts a daemon thread flushing every
+    TRENDING_FLUSH_SECONDS, so the counts of an idle process reach the
+    rollup too, and the process flushes at exit
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buckets = {}
+        self._last_flush = time.monotonic()
+        self._flusher = None
+
+    def record(self, tags):
+        """
+        Count (tag, created_at) pairs, then flush if it is time to
+        """
+        with self._lock:
+            for tag, created_at in tags:
+                start = bucket_start(created_at)
+                bucket = self._buckets.get(start)
+                if bucket is None:
+                    bucket = self._buckets[start] = Bucket()
+                bucket.add(tag)
+            due = time.monotonic() - self._last_flush >= \
+                settings.TRENDING_FLUSH_SECONDS
+            self._start_flusher()
+        if due:
+            self.try_flush()
+
+    def _start_flusher(self):
+        # Under the lock. A forked process inherits the thread object
+        # of its parent, not the thread: start one of its own
+        if self._flusher is not None and self._flusher.is_alive():
+            return
+        if self._flusher is None:
+            atexit.register(self.try_flush)
+        self._flusher = threading.Thread(target=self._flush_periodically,
+                                         name='trending-flush', daemon=True)
+        self._flusher.start()
+
+    def _flush_periodically(self):
+        while True:
+            time.sleep(max(settings.TRENDING_FLUSH_SECONDS, 1))
+            if time.monotonic() - self._last_flush < \
+                    settings.TRENDING_FLUSH_SECONDS:
+                # A record flushed meanwhile
+                continue
+            try:
+                self.try_flush()
+            finally:
+                # The thread outlives requests: release its connections
+                connections.close_all()
+
+    def try_flush(self, using='default'):
+        """
+        Flush, logging a failure instead of raising it: a failed flush
+        must not fail the request that happened to trigger it. The
+        counts are kept for the next flush
+        """
+        try:
+            return self.flush(using)
+        except Exception:
+            logger.exception('Trending flush failed')
+            return 0
+
+    def flush(self, using='default'):
+        """
+        Add the top k of every bucket to the rollup, in one statement,
+        and forget the buckets. Return the number of rows written
+        """
+        with self._lock:
+            buckets, self._buckets = self._buckets, {}
+            self._last_flush = time.monotonic()
+        rows = [
+            (start, tag, count)
+            for start, bucket in buckets.items()
+            for tag, count in bucket.top.items()
+        ]
+        if rows:
+            try:
+                add_counts(rows, using)
+            except Exception:
+                self._restore(rows)
+                raise
+        return len(rows)
+
+    def _restore(self, rows):
+        # Count the rows of a failed flush again, for the next flush
+        with self._lock:
+            for start, tag, count in rows:
+                bucket = self._buckets.get(start)
+                if bucket is None:
+                    bucket = self._buckets[start] = Bucket()
+                bucket.add(tag, count)
+
+    def clear(self):
+        with self._lock:
+            self._buckets = {}
+
+
+def add_counts(rows, using='default'):
+    """
+    Add (bucket, tag, count) rows to the rollup: one INSERT ... ON
+    CONFLICT DO UPDATE, supported by SQLite and PostgreSQL
+    """
+    from core.models import TrendingTagCount
+
+    connection = connections[using]
+    qn = connection.ops.quote_name
+    table = qn(TrendingTagCount._meta.db_table)
+    sql = (
+        'INSERT INTO {table} ({bucket}, {tag}, {count}) '
+        'VALUES (%s, %s, %s) '
+        'ON CONFLICT ({bucket}, {tag}) '
+        'DO UPDATE SET {count} = {table}.{count} + excluded.{count}'
+    ).format(table=table, bucket=qn('bucket'), tag=qn('tag'),
+             count=qn('count'))
+    field = TrendingTagCount._meta.get_field('bucket')
+    params = [
+        (field.get_db_prep_value(start, connection), tag, count)
+        for start, tag, count in rows
+    ]
+    with transaction.atomic(using=using), connection.cursor() as cursor:
+        cursor.executemany(sql, params)
+        # Keep the rollup bounded: forget the buckets out of the window
+        TrendingTagCount.objects.using(using).filter(
+            bucket__lt=window_start()
+        ).delete()
+
+
+def window_start(now=None):
+    """
+    Return the start of the oldest bucket of the trending window
+    """
+    now = now or datetime.now(timezone.utc)
+    return bucket_start(
+        now - timedelta(seconds=settings.TRENDING_WINDOW_SECONDS)
+    )
+
+
+# Process wide tracker, fed by TweetManager.after_insert
+tracker = TrendingTracker()